@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Dict, Any, Optional
+from timestamps import SECONDS_PER_DAY, to_datetime64
+
+# Predictions per window of the rolling success rate chart
+ROLLING_WINDOW = 5
+
+# Points of the rolling success rate series kept for the chart
+ROLLING_HISTORY = 500
+
+# success column values
+UNEVALUATED, FAILED, SUCCEEDED = -1, 0, 1
+
+class _Column:
+    """
+    Growable typed array with amortized O(1) append
+    """
+    def __init__(self, dtype: Any, capacity: int = 64):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+    
+    def append(self, value: Any) -> int:
+        if self.size == len(self.data):
+            grown = np.empty(len(self.data) * 2, dtype=self.data.dtype)
+            grown[:self.size] = self.data
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+        return self.size - 1
+    
+    def values(self) -> np.ndarray:
+        return self.data[:self.size]
+
+class AIAnalytics:
+    """
+    Prediction and completion history in typed columns, with running aggregates
+    
+    Every aggregate the AI metrics panel shows (success rate, mean confidence,
+    rolling success rate and AI-vs-manual completion time) is updated as
+    predictions are recorded and evaluated and tasks are completed, so reading
+    them does not depend on the length of the history.
+    """
+    def __init__(self):
+        # Prediction history, one row per prediction
+        self.task_ids = _Column(np.int64)
+        self.employee_ids = _Column(np.int64)
+        self.confidence = _Column(np.float64)
+        self.timestamps = _Column(np.int64)
+        self.success = _Column(np.int8)
+        
+        # Row of the latest unevaluated prediction of each task
+        self.pending_rows = {}
+        
+        # Running prediction aggregates
+        self.confidence_sum = 0.0
+        self.evaluated = 0
+        self.succeeded = 0
+        
+        # Rolling success rate over evaluations, in evaluation order
+        self.recent_outcomes = deque(maxlen=ROLLING_WINDOW)
+        self.rolling_times = _Column(np.int64)
+        self.rolling_rates = _Column(np.float64)
+        
+        # Running completion-time sums (seconds) and counts, by assignment method
+        self.completion_seconds = {True: 0.0, False: 0.0}
+        self.completion_counts = {True: 0, False: 0}
+    
+    def __len__(self) -> int:
+        return self.task_ids.size
+    
+    def record_prediction(self, task_id: int, employee_id: int, confidence_score: float, timestamp: int) -> int:
+        """
+        Add an unevaluated prediction and return its row
+        """
+        row = self.task_ids.append(task_id)
+        self.employee_ids.append(employee_id)
+        self.confidence.append(confidence_score)
+        self.timestamps.append(timestamp)
+        self.success.append(UNEVALUATED)
+        
+        self.pending_rows[task_id] = row
+        self.confidence_sum += confidence_score
+        return row
+    
+    def evaluate(self, task_id: int, success: bool, timestamp: int) -> Optional[int]:
+        """
+        Record the outcome of a task's pending prediction
+        
+        Returns the row of the evaluated prediction, or None if the task has none pending.
+        """
+        row = self.pending_rows.pop(task_id, None)
+        if row is None:
+            return None
+        
+        self.success.data[row] = SUCCEEDED if success else FAILED
+        self.evaluated += 1
+        self.succeeded += bool(success)
+        
+        # Slide the rolling window by one evaluation
+        self.recent_outcomes.append(bool(success))
+        self.rolling_times.append(timestamp)
+        self.rolling_rates.append(100.0 * sum(self.recent_outcomes) / len(self.recent_outcomes))
+        
+        return row
+    
+    def record_completion(self, ai_assigned: bool, assigned_at: Optional[float], completed_at: Optional[float],
+                          sign: int = 1) -> None:
+        """
+        Add (sign=1) or take back (sign=-1) one task's assignment-to-completion time
+        
+        Parameters:
+        - ai_assigned: Whether the task was assigned on an AI recommendation
+        - assigned_at: Assignment time, epoch seconds
+        - completed_at: Completion time, epoch seconds
+        """
+        if assigned_at is None or completed_at is None:
+            return
+        
+        method = bool(ai_assigned)
+        self.completion_seconds[method] += sign * (completed_at - assigned_at)
+        self.completion_counts[method] += sign
+    
+    def success_rate(self) -> float:
+        """
+        Fraction of evaluated predictions that succeeded
+        """
+        return self.succeeded / self.evaluated if self.evaluated else 0.0
+    
+    def mean_confidence(self) -> float:
+        return self.confidence_sum / len(self) if len(self) else 0.0
+    
+    def average_completion_days(self, ai_assigned: bool) -> float:
+        count = self.completion_counts[ai_assigned]
+        return self.completion_seconds[ai_assigned] / count / SECONDS_PER_DAY if count > 0 else 0.0
+    
+    def completed_count(self) -> int:
+        return self.completion_counts[True] + self.completion_counts[False]
+    
+    def rolling_success(self) -> pd.Series:
+        """
+        Rolling success rate (%) of the most recent evaluations, indexed by evaluation time
+        """
+        start = max(0, self.rolling_rates.size - ROLLING_HISTORY)
+        times = to_datetime64(self.rolling_times.values()[start:])
+        return pd.Series(self.rolling_rates.values()[start:], index=times, name='rolling_success')
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Everything the AI metrics panel shows
+        """
+        return {
+            "predictions": len(self),
+            "evaluated": self.evaluated,
+            "success_rate": self.success_rate(),
+            "mean_confidence": self.mean_confidence(),
+            "rolling_success": self.rolling_success(),
+            "completed_tasks": self.completed_count(),
+            "ai_avg_days": self.average_completion_days(True),
+            "manual_avg_days": self.average_completion_days(False)
+        }
+    
+    def history(self) -> pd.DataFrame:
+        """
+        The prediction history as a DataFrame (success is NaN until evaluated)
+        """
+        success = self.success.values().astype(float)
+        success[success == UNEVALUATED] = np.nan
+        return pd.DataFrame({
+            "task_id": self.task_ids.values(),
+            "recommended_employee_id": self.employee_ids.values(),
+            "confidence_score": self.confidence.values(),
+            "timestamp": to_datetime64(self.timestamps.values()),
+            "success": success
+        })
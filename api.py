@@ -0,0 +1,560 @@
+import asyncio
+import functools
+import json
+import os
+import re
+from urllib.parse import parse_qs
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from data_handler import DataHandler
+from instrumentation import METRICS
+from match_coalescer import MatchCoalescer, DEFAULT_MAX_BATCH, DEFAULT_MAX_LATENCY
+from preference_store import PreferenceStore, DEFAULT_PREFERENCES_PATH
+from scheduler import TaskScheduler, CapacityPlanner, DEFAULT_HORIZON_DAYS
+from task_matcher import TaskMatcher
+
+# Roster loaded at startup unless TASKFLOW_ROSTER names another CSV
+DEFAULT_ROSTER_PATH = "attached_assets/employee_positions_dataset.csv"
+
+# Recommendations returned when a request does not ask for a number
+DEFAULT_TOP_K = 5
+
+# Recommendation batching: tasks per batch, and milliseconds a request may
+# wait for others to join its batch
+MATCH_MAX_BATCH = int(os.environ.get("TASKFLOW_MATCH_MAX_BATCH", DEFAULT_MAX_BATCH))
+MATCH_MAX_LATENCY_MS = float(os.environ.get("TASKFLOW_MATCH_MAX_LATENCY_MS", DEFAULT_MAX_LATENCY * 1000))
+
+# Candidates ranked per recommendation (TaskMatcher.shortlist_size): unset
+# keeps every eligible employee, 0 turns the shortlist off
+SHORTLIST_SIZE = os.environ.get("TASKFLOW_SHORTLIST_SIZE")
+
+# Employee preferences saved by the app (working hours, preferred task types)
+PREFERENCES_PATH = os.environ.get("TASKFLOW_PREFERENCES", DEFAULT_PREFERENCES_PATH)
+
+# Assign queued tasks in the background as capacity frees up (TaskScheduler.auto_drain)
+AUTO_SCHEDULE = os.environ.get("TASKFLOW_AUTO_SCHEDULE", "").lower() in ("1", "true", "yes")
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 1024 * 1024
+
+# Employee columns of a recommendation, in response order
+RECOMMENDATION_COLUMNS = ['ID', 'Name', 'Role', 'Position', 'Experience', 'Status', 'TaskCount',
+                          'MatchPercentage', 'FinalScore', 'AI_Method']
+
+TASK_STATUSES = ("Not Started", "In Progress", "Completed", "Blocked")
+
+class HTTPError(Exception):
+    """
+    A request that cannot be served, answered with `status` and a JSON error message
+    """
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class TaskService:
+    """
+    The matching and assignment operations of the API, on one shared roster
+    
+    A single DataHandler and TaskMatcher serve every request of the process,
+    so all clients see the same roster, tasks and trained model. The methods
+    here are blocking; TaskAPI runs them on a thread pool, and DataHandler's
+    lock keeps concurrent task updates consistent.
+    """
+    def __init__(self, roster_path: str = DEFAULT_ROSTER_PATH, max_batch: int = MATCH_MAX_BATCH,
+                 max_latency_ms: float = MATCH_MAX_LATENCY_MS):
+        self.roster_path = roster_path
+        self.data_handler = DataHandler()
+        
+        # The matcher reads the data handler's copy-on-write roster directly
+        self.task_matcher = TaskMatcher(roster=self.data_handler.roster)
+        if SHORTLIST_SIZE is not None:
+            self.task_matcher.use_shortlist = int(SHORTLIST_SIZE) > 0
+            self.task_matcher.shortlist_size = int(SHORTLIST_SIZE)
+        
+        # Concurrent recommendation requests are scored together in batches, and
+        # ranked by the same scoring spec assign_many picks the best match with
+        self.coalescer = MatchCoalescer(self.task_matcher, max_batch=max_batch, max_latency=max_latency_ms / 1000,
+                                        ranked=True)
+        
+        # Feed each completed task into the matcher's online learner
+        self.data_handler.add_completion_listener(self.task_matcher.learn_from_completed_task)
+        
+        # Keep the matcher's capacity model current with the effort of assigned
+        # tasks and the working hours and task types employees prefer
+        self.data_handler.add_task_listener(self.task_matcher.capacity.on_task_event)
+        self.preference_store = PreferenceStore(PREFERENCES_PATH)
+        self.task_matcher.capacity.use_preferences(self.preference_store)
+        
+        # Respect the notification preferences employees save (in the same store)
+        self.data_handler.set_preference_provider(self.preference_store.get)
+        
+        # Unassigned tasks queued in urgency order, and the overdue-risk outlook
+        self.scheduler = TaskScheduler(self.data_handler, self.task_matcher, auto_drain=AUTO_SCHEDULE)
+        self.capacity_planner = CapacityPlanner(self.data_handler)
+    
+    @property
+    def loaded(self) -> bool:
+        return self.data_handler.employee_df is not None
+    
+    def load(self) -> bool:
+        """
+        Load the roster and prepare the models before the first request
+        """
+        if not self.data_handler.load_employee_data(self.roster_path):
+            return False
+        
+        employee_df = self.data_handler.employee_df
+        self.task_matcher.set_employee_data(employee_df)
+        
+        # Fit the similarity model now, not in whichever requests come first
+        self.task_matcher.similarity_model.fit(employee_df)
+        
+        # Serve ML predictions if a model was trained and saved earlier (the
+        # matcher already serves the registry's promoted model, if any)
+        if not self.task_matcher.ml_model.trained and self.task_matcher.ml_model.load_model():
+            self.task_matcher.use_ml_model = True
+        
+        return True
+    
+    def create_task(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add a task from a request body with description, required_skills and
+        optional due_date, priority, task_type and estimated_hours
+        """
+        description = _field(body, "description", str)
+        required_skills = _skills(body)
+        priority = _field(body, "priority", str, "Medium")
+        due_date = _field(body, "due_date", str, None)
+        task_type = _field(body, "task_type", str, None)
+        estimated_hours = _field(body, "estimated_hours", (int, float), None)
+        if estimated_hours is not None and estimated_hours <= 0:
+            raise HTTPError(400, "estimated_hours must be positive")
+        
+        task_id = self.data_handler.add_task(description, required_skills, due_date=due_date, priority=priority,
+                                             task_type=task_type, estimated_hours=estimated_hours)
+        return self.data_handler.get_task(task_id)
+    
+    def get_task(self, task_id: int) -> Dict[str, Any]:
+        task = self.data_handler.get_task(task_id)
+        if task is None:
+            raise HTTPError(404, f"Task {task_id} not found")
+        return task
+    
+    def recommend_many(self, body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Recommendations for a batch of tasks, each given by task_id or by
+        required_skills (and optional priority)
+        """
+        k = _top_k(body.get("k", DEFAULT_TOP_K))
+        items = _field(body, "tasks", list)
+        
+        tasks = []
+        for item in items:
+            if not isinstance(item, dict):
+                raise HTTPError(400, "Every entry of 'tasks' must be an object")
+            
+            if "task_id" in item:
+                tasks.append(self.get_task(_field(item, "task_id", int)))
+            else:
+                tasks.append({
+                    "Required_Skills": _skills(item),
+                    "Priority": _field(item, "priority", str, "Medium"),
+                    "Status": "Not Started"
+                })
+        
+        # All of the request's tasks go through the coalescer together
+        return [{"task_id": task.get("TaskID"), "recommendations": top_k_records(matches, k)}
+                for task, matches in zip(tasks, self.coalescer.match_many(tasks))]
+    
+    def assign_many(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Assign a batch of tasks in one DataHandler call
+        
+        Each entry names a task_id and either an employee_id, or none to assign
+        the best match as the Streamlit bulk auto-assign does. An entry with an
+        expected_version is only applied if the task is still at that Version.
+        """
+        items = _field(body, "assignments", list)
+        
+        assignments = []
+        expected_versions = {}
+        # Task ID -> (employee ID, score) of the AI-powered best matches
+        ai_predictions = {}
+        for item in items:
+            if not isinstance(item, dict):
+                raise HTTPError(400, "Every entry of 'assignments' must be an object")
+            
+            task_id = _field(item, "task_id", int)
+            if "expected_version" in item:
+                expected_versions[task_id] = _field(item, "expected_version", int)
+            
+            if "employee_id" in item:
+                assignments.append((task_id, _field(item, "employee_id", int),
+                                    _field(item, "ai_recommended", bool, False),
+                                    float(_field(item, "ai_score", (int, float), 0.0))))
+                continue
+            
+            task = self.data_handler.get_task(task_id)
+            if task is None:
+                continue
+            best_match = self.task_matcher.recommend_best_match(task["Required_Skills"], priority=task["Priority"],
+                                                                due_date=task["Due_Date"], task_type=task.get("Task_Type"),
+                                                                estimated_hours=task.get("Estimated_Hours"))
+            if best_match:
+                ai_powered = best_match.get('AI_Powered', False)
+                match_score = best_match.get('MatchPercentage', 0) / 100.0
+                if ai_powered:
+                    ai_predictions[task_id] = (best_match['ID'], match_score)
+                assignments.append((task_id, best_match['ID'], ai_powered, match_score))
+        
+        # Holding the (reentrant) lock across the batch lets the versions tell
+        # exactly which tasks this call assigned
+        requested_ids = [item["task_id"] for item in items]
+        with self.data_handler.lock:
+            versions_before = {task_id: self._version(task_id) for task_id in requested_ids}
+            assigned_count = self.data_handler.assign_tasks(assignments, expected_versions or None)
+            tasks = [self.data_handler.get_task(task_id) for task_id in requested_ids]
+            
+            # Track only the AI predictions that were actually applied
+            for task_id, task in zip(requested_ids, tasks):
+                if task_id in ai_predictions and task is not None and task["Version"] != versions_before[task_id]:
+                    employee_id, match_score = ai_predictions[task_id]
+                    self.data_handler.record_ai_prediction(task_id, employee_id, match_score)
+        
+        return {
+            "assigned": assigned_count,
+            "tasks": [task for task in tasks if task is not None],
+            "skipped": [task_id for task_id, task in zip(requested_ids, tasks)
+                        if task is None or task["Version"] == versions_before[task_id]]
+        }
+    
+    def _version(self, task_id: int) -> Optional[int]:
+        task = self.data_handler.get_task(task_id)
+        return task["Version"] if task is not None else None
+    
+    def update_status(self, task_id: int, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Change a task's status (and optionally progress), compare-and-set on expected_version
+        """
+        status = _field(body, "status", str)
+        if status not in TASK_STATUSES:
+            raise HTTPError(400, f"status must be one of: {', '.join(TASK_STATUSES)}")
+        progress = _field(body, "progress", int, None)
+        expected_version = _field(body, "expected_version", int, None)
+        
+        if not self.data_handler.update_task_status(task_id, status, progress, expected_version=expected_version):
+            task = self.get_task(task_id)
+            raise HTTPError(409, f"Task {task_id} is at Version {task['Version']}, not {expected_version}")
+        return self.data_handler.get_task(task_id)
+    
+    def reschedule(self, task_id: int, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Change a task's priority and/or due date, compare-and-set on expected_version
+        """
+        priority = _field(body, "priority", str, None)
+        due_date = _field(body, "due_date", str, None)
+        expected_version = _field(body, "expected_version", int, None)
+        if priority is None and due_date is None:
+            raise HTTPError(400, "Pass a priority, a due_date or both")
+        
+        if not self.data_handler.reschedule_task(task_id, priority, due_date, expected_version=expected_version):
+            task = self.get_task(task_id)
+            raise HTTPError(409, f"Task {task_id} is at Version {task['Version']}, not {expected_version}")
+        return self.data_handler.get_task(task_id)
+    
+    def schedule(self, horizon_days: float) -> Dict[str, Any]:
+        """
+        The queued tasks in urgency order and every busy employee's overdue risk
+        """
+        return {
+            "queue": self.scheduler.pending(),
+            "capacity": json.loads(self.capacity_planner.plan(horizon_days).to_json(orient='records'))
+        }
+    
+    def drain_schedule(self, body: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Assign queued tasks, most urgent first, while employees have capacity
+        """
+        limit = _field(body or {}, "limit", int, None)
+        assigned = self.scheduler.drain(limit)
+        return {
+            "assigned": [{"task_id": task_id, "employee_id": employee_id} for task_id, employee_id in assigned],
+            "queued": len(self.scheduler.queue)
+        }
+    
+    def employee_tasks(self, employee_id: int) -> List[Dict[str, Any]]:
+        if employee_id not in self.data_handler.employee_contacts:
+            raise HTTPError(404, f"Employee {employee_id} not found")
+        return self.data_handler.get_employee_tasks(employee_id)
+
+def _field(body: Dict[str, Any], name: str, kind: Any, default: Any = ...) -> Any:
+    """
+    A field of a JSON request body, checked against `kind`; required unless a default is given
+    """
+    if name not in body or body[name] is None:
+        if default is ...:
+            raise HTTPError(400, f"Missing field '{name}'")
+        return default
+    
+    value = body[name]
+    # JSON booleans are ints in Python, but never a valid ID or count
+    if not isinstance(value, kind) or (isinstance(value, bool) and kind is not bool):
+        raise HTTPError(400, f"Field '{name}' has the wrong type")
+    return value
+
+def _skills(body: Dict[str, Any]) -> List[str]:
+    skills = _field(body, "required_skills", list)
+    if not skills or not all(isinstance(skill, str) for skill in skills):
+        raise HTTPError(400, "'required_skills' must be a non-empty list of strings")
+    return skills
+
+def _top_k(value: Any) -> int:
+    try:
+        k = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, "k must be an integer")
+    if k < 1:
+        raise HTTPError(400, "k must be at least 1")
+    return k
+
+def top_k_records(matches: Optional[pd.DataFrame], k: int) -> List[Dict[str, Any]]:
+    """
+    The first k rows of rank_matches_many as plain JSON values (NaN becomes null)
+    """
+    if matches is None or len(matches) == 0:
+        return []
+    
+    columns = [column for column in RECOMMENDATION_COLUMNS if column in matches.columns]
+    return json.loads(matches[columns].head(k).to_json(orient='records'))
+
+def _json_default(value: Any) -> Any:
+    # Task fields can hold NumPy scalars, e.g. an Assigned_To taken from the roster
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+class TaskAPI:
+    """
+    ASGI application serving TaskService as JSON over HTTP
+    
+    Serve it with any ASGI server, e.g. `uvicorn api:create_app --factory`. Requests are
+    handled asynchronously: the event loop only parses and answers requests,
+    while matching and DataHandler calls run on a thread pool, so slow
+    matches never hold up other clients. Recommendations of concurrent
+    requests are batched by TaskService's MatchCoalescer, and the batch
+    endpoints handle many tasks per request.
+    
+    Routes:
+    - GET    /health
+    - GET    /metrics                              Prometheus text
+    - POST   /tasks                                create a task
+    - GET    /tasks/{task_id}
+    - GET    /tasks/{task_id}/recommendations?k=5  top-k employees for a task
+    - POST   /recommendations                      top-k for a batch of tasks
+    - POST   /assignments                          batch-assign
+    - PATCH  /tasks/{task_id}/status               update status (409 on a version conflict)
+    - PATCH  /tasks/{task_id}/schedule             change priority/due date (409 on a version conflict)
+    - GET    /schedule?horizon_days=14             queued tasks by urgency, per-employee overdue risk
+    - POST   /schedule/drain                       assign queued tasks while employees have capacity
+    - GET    /employees/{employee_id}/tasks
+    """
+    def __init__(self, service: TaskService, max_workers: Optional[int] = None):
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or min(32, (os.cpu_count() or 1) + 4),
+                                           thread_name_prefix="taskflow-api")
+        self.load_lock = None
+        
+        self.routes = [
+            ("GET", re.compile(r"/health"), self.health),
+            ("GET", re.compile(r"/metrics"), self.metrics),
+            ("POST", re.compile(r"/tasks"), self.create_task),
+            ("GET", re.compile(r"/tasks/(\d+)"), self.get_task),
+            ("GET", re.compile(r"/tasks/(\d+)/recommendations"), self.recommend_task),
+            ("POST", re.compile(r"/recommendations"), self.recommend_many),
+            ("POST", re.compile(r"/assignments"), self.assign_many),
+            ("PATCH", re.compile(r"/tasks/(\d+)/status"), self.update_status),
+            ("PATCH", re.compile(r"/tasks/(\d+)/schedule"), self.reschedule),
+            ("GET", re.compile(r"/schedule"), self.schedule),
+            ("POST", re.compile(r"/schedule/drain"), self.drain_schedule),
+            ("GET", re.compile(r"/employees/(\d+)/tasks"), self.employee_tasks),
+        ]
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self.handle(scope, receive, send)
+    
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Run a blocking call on the thread pool
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+    
+    async def ensure_loaded(self) -> bool:
+        """
+        Load the roster once, at startup or (without lifespan support) on the first request
+        """
+        if self.service.loaded:
+            return True
+        if self.load_lock is None:
+            self.load_lock = asyncio.Lock()
+        async with self.load_lock:
+            if not self.service.loaded:
+                await self.run(self.service.load)
+        return self.service.loaded
+    
+    async def lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if await self.ensure_loaded():
+                    await send({"type": "lifespan.startup.complete"})
+                else:
+                    await send({"type": "lifespan.startup.failed",
+                                "message": f"Could not load roster {self.service.roster_path}"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    
+    async def handle(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        try:
+            handler, args, allowed = self.resolve(scope["method"], scope["path"])
+            if handler is None:
+                if allowed:
+                    raise HTTPError(405, f"Method {scope['method']} not allowed")
+                raise HTTPError(404, f"No route for {scope['path']}")
+            
+            if handler not in (self.health, self.metrics) and not await self.ensure_loaded():
+                raise HTTPError(503, "Employee data is not loaded")
+            
+            body = await self.read_body(receive)
+            status, payload = await handler(scope, body, *args)
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        
+        if isinstance(payload, str):
+            content, content_type = payload.encode(), b"text/plain; version=0.0.4"
+        else:
+            content, content_type = json.dumps(payload, default=_json_default).encode(), b"application/json"
+        
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type), (b"content-length", str(len(content)).encode())]
+        })
+        await send({"type": "http.response.body", "body": content})
+    
+    def resolve(self, method: str, path: str) -> Tuple[Optional[Callable], Tuple[int, ...], bool]:
+        """
+        The handler and integer path parameters of a request, and whether the
+        path exists under another method
+        """
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path.rstrip("/") or "/")
+            if match is None:
+                continue
+            if route_method == method:
+                return handler, tuple(int(group) for group in match.groups()), True
+            allowed = True
+        return None, (), allowed
+    
+    async def read_body(self, receive: Callable) -> Optional[Dict[str, Any]]:
+        """
+        The JSON object of the request body (None if there is no body)
+        """
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, "Request body too large")
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        
+        if size == 0:
+            return None
+        try:
+            body = json.loads(b"".join(chunks))
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return body
+    
+    def require_body(self, body: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if body is None:
+            raise HTTPError(400, "Request body is required")
+        return body
+    
+    async def health(self, scope, body):
+        return 200, {"status": "ok", "roster_loaded": self.service.loaded,
+                     "roster_version": self.service.data_handler.roster.version}
+    
+    async def metrics(self, scope, body):
+        return 200, METRICS.to_prometheus()
+    
+    async def create_task(self, scope, body):
+        return 201, await self.run(self.service.create_task, self.require_body(body))
+    
+    async def get_task(self, scope, body, task_id):
+        return 200, self.service.get_task(task_id)
+    
+    async def recommend_task(self, scope, body, task_id):
+        query = parse_qs(scope.get("query_string", b"").decode())
+        k = _top_k(query.get("k", [DEFAULT_TOP_K])[0])
+        task = self.service.get_task(task_id)
+        
+        # Wait for the coalescer without holding a pool thread
+        matches = await asyncio.wrap_future(self.service.coalescer.submit(task))
+        return 200, {"task_id": task_id, "recommendations": top_k_records(matches, k)}
+    
+    async def recommend_many(self, scope, body):
+        return 200, {"results": await self.run(self.service.recommend_many, self.require_body(body))}
+    
+    async def assign_many(self, scope, body):
+        return 200, await self.run(self.service.assign_many, self.require_body(body))
+    
+    async def update_status(self, scope, body, task_id):
+        return 200, await self.run(self.service.update_status, task_id, self.require_body(body))
+    
+    async def reschedule(self, scope, body, task_id):
+        return 200, await self.run(self.service.reschedule, task_id, self.require_body(body))
+    
+    async def schedule(self, scope, body):
+        query = parse_qs(scope.get("query_string", b"").decode())
+        try:
+            horizon_days = float(query.get("horizon_days", [DEFAULT_HORIZON_DAYS])[0])
+        except ValueError:
+            raise HTTPError(400, "horizon_days must be a number")
+        return 200, await self.run(self.service.schedule, horizon_days)
+    
+    async def drain_schedule(self, scope, body):
+        return 200, await self.run(self.service.drain_schedule, body)
+    
+    async def employee_tasks(self, scope, body, employee_id):
+        return 200, {"employee_id": employee_id, "tasks": await self.run(self.service.employee_tasks, employee_id)}
+
+def create_app() -> TaskAPI:
+    """
+    The application `uvicorn api:create_app --factory` serves
+    
+    Built when the server starts rather than on import, so importing api
+    neither loads a roster nor opens the preference store.
+    """
+    return TaskAPI(TaskService(os.environ.get("TASKFLOW_ROSTER", DEFAULT_ROSTER_PATH)))
@@ -1,12 +1,23 @@
 import streamlit as st
 import pandas as pd
 import os
+import time
 from datetime import datetime, timedelta
+from instrumentation import METRICS
+from profiling import PROFILES, begin_rerun_profile, end_rerun_profile, profiling_enabled
 from data_handler import DataHandler
 from task_matcher import TaskMatcher
 from employee_management import EmployeeManagement
-from components import create_top_navigation, employee_card, task_card, display_leaderboard, display_ai_performance_metrics
-from employee_interface import login_screen, employee_task_dashboard, notifications_view
+from preference_store import PreferenceStore
+from match_coalescer import MatchCoalescer
+from scheduler import TaskScheduler, CapacityPlanner
+from timestamps import format_timestamp
+from view_models import ViewModels
+from components import create_top_navigation, employee_card, task_card, display_leaderboard, display_ai_performance_metrics, display_performance_dashboard, display_rerun_profiles
+
+# Start timing (and, in profiling mode, profiling) this script run for the Performance page
+rerun_started = time.perf_counter()
+begin_rerun_profile()
 
 # Setup page config 
 st.set_page_config(
@@ -26,27 +37,43 @@ if 'selected_employee' not in st.session_state:
 if 'task_to_assign' not in st.session_state:
     st.session_state.task_to_assign = None
     
-if 'employee_data_loaded' not in st.session_state:
-    st.session_state.employee_data_loaded = False
-    
-if 'tasks' not in st.session_state:
-    st.session_state.tasks = []
-    
-if 'task_counter' not in st.session_state:
-    st.session_state.task_counter = 1
-    
-if 'ai_predictions' not in st.session_state:
-    st.session_state.ai_predictions = []
+# Task versions this session last displayed, by TaskID (see seen_task_version)
+if 'rendered_task_versions' not in st.session_state:
+    st.session_state.rendered_task_versions = {}
 
 # Initialize app components
 @st.cache_resource
 def initialize_components():
     data_handler = DataHandler()
-    task_matcher = TaskMatcher()
-    employee_manager = EmployeeManagement()
-    return data_handler, task_matcher, employee_manager
+    
+    # All three share one copy-on-write roster (see roster.py)
+    task_matcher = TaskMatcher(roster=data_handler.roster)
+    employee_manager = EmployeeManagement(roster=data_handler.roster, preference_store=PreferenceStore())
+    
+    # Feed each completed task into the matcher's online learner
+    data_handler.add_completion_listener(task_matcher.learn_from_completed_task)
+    
+    # Respect the notification preferences employees save
+    data_handler.set_preference_provider(employee_manager.get_employee_preference)
+    
+    # Keep the matcher's capacity model current with task effort, and let it
+    # read working hours and preferred task types from the saved preferences
+    data_handler.add_task_listener(task_matcher.capacity.on_task_event)
+    task_matcher.capacity.use_preferences(employee_manager.preference_store)
+    
+    # AI matches requested by concurrent sessions are scored in batches
+    match_coalescer = MatchCoalescer(task_matcher)
+    
+    # Unassigned tasks queued in urgency order, and the overdue-risk outlook
+    task_scheduler = TaskScheduler(data_handler, task_matcher)
+    capacity_planner = CapacityPlanner(data_handler)
+    
+    # Derived per-section data, recomputed only when data_handler changes
+    view_models = ViewModels(data_handler)
+    return data_handler, task_matcher, employee_manager, match_coalescer, task_scheduler, capacity_planner, view_models
 
-data_handler, task_matcher, employee_manager = initialize_components()
+(data_handler, task_matcher, employee_manager, match_coalescer, task_scheduler, capacity_planner,
+ view_models) = initialize_components()
 
 # Function to change active section
 def change_section(section):
@@ -54,6 +81,18 @@ def change_section(section):
     st.session_state.selected_employee = None
     st.session_state.task_to_assign = None
 
+# Tasks are shared by every session, so a status update carries the Version of
+# the task as this session last displayed it, and is rejected (instead of
+# overwriting) if someone else changed the task in between
+def seen_task_version(task_id):
+    return st.session_state.rendered_task_versions.get(task_id)
+
+def remember_task_versions(tasks):
+    st.session_state.rendered_task_versions.update({task["TaskID"]: task["Version"] for task in tasks})
+
+def warn_task_conflict(task_id):
+    st.warning(f"Task #{task_id} was changed by someone else since it was shown. Review its current state and try again.")
+
 # Define navigation sections
 navigation_sections = [
     "Auto-Assign Task", 
@@ -63,7 +102,8 @@ navigation_sections = [
     "Performance Leaderboard", 
     "Employee Preferences",
     "Employee Access",
-    "AI Training"
+    "AI Training",
+    "Performance"
 ]
 
 # Create top navigation
@@ -72,13 +112,24 @@ create_top_navigation(navigation_sections, st.session_state.active_section, chan
 # Main title
 st.title("AI Employee Task Assignment System")
 
-# Load employee data if not loaded yet
-if not st.session_state.employee_data_loaded:
+def load_roster(file_path):
+    # Stream the roster in, reporting progress as chunks are parsed
+    progress_bar = st.progress(0.0, text="Loading employee data...")
+    
+    def report_progress(fraction, rows_loaded):
+        progress_bar.progress(fraction, text=f"Loading employee data... {rows_loaded:,} employees")
+    
+    loaded = data_handler.load_employee_data(file_path, progress_callback=report_progress)
+    progress_bar.empty()
+    return loaded
+
+# Load employee data if not loaded yet (the roster is shared by every session)
+if data_handler.employee_df is None:
     # Check if the file exists and load it
     default_file_path = "attached_assets/employee_positions_dataset.csv"
     
     if os.path.exists(default_file_path):
-        if data_handler.load_employee_data(default_file_path):
+        if load_roster(default_file_path):
             st.success("Employee data loaded successfully!")
             # Update the matcher and manager with employee data
             task_matcher.set_employee_data(data_handler.employee_df)
@@ -92,11 +143,22 @@ if not st.session_state.employee_data_loaded:
             with open("employee_data.csv", "wb") as f:
                 f.write(uploaded_file.getbuffer())
             
-            if data_handler.load_employee_data("employee_data.csv"):
+            if load_roster("employee_data.csv"):
                 st.success("Employee data loaded successfully!")
                 # Update the matcher and manager with employee data
                 task_matcher.set_employee_data(data_handler.employee_df)
                 employee_manager.set_employee_data(data_handler.employee_df)
+elif data_handler.roster_file_changed():
+    # An updated roster was dropped in place: apply only the changed employees
+    roster_changes = data_handler.reload_employee_data()
+    
+    if roster_changes is not None:
+        task_matcher.apply_roster_delta(data_handler.employee_df, roster_changes)
+        employee_manager.set_employee_data(data_handler.employee_df)
+        st.toast(
+            f"Employee data updated: {len(roster_changes['inserted'])} added, "
+            f"{len(roster_changes['updated'])} changed, {len(roster_changes['deleted'])} removed"
+        )
 
 # Main content based on active section
 if st.session_state.active_section == "Auto-Assign Task":
@@ -127,6 +189,16 @@ if st.session_state.active_section == "Auto-Assign Task":
                 "Due Date", 
                 datetime.now().date() + timedelta(days=7)
             )
+        
+        cols = st.columns(2)
+        with cols[0]:
+            roles = sorted(data_handler.employee_df['Role'].unique().tolist()) if data_handler.employee_df is not None else []
+            task_type = st.selectbox("Task Type", ["Any"] + roles,
+                                     help="Employees who prefer this type of task are favoured")
+        
+        with cols[1]:
+            estimated_hours = st.number_input("Estimated Effort (hours)", min_value=0.0, value=0.0, step=1.0,
+                                              help="0 uses the default estimate")
             
         auto_assign = st.checkbox("Auto-assign to best matching employee", value=True,
                                 help="When enabled, the task will be automatically assigned to the best available employee")
@@ -139,7 +211,9 @@ if st.session_state.active_section == "Auto-Assign Task":
             description=task_description,
             required_skills=required_skills,
             due_date=due_date.strftime("%Y-%m-%d") if due_date else None,
-            priority=priority
+            priority=priority,
+            task_type=None if task_type == "Any" else task_type,
+            estimated_hours=estimated_hours or None
         )
         
         # Find matching employees
@@ -153,7 +227,11 @@ if st.session_state.active_section == "Auto-Assign Task":
             # Get the best match using AI recommendation
             best_match = task_matcher.recommend_best_match(
                 required_skills=required_skills,
-                experience_preference=None if experience_preference == "Any" else experience_preference
+                experience_preference=None if experience_preference == "Any" else experience_preference,
+                priority=priority,
+                due_date=due_date.strftime("%Y-%m-%d") if due_date else None,
+                task_type=None if task_type == "Any" else task_type,
+                estimated_hours=estimated_hours or None
             )
             
             # Auto-assign if enabled
@@ -169,10 +247,6 @@ if st.session_state.active_section == "Auto-Assign Task":
                 if data_handler.assign_task(task_id, best_match['ID'], ai_powered, match_score):
                     st.success(f"✅ Task automatically assigned to {best_match['Name']} ({best_match['MatchPercentage']:.1f}% match)")
                     
-                    # Update the employee data
-                    task_matcher.set_employee_data(data_handler.employee_df)
-                    employee_manager.set_employee_data(data_handler.employee_df)
-                    
                     # Show assignment details
                     st.info(f"🤖 **AI-Powered Assignment**" if ai_powered else "**Best Match Assignment**")
                     with st.expander("Assignment Details"):
@@ -181,6 +255,8 @@ if st.session_state.active_section == "Auto-Assign Task":
                         st.write(f"**Skills:** {', '.join(best_match['Skills'])}")
                         st.write(f"**Experience:** {best_match['Experience']}")
                         st.write(f"**Current Workload:** {best_match['TaskCount']} tasks")
+                        if 'RolePreferenceEffect' in best_match:
+                            st.write(f"**Task Type Preference:** {(best_match['RolePreferenceEffect'] - 1) * 100:+.0f}% score")
             
             # If not auto-assigning, show all matching employees
             elif not auto_assign:
@@ -210,9 +286,6 @@ if st.session_state.active_section == "Auto-Assign Task":
                             # Assign the task
                             if data_handler.assign_task(task_id, best_match['ID'], ai_powered, match_score):
                                 st.success(f"Task assigned to {best_match['Name']}")
-                                # Update the employee data in the matcher and manager
-                                task_matcher.set_employee_data(data_handler.employee_df)
-                                employee_manager.set_employee_data(data_handler.employee_df)
                                 st.rerun()
             
             # Display all matches
@@ -244,9 +317,6 @@ if st.session_state.active_section == "Auto-Assign Task":
                             match_score = employee['MatchPercentage'] / 100.0 if 'MatchPercentage' in employee else 0.0
                             if data_handler.assign_task(task_id, employee['ID'], False, match_score):
                                 st.success(f"Task assigned to {employee['Name']}")
-                                # Update the employee data in the matcher and manager
-                                task_matcher.set_employee_data(data_handler.employee_df)
-                                employee_manager.set_employee_data(data_handler.employee_df)
                                 st.rerun()
                     
                     st.divider()
@@ -281,38 +351,30 @@ elif st.session_state.active_section == "View All Employees":
     
     if data_handler.employee_df is not None:
         # Filters
+        filter_options = view_models.employee_filter_options()
         with st.expander("Filters", expanded=False):
             cols = st.columns(3)
             
             with cols[0]:
                 filter_role = st.multiselect(
                     "Filter by Role",
-                    options=data_handler.employee_df['Role'].unique().tolist()
+                    options=filter_options['Role']
                 )
             
             with cols[1]:
                 filter_experience = st.multiselect(
                     "Filter by Experience",
-                    options=data_handler.employee_df['Experience'].unique().tolist()
+                    options=filter_options['Experience']
                 )
             
             with cols[2]:
                 filter_status = st.multiselect(
                     "Filter by Status",
-                    options=data_handler.employee_df['Status'].unique().tolist()
+                    options=filter_options['Status']
                 )
         
         # Apply filters
-        filtered_df = data_handler.employee_df.copy()
-        
-        if filter_role:
-            filtered_df = filtered_df[filtered_df['Role'].isin(filter_role)]
-        
-        if filter_experience:
-            filtered_df = filtered_df[filtered_df['Experience'].isin(filter_experience)]
-        
-        if filter_status:
-            filtered_df = filtered_df[filtered_df['Status'].isin(filter_status)]
+        filtered_df = view_models.filtered_employees(filter_role, filter_experience, filter_status)
         
         # Display employees
         st.write(f"Showing {len(filtered_df)} employees")
@@ -327,7 +389,8 @@ elif st.session_state.active_section == "View Assigned Tasks":
     st.header("Assigned Tasks")
     
     # Get all tasks
-    all_tasks = data_handler.get_all_tasks()
+    task_overview = view_models.task_overview()
+    all_tasks = task_overview["all"]
     
     if not all_tasks:
         st.info("No tasks have been assigned yet.")
@@ -340,9 +403,29 @@ elif st.session_state.active_section == "View Assigned Tasks":
         )
         
         # Apply filters
-        filtered_tasks = all_tasks
-        if task_status_filter:
-            filtered_tasks = [task for task in all_tasks if task["Status"] in task_status_filter]
+        filtered_tasks = view_models.tasks_with_status(task_status_filter)
+        
+        # Bulk auto-assignment of the unassigned tasks, most urgent first, to employees with capacity
+        queued_count = len(task_scheduler.queue)
+        if queued_count and st.button(f"Auto-assign {queued_count} unassigned tasks by urgency"):
+            assigned = task_scheduler.drain()
+            # A toast outlives the rerun below, unlike st.success
+            st.toast(f"Assigned {len(assigned)} tasks; {len(task_scheduler.queue)} wait for capacity")
+            st.rerun()
+        
+        task_scheduler.auto_drain = st.checkbox(
+            "Assign waiting tasks automatically as capacity frees up", value=task_scheduler.auto_drain,
+            help="Employees take on new tasks while their preferred weekly hours leave room for the task's effort"
+        )
+        
+        with st.expander("Capacity outlook"):
+            capacity_plan = capacity_planner.plan()
+            if len(capacity_plan) == 0:
+                st.info("No active assigned tasks.")
+            else:
+                capacity_plan["ProjectedFree"] = capacity_plan["ProjectedFree"].map(format_timestamp)
+                capacity_plan["OverdueRisk"] = (capacity_plan["OverdueRisk"] * 100).round(1)
+                st.dataframe(capacity_plan, hide_index=True)
         
         # Display tasks
         st.write(f"Showing {len(filtered_tasks)} tasks")
@@ -350,7 +433,8 @@ elif st.session_state.active_section == "View Assigned Tasks":
         for task in filtered_tasks:
             # Handler for status change
             def update_task_status(task_id, new_status, progress=None):
-                if data_handler.update_task_status(task_id, new_status, progress):
+                if data_handler.update_task_status(task_id, new_status, progress,
+                                                   expected_version=seen_task_version(task_id)):
                     st.success(f"Task #{task_id} status updated to {new_status}")
                     
                     # If task is completed, update AI prediction success
@@ -358,21 +442,25 @@ elif st.session_state.active_section == "View Assigned Tasks":
                         # Mark AI prediction as successful
                         data_handler.update_ai_prediction_success(task_id, True)
                     
-                    task_matcher.set_employee_data(data_handler.employee_df)
-                    employee_manager.set_employee_data(data_handler.employee_df)
                     st.rerun()
+                else:
+                    warn_task_conflict(task_id)
             
             task_card(
                 task, 
                 data_handler.employee_df, 
                 on_status_change=update_task_status
             )
+        
+        remember_task_versions(filtered_tasks)
 
 elif st.session_state.active_section == "Performance Leaderboard":
     st.header("Performance Leaderboard")
     
-    # Get leaderboard data
-    leaderboard_data = data_handler.get_leaderboard_data()
+    # Get leaderboard data for the selected period
+    leaderboard_periods = {"All Time": None, "This Week": "week", "This Month": "month"}
+    leaderboard_period = st.radio("Period", list(leaderboard_periods), horizontal=True)
+    leaderboard_data = view_models.leaderboard(leaderboard_periods[leaderboard_period])
     
     # Display leaderboard
     display_leaderboard(leaderboard_data)
@@ -380,12 +468,15 @@ elif st.session_state.active_section == "Performance Leaderboard":
 elif st.session_state.active_section == "Employee Preferences":
     st.header("Employee Preferences")
     
-    if data_handler.employee_df is not None:
+    # One roster snapshot for the whole page
+    roster_df = data_handler.employee_df
+    
+    if roster_df is not None:
         # Employee selection
         employee_id = st.selectbox(
             "Select Employee",
-            options=data_handler.employee_df['ID'].tolist(),
-            format_func=lambda x: f"{data_handler.employee_df[data_handler.employee_df['ID'] == x].iloc[0]['Name']} (ID: {x})"
+            options=roster_df['ID'].tolist(),
+            format_func=lambda x: f"{data_handler.employee_contacts[x][0]} (ID: {x})"
         )
         
         if employee_id:
@@ -406,7 +497,7 @@ elif st.session_state.active_section == "Employee Preferences":
                     )
                     
                     # Preferred task types
-                    all_roles = data_handler.employee_df['Role'].unique().tolist()
+                    all_roles = roster_df['Role'].unique().tolist()
                     preferred_tasks = st.multiselect(
                         "Preferred Task Types",
                         options=all_roles,
@@ -441,6 +532,11 @@ elif st.session_state.active_section == "Employee Preferences":
                         
                         st.success(f"Preferences saved for {employee['Name']}")
                 
+                # How preferred task types have shifted recommendations so far
+                effects = task_matcher.capacity.preference_effect_summary()
+                st.caption(f"Task type preferences boosted {effects['boosted']} and lowered {effects['penalized']} "
+                           f"recommendations (average score multiplier {effects['mean_multiplier']:.2f})")
+                
                 # Skills management
                 st.subheader("Skills Management")
                 
@@ -464,8 +560,10 @@ elif st.session_state.active_section == "Employee Preferences":
                         if st.button("Add Skill"):
                             if employee_manager.update_employee_skill(employee_id, new_skill, add=True):
                                 st.success(f"Added {new_skill} to {employee['Name']}'s skills")
-                                # Update employee data in task matcher
-                                task_matcher.set_employee_data(data_handler.employee_df)
+                                # Re-index only this employee's skills in the matcher
+                                task_matcher.apply_roster_delta(
+                                    data_handler.employee_df, {'inserted': [], 'updated': [employee_id], 'deleted': []}
+                                )
                                 st.rerun()
                         
                         # Remove skill
@@ -477,8 +575,10 @@ elif st.session_state.active_section == "Employee Preferences":
                         if st.button("Remove Skill"):
                             if employee_manager.update_employee_skill(employee_id, skill_to_remove, add=False):
                                 st.success(f"Removed {skill_to_remove} from {employee['Name']}'s skills")
-                                # Update employee data in task matcher
-                                task_matcher.set_employee_data(data_handler.employee_df)
+                                # Re-index only this employee's skills in the matcher
+                                task_matcher.apply_roster_delta(
+                                    data_handler.employee_df, {'inserted': [], 'updated': [employee_id], 'deleted': []}
+                                )
                                 st.rerun()
             else:
                 st.error("Employee not found")
@@ -486,6 +586,9 @@ elif st.session_state.active_section == "Employee Preferences":
         st.info("No employee data available. Please load employee data first.")
 
 elif st.session_state.active_section == "Employee Access":
+    # Section-only module: loaded the first time the portal is opened
+    from employee_interface import login_screen, employee_task_dashboard, notifications_view
+    
     st.header("Employee Portal")
     
     # Initialize employee login session state
@@ -525,7 +628,8 @@ elif st.session_state.active_section == "Employee Access":
                     
                     # Create handler for task updates
                     def handle_task_update(task_id, new_status, progress):
-                        if data_handler.update_task_status(task_id, new_status, progress):
+                        if data_handler.update_task_status(task_id, new_status, progress,
+                                                           expected_version=seen_task_version(task_id)):
                             st.success(f"Task #{task_id} status updated to {new_status}")
                             
                             # If task is completed, update AI prediction success
@@ -534,6 +638,8 @@ elif st.session_state.active_section == "Employee Access":
                                 data_handler.update_ai_prediction_success(task_id, True)
                                 
                             st.rerun()
+                        else:
+                            warn_task_conflict(task_id)
                     
                     # Display employee dashboard
                     employee_task_dashboard(
@@ -542,19 +648,21 @@ elif st.session_state.active_section == "Employee Access":
                         tasks=employee_tasks,
                         on_task_update=handle_task_update
                     )
+                    remember_task_versions(employee_tasks)
             
             with tabs[1]:
                 if st.session_state.get("employee_view", "") == "Notifications":
-                    # Filter emails for this employee
-                    if 'sent_emails' in st.session_state:
-                        employee_email = employee_data.get('Email', '')
-                        employee_emails = [
-                            email for email in st.session_state.sent_emails 
-                            if email.get('to') == employee_email
-                        ]
-                        notifications_view(employee_emails)
-                    else:
-                        st.info("No notifications available.")
+                    # Read this employee's notifications from the inbox index
+                    employee_email = employee_data.get('Email', '')
+                    inbox = data_handler.notification_inbox
+                    data_handler.compact_notifications(recipient=employee_email)
+                    
+                    notifications_view(
+                        fetch_page=lambda page, page_size: inbox.page(employee_email, page, page_size),
+                        total_count=inbox.count(employee_email),
+                        unread_count=inbox.unread_count(employee_email)
+                    )
+                    inbox.mark_read(employee_email)
             
             with tabs[2]:
                 if st.button("Logout", key="employee_logout"):
@@ -578,8 +686,9 @@ elif st.session_state.active_section == "AI Training":
     """)
     
     # Check if we have task data for training
-    all_tasks = data_handler.get_all_tasks()
-    completed_tasks = [task for task in all_tasks if task["Status"] == "Completed"]
+    task_overview = view_models.task_overview()
+    all_tasks = task_overview["all"]
+    completed_tasks = task_overview["completed"]
     
     # Update task data in the task matcher
     task_matcher.set_tasks_data(data_handler.tasks_df)
@@ -610,6 +719,62 @@ elif st.session_state.active_section == "AI Training":
         st.warning(f"Need at least 5 completed tasks to train the ML model. Currently have {len(completed_tasks)}.")
         st.info("The system will automatically use the Skill Similarity model until enough data is available.")
     
+    # Online learning controls
+    task_matcher.online_learning = st.checkbox(
+        "Online learning (learn from each completed task)",
+        value=task_matcher.online_learning,
+        help="Each task completion updates the model incrementally; updates are periodically compacted into the Random Forest"
+    )
+    
+    if task_matcher.online_learning:
+        ml_model = task_matcher.ml_model
+        ml_model.compaction_interval = st.number_input(
+            "Compact after this many completions",
+            min_value=1, max_value=1000, value=ml_model.compaction_interval, step=1
+        )
+        st.caption(f"Online samples: {len(ml_model.sample_targets)} · Pending updates since last compaction: {ml_model.pending_updates}")
+        
+        if ml_model.pending_updates > 0 and st.button("Compact Now"):
+            if ml_model.compact():
+                task_matcher.use_ml_model = True
+                st.success("Online updates folded into the AI model.")
+            else:
+                st.error("Need at least 5 completed tasks before compacting.")
+    
+    # Hyperparameter search section
+    st.subheader("Model Tuning")
+    st.write("Compare model families and settings on past completed tasks (each model is tested on tasks "
+             "completed after the ones it learned from) and switch to the best one.")
+    
+    tuning_folds = st.slider("Time-ordered evaluation folds", min_value=2, max_value=5, value=3)
+    if st.button("Tune AI Assignment Model"):
+        with st.spinner("Evaluating model configurations on all CPU cores..."):
+            tuning_results = task_matcher.tune_prediction_model(n_splits=tuning_folds)
+        if tuning_results is None:
+            st.error(f"Need at least {5 * (tuning_folds + 1)} completed tasks to tune the model with {tuning_folds} folds.")
+        else:
+            best = task_matcher.model_registry.promoted()
+            st.success(f"Promoted {best['family']} as model v{best['version']} "
+                       f"(NDCG@{best['k']} {best['ndcg_at_k']:.3f}, top-1 hit rate {best['hit_rate_at_1']:.1%})")
+            st.dataframe(tuning_results.assign(params=tuning_results['params'].astype(str)), hide_index=True)
+    
+    # Registered models, newest first
+    registered_models = task_matcher.model_registry.models()
+    if registered_models:
+        promoted_version = task_matcher.model_registry.promoted()['version']
+        with st.expander(f"Model registry ({len(registered_models)} models, v{promoted_version} served)"):
+            st.dataframe(pd.DataFrame([{
+                "Version": model['version'],
+                "Family": model['family'],
+                "Parameters": str(model['params']),
+                f"NDCG@{model['k']}": round(model['ndcg_at_k'], 3),
+                "Top-1 Hit Rate": round(model['hit_rate_at_1'], 3),
+                f"Top-{model['k']} Hit Rate": round(model['hit_rate_at_k'], 3),
+                "Training (s)": round(model['full_training_seconds'], 2),
+                "Latency (ms)": round(model['inference_ms'], 2),
+                "Registered": format_timestamp(model['registered_at'])
+            } for model in reversed(registered_models)]), hide_index=True)
+    
     # Model testing section
     st.subheader("Model Testing")
     
@@ -630,8 +795,8 @@ elif st.session_state.active_section == "AI Training":
             "Status": "Not Started"
         }
         
-        # Get AI matches
-        ai_matches = task_matcher.find_ai_matches(test_task)
+        # Get AI matches (batched with other sessions' concurrent requests)
+        ai_matches = match_coalescer.match(test_task)
         
         if ai_matches is not None and len(ai_matches) > 0:
             st.subheader("AI-Recommended Matches")
@@ -672,14 +837,8 @@ elif st.session_state.active_section == "AI Training":
     # AI Performance Metrics
     st.subheader("AI Performance Metrics")
     
-    # Get AI prediction data
-    ai_prediction_data = data_handler.get_ai_performance_data()
-    
-    # Get completed tasks for comparison
-    completed_tasks = [task for task in all_tasks if task.get("Status") == "Completed"]
-    
-    # Display AI metrics and visualizations
-    display_ai_performance_metrics(ai_prediction_data, completed_tasks)
+    # Display AI metrics and visualizations from the running aggregates
+    display_ai_performance_metrics(data_handler.ai_analytics.summary())
     
     # Model explanation
     with st.expander("How the AI Models Work"):
@@ -720,51 +879,21 @@ elif st.session_state.active_section == "AI Training":
     if len(completed_tasks) > 0:
         st.write("Task completion time by employee (days):")
         
-        # Calculate average completion time per employee
-        completion_data = {}
-        for task in completed_tasks:
-            if 'Assigned_To' in task and task['Assigned_To'] is not None:
-                emp_id = task['Assigned_To']
-                assigned_date = task.get('Assigned_Date')
-                completion_date = task.get('Completion_Date')
-                
-                if assigned_date and completion_date:
-                    assigned_date = datetime.strptime(assigned_date, "%Y-%m-%d")
-                    completion_date = datetime.strptime(completion_date, "%Y-%m-%d")
-                    days_taken = (completion_date - assigned_date).days
-                    
-                    if emp_id not in completion_data:
-                        completion_data[emp_id] = []
-                    
-                    completion_data[emp_id].append(days_taken)
+        # Average completion time per employee
+        chart_df = view_models.average_completion_days()
         
-        if completion_data:
-            # Calculate averages
-            avg_completion = {emp_id: sum(days)/len(days) for emp_id, days in completion_data.items()}
-            
-            # Create chart data
-            chart_data = []
-            for emp_id, avg_days in avg_completion.items():
-                employee = employee_manager.get_employee_by_id(emp_id)
-                if employee:
-                    chart_data.append({
-                        "Employee": employee['Name'],
-                        "Average Days": avg_days
-                    })
-            
-            if chart_data:
-                chart_df = pd.DataFrame(chart_data)
-                st.bar_chart(chart_df.set_index("Employee"))
+        if len(chart_df) > 0:
+            st.bar_chart(chart_df.set_index("Employee"))
     else:
         st.info("Performance metrics will be available once tasks are completed.")
         
     # AI Prediction Metrics
     st.subheader("AI Recommendation Analysis")
     
-    # Get AI prediction data
-    prediction_data = data_handler.get_ai_performance_data()
+    # Get AI prediction aggregates
+    ai_analytics = data_handler.ai_analytics
     
-    if prediction_data:
+    if len(ai_analytics) > 0:
         # Calculate overall metrics
         ai_success_rate = data_handler.get_ai_success_rate() * 100
         
@@ -774,10 +903,30 @@ elif st.session_state.active_section == "AI Training":
         # Show the prediction history
         st.markdown("### AI Prediction History")
         
-        # Create a dataframe for visualization
-        evaluated_predictions = [p for p in prediction_data if p["success"] is not None]
-        
-        if not evaluated_predictions:
+        if ai_analytics.evaluated == 0:
             st.info("No AI predictions have been evaluated yet. Once tasks that were assigned by AI are completed, you'll see detailed performance metrics here.")
     else:
         st.info("No AI prediction data available yet. Use the AI-recommended assignments to generate performance data.")
+
+elif st.session_state.active_section == "Performance":
+    st.header("Performance")
+    
+    st.write("Call counts and latency of the instrumented DataHandler, TaskMatcher and model methods, across all sessions.")
+    
+    if st.button("Reset Metrics"):
+        METRICS.reset()
+    
+    display_performance_dashboard(
+        METRICS.summary(),
+        METRICS.slowest_reruns(),
+        METRICS.to_prometheus()
+    )
+    
+    st.subheader("Rerun Profiles")
+    if st.button("Clear Profiles"):
+        PROFILES.clear()
+    display_rerun_profiles(PROFILES.recent(), profiling_enabled())
+
+# Record how long this script run took (runs cut short by st.rerun are not recorded)
+METRICS.record_rerun(st.session_state.active_section, time.perf_counter() - rerun_started)
+end_rerun_profile(st.session_state.active_section)
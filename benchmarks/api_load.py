@@ -0,0 +1,277 @@
+"""
+Load test of the HTTP/JSON API
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.api_load --clients 64 --requests 100 --employees 10000
+
+Starts the API (api.TaskAPI) with uvicorn on a local port, backed by a
+synthetic roster, then has concurrent keep-alive clients create tasks, ask for
+top-k recommendations (single and batched), batch-assign, update statuses with
+compare-and-set and list employee tasks. Pass --url to load an already running
+server instead (it must have a roster loaded).
+
+Reports throughput and p50/p95/p99 latency per endpoint. Version conflicts
+(409) are expected under contention and counted; any other error response or
+failed connection makes the run exit with status 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+import streamlit.logger
+
+from benchmarks.synthetic import write_roster_csv, generate_tasks
+from match_coalescer import DEFAULT_MAX_BATCH, DEFAULT_MAX_LATENCY
+
+STATUSES = ["Not Started", "In Progress", "Completed", "Blocked"]
+
+class HTTPConnection:
+    """
+    Minimal HTTP/1.1 keep-alive client on asyncio streams (JSON bodies only)
+    """
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+    
+    async def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        
+        content = json.dumps(body).encode() if body is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(content)}\r\n\r\n")
+        self.writer.write(head.encode() + content)
+        await self.writer.drain()
+        
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        close = False
+        while True:
+            line = (await self.reader.readline()).strip()
+            if not line:
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            elif name.lower() == "connection" and value.strip().lower() == "close":
+                close = True
+        
+        payload = await self.reader.readexactly(length) if length else b""
+        if close:
+            await self.close()
+        return status, json.loads(payload) if payload else None
+    
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+class LoadStats:
+    """
+    Latencies and outcomes of every request, by endpoint
+    """
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.conflicts = 0
+        self.errors = []
+    
+    def record(self, endpoint: str, seconds: float, status: int, payload: Any) -> None:
+        self.latencies[endpoint].append(seconds)
+        if status == 409:
+            self.conflicts += 1
+        elif status >= 400:
+            self.errors.append(f"{endpoint}: HTTP {status} {payload}")
+
+async def timed_request(connection: HTTPConnection, stats: LoadStats, endpoint: str, method: str, path: str,
+                        body: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+    started = time.perf_counter()
+    try:
+        status, payload = await connection.request(method, path, body)
+    except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+        await connection.close()
+        stats.errors.append(f"{endpoint}: {type(e).__name__}: {e}")
+        return 0, None
+    stats.record(endpoint, time.perf_counter() - started, status, payload)
+    return status, payload
+
+async def client(host: str, port: int, requests: int, employee_ids: List[int], tasks: List[Dict[str, Any]],
+                 task_ids: List[int], batch_size: int, k: int, seed: int, stats: LoadStats) -> None:
+    """
+    One keep-alive connection issuing a random mix of API calls
+    
+    Every client adds the tasks it creates to the shared `task_ids`, so
+    clients assign and update each other's tasks and compare-and-set updates
+    really contend.
+    """
+    rng = random.Random(seed)
+    connection = HTTPConnection(host, port)
+    
+    try:
+        for _ in range(requests):
+            roll = rng.random()
+            
+            if roll < 0.2 or not task_ids:
+                task = rng.choice(tasks)
+                status, payload = await timed_request(connection, stats, "POST /tasks", "POST", "/tasks", {
+                    "description": task["Description"], "required_skills": task["Required_Skills"],
+                    "priority": task["Priority"]
+                })
+                if status == 201:
+                    task_ids.append(payload["TaskID"])
+            
+            elif roll < 0.45:
+                await timed_request(connection, stats, "GET /tasks/{id}/recommendations", "GET",
+                                    f"/tasks/{rng.choice(task_ids)}/recommendations?k={k}")
+            
+            elif roll < 0.55:
+                batch = [{"required_skills": task["Required_Skills"], "priority": task["Priority"]}
+                         for task in rng.sample(tasks, batch_size)]
+                await timed_request(connection, stats, "POST /recommendations", "POST", "/recommendations",
+                                    {"tasks": batch, "k": k})
+            
+            elif roll < 0.7:
+                # Half explicit assignments, half best-match auto-assignments
+                batch = []
+                for task_id in rng.sample(task_ids, min(batch_size, len(task_ids))):
+                    item = {"task_id": task_id}
+                    if rng.random() < 0.5:
+                        item["employee_id"] = rng.choice(employee_ids)
+                    batch.append(item)
+                await timed_request(connection, stats, "POST /assignments", "POST", "/assignments",
+                                    {"assignments": batch})
+            
+            elif roll < 0.9:
+                # Compare-and-set on the version this client last read
+                task_id = rng.choice(task_ids)
+                status, task = await timed_request(connection, stats, "GET /tasks/{id}", "GET", f"/tasks/{task_id}")
+                if status == 200:
+                    await timed_request(connection, stats, "PATCH /tasks/{id}/status", "PATCH",
+                                        f"/tasks/{task_id}/status",
+                                        {"status": rng.choice(STATUSES), "expected_version": task["Version"]})
+            
+            else:
+                await timed_request(connection, stats, "GET /employees/{id}/tasks", "GET",
+                                    f"/employees/{rng.choice(employee_ids)}/tasks")
+    finally:
+        await connection.close()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(roster_path: str, port: int, workers: Optional[int], max_batch: int,
+                 max_latency_ms: float) -> Any:
+    """
+    Serve a TaskAPI on `roster_path` with uvicorn in a background thread;
+    returns the server and the app
+    """
+    import uvicorn
+    from api import TaskAPI, TaskService
+    
+    app = TaskAPI(TaskService(roster_path, max_batch, max_latency_ms), max_workers=workers)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    
+    # Wait for the roster to load and the socket to open
+    deadline = time.time() + 300
+    while not server.started:
+        if time.time() > deadline or not thread.is_alive():
+            raise RuntimeError("API server did not start")
+        time.sleep(0.05)
+    return server, app
+
+async def run_load(host: str, port: int, args: argparse.Namespace, stats: LoadStats) -> float:
+    connection = HTTPConnection(host, port)
+    status, health = await connection.request("GET", "/health")
+    await connection.close()
+    if status != 200 or not health["roster_loaded"]:
+        raise RuntimeError(f"API at {host}:{port} is not ready: {health}")
+    
+    employee_ids = list(range(1, args.employees + 1))
+    tasks = generate_tasks(256, seed=args.seed)
+    
+    task_ids = []
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, args.requests, employee_ids, tasks, task_ids, args.batch_size, args.k, args.seed + i, stats)
+        for i in range(args.clients)
+    ))
+    return time.perf_counter() - started
+
+def report(stats: LoadStats, elapsed: float) -> None:
+    total = sum(len(latencies) for latencies in stats.latencies.values())
+    print(f"{total} requests in {elapsed:.2f}s ({total / elapsed:,.0f} req/s), "
+          f"{stats.conflicts} version conflicts, {len(stats.errors)} errors", file=sys.stderr)
+    print(f"{'endpoint':<36}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}", file=sys.stderr)
+    for endpoint, latencies in sorted(stats.latencies.items()):
+        p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+        print(f"{endpoint:<36}{len(latencies):>8}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}", file=sys.stderr)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=64, help="Concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per client")
+    parser.add_argument("--employees", type=int, default=10000,
+                        help="Synthetic roster size (with --url: the server roster's highest employee ID)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Tasks per batched recommendation or assignment")
+    parser.add_argument("--k", type=int, default=5, help="Recommendations per task")
+    parser.add_argument("--workers", type=int, default=None, help="API thread pool size")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH,
+                        help="Recommendation requests scored per batch (1 disables batching)")
+    parser.add_argument("--max-latency-ms", type=float, default=DEFAULT_MAX_LATENCY * 1000,
+                        help="Longest a recommendation request waits for its batch to fill")
+    parser.add_argument("--url", default=None, help="Load a running server, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    
+    # Bare-mode Streamlit logs a warning for every st.* call outside `streamlit run`
+    streamlit.logger.set_log_level("error")
+    
+    stats = LoadStats()
+    if args.url:
+        url = urlsplit(args.url)
+        elapsed = asyncio.run(run_load(url.hostname, url.port or 80, args, stats))
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            roster_path = write_roster_csv(os.path.join(workdir, "api_roster.csv"), args.employees, args.seed)
+            port = free_port()
+            server, app = start_server(roster_path, port, args.workers, args.max_batch, args.max_latency_ms)
+            try:
+                elapsed = asyncio.run(run_load("127.0.0.1", port, args, stats))
+            finally:
+                server.should_exit = True
+    
+    report(stats, elapsed)
+    if not args.url:
+        coalescer = app.service.coalescer
+        print(f"{coalescer.batched_tasks} recommendations scored in {coalescer.batches} batches "
+              f"(average {coalescer.average_batch_size():.1f} tasks)", file=sys.stderr)
+    
+    if stats.errors:
+        print(f"FAILED: {len(stats.errors)} errors", file=sys.stderr)
+        for error in stats.errors[:20]:
+            print(f"  {error}", file=sys.stderr)
+        return 1
+    
+    print("OK: no errors", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
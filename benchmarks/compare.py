@@ -0,0 +1,49 @@
+"""
+Compare two benchmark result files produced by `python -m benchmarks.run`
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 1.2
+
+Exits with status 1 if any benchmark's p50 or p95 got slower than the threshold ratio.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+METRICS = ["p50_ms", "p95_ms", "p99_ms", "peak_memory_mb"]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Slowdown ratio reported as a regression (default: 1.2)")
+    args = parser.parse_args(argv)
+    
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    
+    baseline_results = {(r["benchmark"], r["rows"]): r for r in baseline["results"]}
+    regressions = 0
+    
+    print(f"baseline {baseline['meta'].get('revision')} -> candidate {candidate['meta'].get('revision')}")
+    for result in candidate["results"]:
+        key = (result["benchmark"], result["rows"])
+        if key not in baseline_results:
+            continue
+        
+        before = baseline_results[key]
+        ratios = {metric: result[metric] / before[metric] if before[metric] else float("inf")
+                  for metric in METRICS}
+        regressed = ratios["p50_ms"] > args.threshold or ratios["p95_ms"] > args.threshold
+        regressions += regressed
+        
+        print(f"{'REGRESSED' if regressed else 'ok':<10} {key[0]:<40} {key[1]:>9,} rows  " +
+              "  ".join(f"{metric}={ratio:.2f}x" for metric, ratio in ratios.items()))
+    
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Benchmark suite for matching, prediction and DataHandler operations
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.run --sizes 1000,10000,100000 --output bench.json
+
+Every benchmark reports p50/p95/p99 latency and peak traced memory for each
+roster size; compare two result files with `python -m benchmarks.compare`.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import warnings
+import numpy as np
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+import streamlit as st
+import streamlit.logger
+
+from benchmarks.synthetic import write_roster_csv, generate_tasks
+from data_handler import DataHandler
+from match_coalescer import MatchCoalescer
+from task_matcher import TaskMatcher
+from task_prediction_model import TaskAssignmentModel, SkillSimilarityModel
+
+# Number of completed tasks used to train the assignment model
+TRAINING_TASKS = 200
+
+# Tasks matched at once by the batched and coalesced matching benchmarks
+CONCURRENT_REQUESTS = 32
+
+class BenchContext:
+    """
+    Shared state for all benchmarks of one roster size
+    """
+    def __init__(self, rows: int, workdir: str, seed: int = 42):
+        self.rows = rows
+        self.workdir = workdir
+        self.rng = random.Random(seed)
+        
+        reset_session_state()
+        
+        roster_path = write_roster_csv(os.path.join(workdir, f"roster_{rows}.csv"), rows, seed)
+        self.data_handler = DataHandler()
+        if not self.data_handler.load_employee_data(roster_path):
+            raise RuntimeError(f"Could not load synthetic roster {roster_path}")
+        self.employee_df = self.data_handler.employee_df
+        self.employee_ids = self.employee_df['ID'].tolist()
+        
+        self.matcher = TaskMatcher(self.employee_df)
+        self.matcher.set_employee_data(self.employee_df)
+        
+        self.tasks = generate_tasks(256, seed=seed)
+        self.skills = sorted({skill for task in self.tasks for skill in task['Required_Skills']})
+        
+        # Completed history for training the ML model
+        for task in generate_tasks(TRAINING_TASKS, seed=seed + 1):
+            task_id = self.data_handler.add_task(task['Description'], task['Required_Skills'], priority=task['Priority'])
+            self.data_handler.assign_task(task_id, self.rng.choice(self.employee_ids))
+            self.data_handler.update_task_status(task_id, "Completed")
+        
+        self.ml_model = self.new_ml_model()
+        self.ml_model.train_model(self.employee_df, self.data_handler.tasks_df)
+        
+        self.similarity_model = SkillSimilarityModel()
+        self.similarity_model.fit(self.employee_df)
+    
+    def new_ml_model(self) -> TaskAssignmentModel:
+        model = TaskAssignmentModel()
+        model.model_path = os.path.join(self.workdir, "task_assignment_model.pkl")
+        return model
+    
+    def task(self) -> Dict[str, Any]:
+        return self.rng.choice(self.tasks)
+    
+    def new_assigned_task(self) -> int:
+        task = self.task()
+        task_id = self.data_handler.add_task(task['Description'], task['Required_Skills'], priority=task['Priority'])
+        self.data_handler.assign_task(task_id, self.rng.choice(self.employee_ids))
+        return task_id
+
+def reset_session_state() -> None:
+    """
+    Clear the (bare-mode) Streamlit session state between roster sizes
+    """
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+
+# Each benchmark builds (setup, call) from the context: setup runs untimed
+# before every call and returns the arguments the timed call receives
+def _bench_find_matching(ctx: BenchContext):
+    return (lambda: (ctx.task()['Required_Skills'],),
+            lambda skills: ctx.matcher.find_matching_employees(skills))
+
+def _bench_find_by_skill(ctx: BenchContext):
+    return (lambda: (ctx.rng.choice(ctx.skills),),
+            lambda skill: ctx.matcher.find_employees_by_skill(skill))
+
+def _bench_recommend(ctx: BenchContext):
+    return (lambda: (ctx.task()['Required_Skills'],),
+            lambda skills: ctx.matcher.recommend_best_match(skills))
+
+def _bench_similarity_fit(ctx: BenchContext):
+    return (lambda: (SkillSimilarityModel(),),
+            lambda model: model.fit(ctx.employee_df))
+
+def _bench_similarity_predict(ctx: BenchContext):
+    return (lambda: (ctx.task(),),
+            lambda task: ctx.similarity_model.predict(task, ctx.employee_df))
+
+def _bench_train_model(ctx: BenchContext):
+    return (lambda: (ctx.new_ml_model(),),
+            lambda model: model.train_model(ctx.employee_df, ctx.data_handler.tasks_df))
+
+def _bench_model_predict(ctx: BenchContext):
+    return (lambda: (ctx.task(),),
+            lambda task: ctx.ml_model.predict(task, ctx.employee_df))
+
+def _bench_model_predict_many(ctx: BenchContext):
+    return (lambda: ([ctx.task() for _ in range(CONCURRENT_REQUESTS)],),
+            lambda tasks: ctx.ml_model.predict_many(tasks, ctx.employee_df))
+
+def _ml_matcher(ctx: BenchContext) -> TaskMatcher:
+    """
+    A matcher serving predictions from the context's trained model
+    """
+    matcher = TaskMatcher(ctx.employee_df)
+    matcher.set_employee_data(ctx.employee_df)
+    matcher.ml_model = ctx.ml_model
+    matcher.use_ml_model = True
+    return matcher
+
+def _bench_ai_matches_sequential(ctx: BenchContext):
+    matcher = _ml_matcher(ctx)
+    return (lambda: ([ctx.task() for _ in range(CONCURRENT_REQUESTS)],),
+            lambda tasks: [matcher.find_ai_matches(task) for task in tasks])
+
+def _bench_ai_matches_batched(ctx: BenchContext):
+    matcher = _ml_matcher(ctx)
+    return (lambda: ([ctx.task() for _ in range(CONCURRENT_REQUESTS)],),
+            lambda tasks: matcher.find_ai_matches_many(tasks))
+
+def _bench_ai_matches_coalesced(ctx: BenchContext):
+    coalescer = MatchCoalescer(_ml_matcher(ctx), max_batch=CONCURRENT_REQUESTS)
+    
+    def call(tasks):
+        # Every request on its own thread, as concurrent sessions or API requests would be
+        threads = [threading.Thread(target=coalescer.match, args=(task,)) for task in tasks]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    
+    return (lambda: ([ctx.task() for _ in range(CONCURRENT_REQUESTS)],), call)
+
+def _bench_assign_task(ctx: BenchContext):
+    def setup():
+        task = ctx.task()
+        task_id = ctx.data_handler.add_task(task['Description'], task['Required_Skills'], priority=task['Priority'])
+        return task_id, ctx.rng.choice(ctx.employee_ids)
+    return setup, lambda task_id, employee_id: ctx.data_handler.assign_task(task_id, employee_id)
+
+def _bench_update_status(ctx: BenchContext):
+    return (lambda: (ctx.new_assigned_task(),),
+            lambda task_id: ctx.data_handler.update_task_status(task_id, "Completed"))
+
+def _bench_leaderboard(ctx: BenchContext):
+    return (lambda: (),
+            lambda: ctx.data_handler.get_leaderboard_data())
+
+BENCHMARKS = {
+    "TaskMatcher.find_matching_employees": _bench_find_matching,
+    "TaskMatcher.find_employees_by_skill": _bench_find_by_skill,
+    "TaskMatcher.recommend_best_match": _bench_recommend,
+    "SkillSimilarityModel.fit": _bench_similarity_fit,
+    "SkillSimilarityModel.predict": _bench_similarity_predict,
+    "TaskAssignmentModel.train_model": _bench_train_model,
+    "TaskAssignmentModel.predict": _bench_model_predict,
+    f"TaskAssignmentModel.predict_many x{CONCURRENT_REQUESTS}": _bench_model_predict_many,
+    f"TaskMatcher.find_ai_matches x{CONCURRENT_REQUESTS} sequential": _bench_ai_matches_sequential,
+    f"TaskMatcher.find_ai_matches_many x{CONCURRENT_REQUESTS}": _bench_ai_matches_batched,
+    f"MatchCoalescer.match x{CONCURRENT_REQUESTS} concurrent": _bench_ai_matches_coalesced,
+    "DataHandler.assign_task": _bench_assign_task,
+    "DataHandler.update_task_status": _bench_update_status,
+    "DataHandler.get_leaderboard_data": _bench_leaderboard,
+}
+
+def measure(setup: Callable[[], Tuple], call: Callable[..., Any], repeat: int,
+            time_budget: float) -> Tuple[List[float], int]:
+    """
+    Time `call` up to `repeat` times (stopping early once `time_budget` seconds
+    are spent), then trace one more call to get its peak memory
+    
+    Returns the latency samples in seconds and the peak traced bytes.
+    """
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat:
+        args = setup()
+        t0 = time.perf_counter()
+        call(*args)
+        samples.append(time.perf_counter() - t0)
+        if time.perf_counter() - started > time_budget:
+            break
+    
+    args = setup()
+    tracemalloc.start()
+    try:
+        call(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return samples, peak
+
+def summarize(name: str, rows: int, samples: List[float], peak_bytes: int) -> Dict[str, Any]:
+    """
+    Build the JSON record of one benchmark run
+    """
+    latencies_ms = np.asarray(samples) * 1000.0
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "benchmark": name,
+        "rows": rows,
+        "samples": len(samples),
+        "mean_ms": round(float(latencies_ms.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "peak_memory_mb": round(peak_bytes / (1024 * 1024), 4)
+    }
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(sizes: List[int], names: List[str], repeat: int, time_budget: float) -> Dict[str, Any]:
+    """
+    Run the selected benchmarks for every roster size
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in sizes:
+            print(f"Preparing {rows:,}-row roster...", file=sys.stderr)
+            ctx = BenchContext(rows, workdir)
+            for name in names:
+                setup, call = BENCHMARKS[name](ctx)
+                samples, peak = measure(setup, call, repeat, time_budget)
+                record = summarize(name, rows, samples, peak)
+                results.append(record)
+                print(f"  {name:<40} p50={record['p50_ms']:>10.3f}ms  p95={record['p95_ms']:>10.3f}ms  "
+                      f"p99={record['p99_ms']:>10.3f}ms  peak={record['peak_memory_mb']:>8.2f}MB", file=sys.stderr)
+    
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "time_budget_s": time_budget
+        },
+        "results": results
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="Comma-separated roster sizes, up to 1000000 (default: 1000,10000)")
+    parser.add_argument("--benchmarks", default=None,
+                        help="Comma-separated benchmark names (default: all); see --list")
+    parser.add_argument("--repeat", type=int, default=50, help="Maximum timed calls per benchmark")
+    parser.add_argument("--time-budget", type=float, default=5.0,
+                        help="Stop repeating a benchmark after this many seconds")
+    parser.add_argument("--output", default=None, help="Write JSON results to this file (default: stdout)")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    args = parser.parse_args(argv)
+    
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    
+    names = args.benchmarks.split(",") if args.benchmarks else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    
+    # Bare-mode Streamlit warns on every session_state access
+    streamlit.logger.set_log_level("error")
+    # Small synthetic histories trigger sklearn's "too many classes" warnings
+    warnings.filterwarnings("ignore", category=UserWarning)
+    
+    report = run([int(size) for size in args.sizes.split(",")], names, args.repeat, args.time_budget)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
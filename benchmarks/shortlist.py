@@ -0,0 +1,139 @@
+"""
+Candidate shortlist benchmark: ML matching latency and recall loss
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.shortlist --sizes 1000,10000,100000 --shortlist 50,200,500,2000
+
+For each roster size, every task is matched with TaskMatcher.find_ai_matches
+with the shortlist disabled (full scoring, the reference), with every eligible
+employee shortlisted ("all") and once per shortlist size. Reports p50/p95
+latency and two recall@k figures, each the fraction of the shortlisted top k
+that full scoring also ranks in its top k:
+
+- recall: against the full ranking of everyone
+- eligible recall: against the full ranking of the employees the retrieval
+  rules admit (at least one required skill, room for the task's effort), so
+  it isolates the loss from the shortlist size and from scoring fewer rows
+
+An employee counts as a hit if their full-scoring score reaches the k-th best
+full score, so ties at the cut-off are not misses.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import warnings
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+import streamlit.logger
+
+from benchmarks.run import BenchContext
+from benchmarks.synthetic import generate_tasks
+from task_matcher import TaskMatcher
+
+def ml_matcher(ctx: BenchContext, use_shortlist: bool, shortlist_size: Optional[int] = None) -> TaskMatcher:
+    """
+    A matcher serving the context's trained model with the given shortlist settings
+    """
+    matcher = TaskMatcher(ctx.employee_df)
+    matcher.set_employee_data(ctx.employee_df)
+    matcher.ml_model = ctx.ml_model
+    matcher.use_ml_model = True
+    matcher.use_shortlist = use_shortlist
+    matcher.shortlist_size = shortlist_size
+    return matcher
+
+def match_all(matcher: TaskMatcher, tasks: List[Dict[str, Any]]) -> Any:
+    """
+    find_ai_matches of every task; returns the results and per-call latencies in seconds
+    """
+    results, latencies = [], []
+    for task in tasks:
+        started = time.perf_counter()
+        results.append(matcher.find_ai_matches(task))
+        latencies.append(time.perf_counter() - started)
+    return results, latencies
+
+def recall_at_k(full, shortlisted, k: int) -> float:
+    """
+    Fraction of the shortlisted top k whose full-scoring score reaches the k-th best full score
+    """
+    if len(full) == 0:
+        return 1.0
+    full_scores = dict(zip(full['ID'].tolist(), full['PredictionScore'].tolist()))
+    kth_score = full['PredictionScore'].iloc[min(k, len(full)) - 1]
+    top = shortlisted['ID'].head(k).tolist()
+    return sum(1 for employee_id in top if full_scores.get(employee_id, -1.0) >= kth_score) / min(k, len(full))
+
+def eligible(full, task: Dict[str, Any], matcher: TaskMatcher):
+    """
+    The full ranking narrowed to employees the retrieval rules admit
+    """
+    required = set(task['Required_Skills'])
+    mask = full['Skills'].map(lambda skills: not required.isdisjoint(skills)).to_numpy(dtype=bool)
+    if matcher.shortlist_require_capacity:
+        rows = matcher.capacity.rows(matcher.employee_df, full['ID'])
+        mask &= matcher.capacity.within_capacity(matcher.employee_df, task, rows)
+    return full[mask]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated roster sizes")
+    parser.add_argument("--shortlist", default="50,200,500,2000", help="Comma-separated shortlist sizes")
+    parser.add_argument("--tasks", type=int, default=30, help="Tasks matched per configuration")
+    parser.add_argument("--k", type=int, default=5, help="Recommendations compared for recall")
+    parser.add_argument("--output", default=None, help="Also write JSON results to this file")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    
+    # Bare-mode Streamlit warns on every session_state access
+    streamlit.logger.set_log_level("error")
+    # Small synthetic histories trigger sklearn's "too many classes" warnings
+    warnings.filterwarnings("ignore", category=UserWarning)
+    
+    records = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in [int(size) for size in args.sizes.split(",")]:
+            print(f"Preparing {rows:,}-row roster...", file=sys.stderr)
+            ctx = BenchContext(rows, workdir, seed=args.seed)
+            tasks = generate_tasks(args.tasks, seed=args.seed + 7)
+            
+            full, full_latencies = match_all(ml_matcher(ctx, False), tasks)
+            reference_matcher = ml_matcher(ctx, True)
+            
+            for shortlist_size in ["full", None] + [int(size) for size in args.shortlist.split(",")]:
+                if shortlist_size == "full":
+                    results, latencies = full, full_latencies
+                else:
+                    results, latencies = match_all(ml_matcher(ctx, True, shortlist_size), tasks)
+                
+                recall = np.mean([recall_at_k(reference, result, args.k) for reference, result in zip(full, results)])
+                eligible_recall = np.mean([
+                    recall_at_k(eligible(reference, task, reference_matcher), result, args.k)
+                    for reference, result, task in zip(full, results, tasks)
+                ])
+                p50, p95 = np.percentile(np.asarray(latencies) * 1000, [50, 95])
+                record = {
+                    "rows": rows,
+                    "shortlist_size": "all" if shortlist_size is None else shortlist_size,
+                    "p50_ms": round(float(p50), 3),
+                    "p95_ms": round(float(p95), 3),
+                    f"recall_at_{args.k}": round(float(recall), 4),
+                    f"eligible_recall_at_{args.k}": round(float(eligible_recall), 4),
+                    "mean_scored": round(float(np.mean([len(result) for result in results])), 1)
+                }
+                records.append(record)
+                label = "all" if shortlist_size is None else shortlist_size
+                print(f"  shortlist={label!s:<6} p50={p50:>9.2f}ms  p95={p95:>9.2f}ms  "
+                      f"recall@{args.k}={recall:.3f}  eligible={eligible_recall:.3f}  scored={record['mean_scored']:,.0f}", file=sys.stderr)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(records, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
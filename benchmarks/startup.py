@@ -0,0 +1,113 @@
+"""
+Cold-start benchmark: module import plus first render of app.py
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.startup --samples 5 --output startup.json
+
+Every sample runs in a fresh interpreter, so nothing is cached between
+samples. The output uses the same JSON format as `python -m benchmarks.run`
+and can be compared with `python -m benchmarks.compare`.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import List, Dict, Any, Optional
+
+from benchmarks.run import summarize, git_revision
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SECTIONS = ["Auto-Assign Task", "Employee Access", "Performance Leaderboard"]
+
+# Runs in the child interpreter: time importing the app's modules, then the
+# first script run of app.py opened on the requested section
+_CHILD = """
+import json, resource, sys, time, warnings
+import streamlit.logger
+streamlit.logger.set_log_level("error")
+warnings.filterwarnings("ignore")
+
+started = time.perf_counter()
+import data_handler, task_matcher, employee_management, components, instrumentation, profiling
+import_seconds = time.perf_counter() - started
+
+from streamlit.testing.v1 import AppTest
+app_test = AppTest.from_file(sys.argv[2], default_timeout=300)
+app_test.session_state.active_section = sys.argv[1]
+started = time.perf_counter()
+app_test.run()
+render_seconds = time.perf_counter() - started
+
+print(json.dumps({
+    "import_s": import_seconds,
+    "render_s": render_seconds,
+    "exceptions": [str(e.value) for e in app_test.exception],
+    "ml_stack_loaded": "sklearn" in sys.modules,
+    "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+}))
+"""
+
+def sample(section: str) -> Dict[str, Any]:
+    """
+    Measure one cold start in a fresh interpreter
+    """
+    completed = subprocess.run(
+        [sys.executable, "-c", _CHILD, section, os.path.join(REPO_ROOT, "app.py")],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    if result["exceptions"]:
+        raise RuntimeError(f"First render of {section!r} raised: {result['exceptions']}")
+    return result
+
+def run(sections: List[str], samples: int) -> Dict[str, Any]:
+    """
+    Collect `samples` cold starts per section
+    """
+    results = []
+    for section in sections:
+        runs = [sample(section) for _ in range(samples)]
+        peak = max(r["peak_rss_bytes"] for r in runs)
+        
+        for name, key in ((f"startup.import[{section}]", "import_s"),
+                          (f"startup.first_render[{section}]", "render_s"),
+                          (f"startup.total[{section}]", None)):
+            seconds = [r[key] if key else r["import_s"] + r["render_s"] for r in runs]
+            record = summarize(name, 0, seconds, peak)
+            record["ml_stack_loaded"] = any(r["ml_stack_loaded"] for r in runs)
+            results.append(record)
+            print(f"  {name:<50} p50={record['p50_ms']:>10.1f}ms  p95={record['p95_ms']:>10.1f}ms  "
+                  f"sklearn={'loaded' if record['ml_stack_loaded'] else 'not loaded'}", file=sys.stderr)
+    
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "samples": samples,
+            "note": "peak_memory_mb is the child interpreter's peak RSS"
+        },
+        "results": results
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", default=",".join(DEFAULT_SECTIONS),
+                        help=f"Comma-separated sections to open first (default: {','.join(DEFAULT_SECTIONS)})")
+    parser.add_argument("--samples", type=int, default=5, help="Fresh interpreters per section")
+    parser.add_argument("--output", default=None, help="Write JSON results to this file (default: stdout)")
+    args = parser.parse_args(argv)
+    
+    report = run(args.sections.split(","), args.samples)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Concurrency stress test of the shared DataHandler
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.stress --threads 400 --operations 50
+
+Hundreds of threads assign, reassign, complete, reopen and delete the same
+shared tasks at once, using compare-and-set updates that re-read and retry on
+version conflicts. A second phase has groups of threads race to assign the
+same task at the same version, where exactly one of each group must win.
+
+Afterwards every employee's TaskCount, CompletedTasks and Status in the roster,
+the event log aggregates, the leaderboard and the AI completion analytics must
+match a recount of the final tasks exactly, and every task's Version must be 1
+plus the number of updates that reported success on it. Exits with status 1
+on any mismatch.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import List, Any, Optional
+
+import streamlit.logger
+
+from benchmarks.synthetic import write_roster_csv, generate_tasks
+from data_handler import DataHandler
+from task_events import workload_status
+
+STATUSES = ["Not Started", "In Progress", "Completed", "Blocked"]
+
+# Re-reads of a task after a version conflict before an operation gives up
+MAX_RETRIES = 20
+
+class WorkerStats:
+    """
+    What one thread did, merged after the run
+    """
+    def __init__(self):
+        # Successful compare-and-set updates per task
+        self.applied = Counter()
+        self.deleted = set()
+        self.conflicts = 0
+        self.gave_up = 0
+
+def build_handler(workdir: str, employees: int, tasks: int, seed: int) -> DataHandler:
+    """
+    A DataHandler with a synthetic roster and `tasks` unassigned tasks
+    """
+    data_handler = DataHandler()
+    roster_path = write_roster_csv(os.path.join(workdir, "stress_roster.csv"), employees, seed)
+    if not data_handler.load_employee_data(roster_path):
+        raise RuntimeError(f"Could not load synthetic roster {roster_path}")
+    
+    for task in generate_tasks(tasks, seed=seed):
+        data_handler.add_task(task["Description"], task["Required_Skills"], priority=task["Priority"])
+    return data_handler
+
+def worker(data_handler: DataHandler, task_ids: List[int], employee_ids: List[int], operations: int,
+           delete_rate: float, seed: int, barrier: threading.Barrier, stats: WorkerStats) -> None:
+    """
+    Random compare-and-set assignments and status changes, plus a few deletes
+    """
+    rng = random.Random(seed)
+    barrier.wait()
+    
+    for _ in range(operations):
+        task_id = rng.choice(task_ids)
+        
+        if rng.random() < delete_rate:
+            if data_handler.delete_task(task_id):
+                stats.deleted.add(task_id)
+            continue
+        
+        assign = rng.random() < 0.5
+        employee_id = rng.choice(employee_ids)
+        status = rng.choice(STATUSES)
+        
+        for _ in range(MAX_RETRIES):
+            task = data_handler.get_task(task_id)
+            if task is None:
+                break
+            
+            if assign:
+                applied = data_handler.assign_task(task_id, employee_id, expected_version=task["Version"])
+            else:
+                applied = data_handler.update_task_status(task_id, status, expected_version=task["Version"])
+            
+            if applied:
+                stats.applied[task_id] += 1
+                break
+            stats.conflicts += 1
+        else:
+            stats.gave_up += 1
+
+def run_threads(targets: List[Any]) -> float:
+    """
+    Start one thread per (function, args) pair, wait for all of them and return the elapsed seconds
+    """
+    threads = [threading.Thread(target=target, args=args) for target, args in targets]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+def contention_phase(data_handler: DataHandler, employee_ids: List[int], tasks: int,
+                     threads_per_task: int) -> List[str]:
+    """
+    Groups of threads assign the same fresh task at Version 1; exactly one per group may win
+    """
+    task_ids = [data_handler.add_task(f"Contended task {i}", ["Python"]) for i in range(tasks)]
+    barrier = threading.Barrier(tasks * threads_per_task)
+    wins = Counter()
+    wins_lock = threading.Lock()
+    
+    def contend(task_id: int, employee_id: int) -> None:
+        barrier.wait()
+        if data_handler.assign_task(task_id, employee_id, expected_version=1):
+            with wins_lock:
+                wins[task_id] += 1
+    
+    run_threads([(contend, (task_id, employee_ids[i % len(employee_ids)]))
+                 for task_id in task_ids for i in range(threads_per_task)])
+    
+    errors = [f"task {task_id}: {wins[task_id]} concurrent compare-and-set assignments succeeded, expected 1"
+              for task_id in task_ids if wins[task_id] != 1]
+    errors += [f"task {task_id}: Version {data_handler.get_task(task_id)['Version']} after one assignment, expected 2"
+               for task_id in task_ids if data_handler.get_task(task_id)["Version"] != 2]
+    return errors
+
+def verify(data_handler: DataHandler, applied: Counter, deleted: set) -> List[str]:
+    """
+    Compare every counter with a recount of the final tasks
+    """
+    errors = []
+    tasks = data_handler.get_all_tasks()
+    
+    active, completed = Counter(), Counter()
+    for task in tasks:
+        if task["Assigned_To"] is not None:
+            (completed if task["Status"] == "Completed" else active)[task["Assigned_To"]] += 1
+    
+    # Roster counters
+    employee_df = data_handler.employee_df
+    for employee_id, task_count, completed_count, status in zip(
+            employee_df['ID'], employee_df['TaskCount'], employee_df['CompletedTasks'], employee_df['Status']):
+        if task_count != active[employee_id] or completed_count != completed[employee_id]:
+            errors.append(f"employee {employee_id}: roster has TaskCount={task_count}, CompletedTasks={completed_count}; "
+                          f"tasks say {active[employee_id]}, {completed[employee_id]}")
+        if status != workload_status(active[employee_id]):
+            errors.append(f"employee {employee_id}: Status {status!r} with {active[employee_id]} active tasks")
+    
+    # Event log: materialized aggregates and a full replay
+    event_log = data_handler.event_log
+    if +Counter(event_log.active_counts) != +active or +Counter(event_log.completed_counts) != +completed:
+        errors.append("event log aggregates differ from the tasks")
+    replayed = event_log.compute_aggregates()
+    if (+Counter(replayed["ActiveTasks"].to_dict()) != +active or
+            +Counter(replayed["CompletedTasks"].to_dict()) != +completed):
+        errors.append("event log replay differs from the tasks")
+    
+    # All-time leaderboard
+    leaderboard_counts = +Counter(data_handler.leaderboard.all_time.counts)
+    if leaderboard_counts != +completed:
+        errors.append("all-time leaderboard counts differ from the tasks")
+    
+    # AI analytics count the completions of assigned tasks
+    timed_completions = sum(1 for task in tasks
+                            if task.get("Completion_Date") is not None and task.get("Assigned_Date") is not None)
+    if data_handler.ai_analytics.completed_count() != timed_completions:
+        errors.append(f"analytics count {data_handler.ai_analytics.completed_count()} completions, "
+                      f"tasks have {timed_completions}")
+    
+    # Every successful compare-and-set produced exactly one new version
+    for task in tasks:
+        expected = 1 + applied[task["TaskID"]]
+        if task["Version"] != expected:
+            errors.append(f"task {task['TaskID']}: Version {task['Version']}, expected {expected}")
+    
+    still_present = [task["TaskID"] for task in tasks if task["TaskID"] in deleted]
+    if still_present:
+        errors.append(f"deleted tasks still present: {still_present[:10]}")
+    
+    return errors
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=400, help="Concurrent worker threads")
+    parser.add_argument("--operations", type=int, default=50, help="Operations per worker thread")
+    parser.add_argument("--employees", type=int, default=200, help="Roster size")
+    parser.add_argument("--tasks", type=int, default=300, help="Shared tasks the workers contend on")
+    parser.add_argument("--delete-rate", type=float, default=0.02, help="Fraction of operations that delete a task")
+    parser.add_argument("--contended-tasks", type=int, default=20,
+                        help="Tasks in the contention phase (threads-per-task threads race on each)")
+    parser.add_argument("--threads-per-task", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    
+    # Bare-mode Streamlit warns on every session_state access
+    streamlit.logger.set_log_level("error")
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        data_handler = build_handler(workdir, args.employees, args.tasks, args.seed)
+    
+    employee_ids = data_handler.employee_df['ID'].tolist()
+    task_ids = [task["TaskID"] for task in data_handler.get_all_tasks()]
+    
+    barrier = threading.Barrier(args.threads)
+    stats = [WorkerStats() for _ in range(args.threads)]
+    elapsed = run_threads([
+        (worker, (data_handler, task_ids, employee_ids, args.operations, args.delete_rate,
+                  args.seed + i, barrier, stats[i]))
+        for i in range(args.threads)
+    ])
+    
+    applied = sum((s.applied for s in stats), Counter())
+    deleted = set().union(*(s.deleted for s in stats))
+    conflicts = sum(s.conflicts for s in stats)
+    gave_up = sum(s.gave_up for s in stats)
+    
+    print(f"{args.threads} threads x {args.operations} operations in {elapsed:.2f}s "
+          f"({args.threads * args.operations / elapsed:,.0f} ops/s): {sum(applied.values())} updates applied, "
+          f"{conflicts} version conflicts retried, {gave_up} gave up, {len(deleted)} tasks deleted", file=sys.stderr)
+    
+    errors = verify(data_handler, applied, deleted)
+    errors += contention_phase(data_handler, employee_ids, args.contended_tasks, args.threads_per_task)
+    errors += verify(data_handler, applied + Counter({task["TaskID"]: 1 for task in data_handler.get_all_tasks()
+                                                       if task["Description"].startswith("Contended task")}), deleted)
+    
+    if errors:
+        print(f"FAILED: {len(errors)} mismatches", file=sys.stderr)
+        for error in errors[:50]:
+            print(f"  {error}", file=sys.stderr)
+        return 1
+    
+    print("OK: counters, event log, leaderboard, analytics and task versions are exact", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional
+
+# The roster shipped with the app; synthetic data is resampled from it
+SHIPPED_ROSTER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "attached_assets", "employee_positions_dataset.csv")
+
+PRIORITIES = ["Low", "Medium", "High"]
+
+def load_seed_roster() -> pd.DataFrame:
+    """
+    Load the shipped 1,000-row roster that synthetic rosters are sampled from
+    """
+    return pd.read_csv(SHIPPED_ROSTER)
+
+def generate_roster(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Generate a roster of `n_rows` employees with the same column layout and
+    value distributions as the shipped dataset
+    
+    Role/Position/Experience/Skills are resampled row-wise from the shipped
+    roster, so realistic combinations are kept; names are recombined from
+    shipped first and last names.
+    """
+    seed_df = load_seed_roster()
+    rng = np.random.default_rng(seed)
+    
+    rows = rng.integers(0, len(seed_df), size=n_rows)
+    names = seed_df['Name'].str.split(' ', n=1, expand=True)
+    first_names = names[0].unique()
+    last_names = names[1].unique()
+    
+    return pd.DataFrame({
+        'ID': np.arange(1, n_rows + 1),
+        'Name': (pd.Series(first_names[rng.integers(0, len(first_names), size=n_rows)]) + ' ' +
+                 pd.Series(last_names[rng.integers(0, len(last_names), size=n_rows)])).values,
+        'Role': seed_df['Role'].values[rows],
+        'Position': seed_df['Position'].values[rows],
+        'Experience': seed_df['Experience'].values[rows],
+        'Skills': seed_df['Skills'].values[rows]
+    })
+
+def write_roster_csv(path: str, n_rows: int, seed: int = 42) -> str:
+    """
+    Write a synthetic roster CSV and return its path
+    """
+    generate_roster(n_rows, seed).to_csv(path, index=False)
+    return path
+
+def all_skills() -> List[str]:
+    """
+    The skill vocabulary of the shipped roster
+    """
+    skills = set()
+    for skill_text in load_seed_roster()['Skills']:
+        skills.update(skill.strip() for skill in skill_text.split(','))
+    return sorted(skills)
+
+def generate_tasks(n_tasks: int, skills: Optional[List[str]] = None, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate task definitions with 1-3 required skills each
+    """
+    skills = skills or all_skills()
+    rng = np.random.default_rng(seed)
+    
+    tasks = []
+    for i in range(n_tasks):
+        required = rng.choice(skills, size=int(rng.integers(1, 4)), replace=False).tolist()
+        tasks.append({
+            'Description': f"Synthetic task {i + 1} requiring {', '.join(required)}",
+            'Required_Skills': required,
+            'Priority': PRIORITIES[int(rng.integers(0, len(PRIORITIES)))],
+            'Status': 'Not Started'
+        })
+    return tasks
@@ -0,0 +1,148 @@
+"""
+Flattened tree-ensemble benchmark: FlatForest vs scikit-learn predict_proba
+
+Run from the repository root, e.g.:
+
+    python -m benchmarks.tree_inference --sizes 1000,10000 --batches 1,8,32,128,512
+
+For each roster size, the assignment model trained by the benchmark context
+is flattened with tree_ensemble.FlatForest. Batches of real task/employee
+feature rows are then scored both by the forest's predict_proba (as served
+before, from a DataFrame) and by FlatForest.predict_proba, reporting p50/p95
+latency per batch size and checking that every output is bit-for-bit equal.
+Also reports single-task TaskAssignmentModel.predict latency with and
+without the flattened model, the time to flatten, and model sizes (pickle
+vs the flattened arrays).
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional
+
+import streamlit.logger
+
+from benchmarks.run import BenchContext
+from benchmarks.synthetic import generate_tasks
+from scoring import EXPERIENCE_LEVELS
+from tree_ensemble import FlatForest
+
+def feature_rows(ctx: BenchContext, tasks: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Distinct feature rows of every task/employee pair, as predict_many builds them
+    """
+    model, employee_df = ctx.ml_model, ctx.employee_df
+    employee_features = {
+        'employee_experience': employee_df['Experience'].map(EXPERIENCE_LEVELS).fillna(0).to_numpy(dtype=np.float64),
+        'current_workload': employee_df['TaskCount'].to_numpy(dtype=np.float64),
+        'completed_tasks': employee_df['CompletedTasks'].to_numpy(dtype=np.float64)
+    }
+
+    blocks = []
+    for task in tasks:
+        columns = dict(employee_features)
+        columns['skill_match_score'] = model._skill_match_scores(employee_df['Skills'].to_numpy(), task['Required_Skills'])
+        columns['task_priority'] = np.full(len(employee_df), float(model._encode_priority(task['Priority'])))
+        blocks.append(np.column_stack([columns[feature] for feature in model.features]))
+    return np.unique(np.concatenate(blocks), axis=0)
+
+def latencies(call, repeats: int) -> np.ndarray:
+    """
+    Seconds taken by each of `repeats` calls
+    """
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return np.asarray(timings)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated roster sizes")
+    parser.add_argument("--batches", default="1,8,32,128,512", help="Comma-separated batch sizes (feature rows)")
+    parser.add_argument("--repeats", type=int, default=50, help="Timed calls per batch size")
+    parser.add_argument("--output", default=None, help="Also write JSON results to this file")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    # Bare-mode Streamlit warns on every session_state access
+    streamlit.logger.set_log_level("error")
+    # Small synthetic histories trigger sklearn's "too many classes" warnings
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    rng = np.random.default_rng(args.seed)
+    records = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in [int(size) for size in args.sizes.split(",")]:
+            print(f"Preparing {rows:,}-row roster...", file=sys.stderr)
+            ctx = BenchContext(rows, workdir, seed=args.seed)
+            model = ctx.ml_model
+            forest = model.model
+
+            started = time.perf_counter()
+            flat = FlatForest.from_sklearn(forest)
+            export_ms = (time.perf_counter() - started) * 1000
+
+            flat_path = os.path.join(workdir, f"flat_{rows}.npz")
+            flat.save(flat_path)
+            sizes = {
+                "pickle_bytes": len(pickle.dumps(forest)),
+                "flat_bytes": flat.nbytes,
+                "flat_file_bytes": os.path.getsize(flat_path)
+            }
+            print(f"  {flat.n_trees} trees, depth {flat.depth}, {len(flat.classes_)} classes; flattened in {export_ms:.1f}ms; "
+                  f"pickle {sizes['pickle_bytes'] / 1e6:.2f}MB -> arrays {sizes['flat_bytes'] / 1e6:.2f}MB", file=sys.stderr)
+
+            candidates = feature_rows(ctx, generate_tasks(32, seed=args.seed + 7))
+            for batch in [int(size) for size in args.batches.split(",")]:
+                X = candidates[rng.choice(len(candidates), size=batch, replace=batch > len(candidates))]
+                frame = pd.DataFrame(X, columns=model.features)
+
+                identical = np.array_equal(forest.predict_proba(frame), flat.predict_proba(X))
+                sklearn_ms = latencies(lambda: forest.predict_proba(frame), args.repeats) * 1000
+                flat_ms = latencies(lambda: flat.predict_proba(X), args.repeats) * 1000
+
+                record = {
+                    "rows": rows,
+                    "batch": batch,
+                    "sklearn_p50_ms": round(float(np.percentile(sklearn_ms, 50)), 3),
+                    "sklearn_p95_ms": round(float(np.percentile(sklearn_ms, 95)), 3),
+                    "flat_p50_ms": round(float(np.percentile(flat_ms, 50)), 3),
+                    "flat_p95_ms": round(float(np.percentile(flat_ms, 95)), 3),
+                    "identical": bool(identical),
+                    "export_ms": round(export_ms, 2),
+                    **sizes
+                }
+                record["speedup_p50"] = round(record["sklearn_p50_ms"] / max(record["flat_p50_ms"], 1e-9), 2)
+                records.append(record)
+                print(f"  batch={batch:<5} sklearn p50={record['sklearn_p50_ms']:>8.3f}ms p95={record['sklearn_p95_ms']:>8.3f}ms  "
+                      f"flat p50={record['flat_p50_ms']:>8.3f}ms p95={record['flat_p95_ms']:>8.3f}ms  "
+                      f"x{record['speedup_p50']:<6} identical={identical}", file=sys.stderr)
+
+            # End to end: one task ranked over the whole roster
+            task = generate_tasks(1, seed=args.seed + 11)[0]
+            end_to_end = {}
+            for use_flat_model in (False, True):
+                model.use_flat_model = use_flat_model
+                end_to_end[use_flat_model] = float(np.percentile(
+                    latencies(lambda: model.predict(task, ctx.employee_df), max(5, args.repeats // 5)) * 1000, 50))
+            model.use_flat_model = True
+            records.append({"rows": rows, "batch": "predict", "sklearn_p50_ms": round(end_to_end[False], 3),
+                            "flat_p50_ms": round(end_to_end[True], 3)})
+            print(f"  TaskAssignmentModel.predict p50: sklearn {end_to_end[False]:.2f}ms, flat {end_to_end[True]:.2f}ms",
+                  file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(records, f, indent=2)
+    return 0 if all(record.get("identical", True) for record in records) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Optional
+from preference_store import PreferenceStore
+
+# Working hours per day of employees who never set "preferred_hours"
+DEFAULT_PREFERRED_HOURS = 8
+
+# Working days of capacity an employee's preferred hours are counted over
+CAPACITY_DAYS = 5
+
+# Effort of a task without an Estimated_Hours, in hours. With the defaults
+# an employee has room for three such tasks (36 of 40 hours), matching the
+# "Partially Assigned" band
+DEFAULT_TASK_HOURS = 12
+
+# Most recent role preference effects kept for inspection
+MAX_RECORDED_EFFECTS = 1000
+
+def task_effort(task: Optional[Dict[str, Any]]) -> float:
+    """
+    Estimated effort of a task in hours
+    """
+    hours = task.get("Estimated_Hours") if task else None
+    return float(hours) if hours else float(DEFAULT_TASK_HOURS)
+
+class CapacityModel:
+    """
+    Per-employee working hours, committed task effort and role preferences
+    
+    Working hours ("preferred_hours") and preferred task types
+    ("preferred_tasks") are bulk-read from a PreferenceStore (see
+    use_preferences); task effort is kept current by on_task_event, a
+    DataHandler task listener, for every active assigned task. arrays()
+    turns them into dense arrays aligned to a roster snapshot, which the
+    scorer and the matcher's capacity filter read directly.
+    
+    Active tasks the model never saw (e.g. TaskCounts loaded with the roster)
+    are counted at DEFAULT_TASK_HOURS each, so the model is usable without
+    any listener too.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        
+        # Where employee preferences are read from; without one, everyone has the defaults
+        self.preferences = None
+        
+        # (employee_id, hours) of every active assigned task by task ID, and
+        # (hours, task count) committed by each employee
+        self.active_tasks = {}
+        self.committed = {}
+        
+        # Bumped on every task change; arrays() caches per roster snapshot,
+        # version and preference store revision
+        self.version = 0
+        self._arrays = (None, None, None)
+        
+        # Recent (employee_id, task type, score multiplier) role preference effects, and their totals
+        self.preference_effects = deque(maxlen=MAX_RECORDED_EFFECTS)
+        self.effect_counts = {"boosted": 0, "penalized": 0, "neutral": 0}
+    
+    def use_preferences(self, preference_store: Optional[PreferenceStore]) -> None:
+        """
+        Read working hours and preferred task types from a preference store
+        """
+        with self.lock:
+            self.preferences = preference_store
+            self.version += 1
+    
+    def on_task_event(self, event: str, task: Dict[str, Any]) -> None:
+        """
+        DataHandler task listener tracking the effort each employee has committed
+        """
+        task_id = task["TaskID"]
+        active = event != "deleted" and task["Assigned_To"] is not None and task["Status"] != "Completed"
+        
+        with self.lock:
+            previous = self.active_tasks.pop(task_id, None)
+            if previous is not None:
+                self._commit(previous[0], -previous[1], -1)
+            if active:
+                hours = task_effort(task)
+                self.active_tasks[task_id] = (task["Assigned_To"], hours)
+                self._commit(task["Assigned_To"], hours, 1)
+            if previous is not None or active:
+                self.version += 1
+    
+    def _commit(self, employee_id: int, hours: float, count: int) -> None:
+        committed_hours, committed_count = self.committed.get(employee_id, (0.0, 0))
+        if committed_count + count == 0:
+            self.committed.pop(employee_id, None)
+        else:
+            self.committed[employee_id] = (committed_hours + hours, committed_count + count)
+    
+    def arrays(self, employee_df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Dense per-employee arrays aligned to employee_df's rows
+        
+        - capacity_hours: preferred hours per day over CAPACITY_DAYS
+        - committed_hours: effort of the employee's active tasks
+        - available_hours: capacity_hours - committed_hours (negative when over capacity)
+        - has_role_preference: whether the employee named any preferred task types
+        - index: the roster's IDs, to find employees' positions in the arrays (see rows)
+        """
+        with self.lock:
+            preferences = self.preferences
+            version = (self.version, preferences.revision() if preferences is not None else None)
+            cached_df, cached_version, cached = self._arrays
+            if cached_df is employee_df and cached_version == version:
+                return cached
+            committed = pd.DataFrame.from_dict(self.committed, orient='index', columns=['hours', 'count'])
+        
+        employee_ids = employee_df['ID']
+        if preferences is not None:
+            hours_per_day = preferences.numbers("preferred_hours", employee_ids, DEFAULT_PREFERRED_HOURS)
+            has_role_preference = preferences.has("preferred_tasks", employee_ids)
+        else:
+            hours_per_day = np.full(len(employee_df), DEFAULT_PREFERRED_HOURS, dtype=np.float64)
+            has_role_preference = np.zeros(len(employee_df), dtype=bool)
+        tracked_hours = employee_ids.map(committed['hours']).fillna(0.0).to_numpy(dtype=np.float64)
+        tracked_count = employee_ids.map(committed['count']).fillna(0).to_numpy(dtype=np.float64)
+        
+        # Active tasks the model has not seen count at the default effort
+        untracked = np.maximum(employee_df['TaskCount'].to_numpy(dtype=np.float64) - tracked_count, 0.0)
+        committed_hours = tracked_hours + untracked * DEFAULT_TASK_HOURS
+        capacity_hours = hours_per_day * CAPACITY_DAYS
+        
+        arrays = {
+            'capacity_hours': capacity_hours,
+            'committed_hours': committed_hours,
+            'available_hours': capacity_hours - committed_hours,
+            'has_role_preference': has_role_preference,
+            'index': pd.Index(employee_ids)
+        }
+        self._arrays = (employee_df, version, arrays)
+        return arrays
+    
+    def rows(self, employee_df: pd.DataFrame, employee_ids: Any) -> np.ndarray:
+        """
+        Row positions in employee_df's arrays of the given employee IDs
+        """
+        return self.arrays(employee_df)['index'].get_indexer(employee_ids)
+    
+    def prefers_role(self, employee_ids: Any, role: Optional[str]) -> np.ndarray:
+        """
+        Whether each employee listed `role` among their preferred task types
+        """
+        preferences = self.preferences
+        if preferences is None or not role:
+            return np.zeros(len(employee_ids), dtype=bool)
+        return preferences.matches("preferred_tasks", role, employee_ids)
+    
+    def within_capacity(self, employee_df: pd.DataFrame, task: Optional[Dict[str, Any]],
+                        positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Mask of employees (all rows, or the given row positions) with room for the task's effort
+        """
+        available = self.arrays(employee_df)['available_hours']
+        if positions is not None:
+            available = available[positions]
+        return available >= task_effort(task)
+    
+    def record_preference_effect(self, employee_id: int, role: Optional[str], multiplier: float) -> None:
+        """
+        Remember how much a role preference scaled a recommended employee's score
+        """
+        with self.lock:
+            self.preference_effects.append((employee_id, role, multiplier))
+            if multiplier > 1.0:
+                self.effect_counts["boosted"] += 1
+            elif multiplier < 1.0:
+                self.effect_counts["penalized"] += 1
+            else:
+                self.effect_counts["neutral"] += 1
+    
+    def preference_effect_summary(self) -> Dict[str, Any]:
+        """
+        Counts of boosted, penalized and unaffected recommendations, and the
+        mean score multiplier of the recent ones
+        """
+        with self.lock:
+            multipliers = [multiplier for _, _, multiplier in self.preference_effects]
+            summary = dict(self.effect_counts)
+        summary["mean_multiplier"] = float(np.mean(multipliers)) if multipliers else 1.0
+        return summary
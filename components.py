@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from typing import List, Dict, Any, Optional, Callable
+from timestamps import format_timestamp
 
 def create_top_navigation(sections: List[str], active_section: str, on_section_change: Callable[[str], None]) -> None:
     """
@@ -94,7 +95,9 @@ def task_card(task: Dict[str, Any], employees_df: Optional[pd.DataFrame] = None,
             # Display additional details for employee view
             if employee_view:
                 if 'Assigned_Date' in task:
-                    st.caption(f"Assigned on: {task['Assigned_Date']}")
+                    st.caption(f"Assigned on: {format_timestamp(task['Assigned_Date'])}")
+                if task.get('Completion_Date') is not None:
+                    st.caption(f"Completed on: {format_timestamp(task['Completion_Date'])}")
                 if 'Due_Date' in task and task['Due_Date']:
                     st.caption(f"Due Date: {task['Due_Date']}")
                 if 'Priority' in task:
@@ -184,7 +187,7 @@ def task_card(task: Dict[str, Any], employees_df: Optional[pd.DataFrame] = None,
                     
             # Add Last Update timestamp if available
             if 'Last_Updated' in task:
-                st.caption(f"Last updated: {task['Last_Updated']}")
+                st.caption(f"Last updated: {format_timestamp(task['Last_Updated'])}")
 
 def display_leaderboard(leaderboard_data: pd.DataFrame) -> None:
     """
@@ -218,81 +221,42 @@ def display_leaderboard(leaderboard_data: pd.DataFrame) -> None:
             
             st.divider()
 
-def display_ai_performance_metrics(prediction_data: List[Dict[str, Any]], completed_tasks: List[Dict[str, Any]]) -> None:
+def display_ai_performance_metrics(summary: Dict[str, Any]) -> None:
     """
     Display AI performance metrics and visualizations
+    
+    Parameters:
+    - summary: Running aggregates from AIAnalytics.summary()
     """
-    if not prediction_data or not completed_tasks:
+    if summary['predictions'] == 0 or summary['completed_tasks'] == 0:
         st.info("AI performance metrics will be available once more tasks are completed.")
         return
     
     st.subheader("AI Model Performance")
     
-    # Calculate success rate
-    successful_predictions = sum(1 for pred in prediction_data if pred.get('success', False))
-    success_rate = (successful_predictions / len(prediction_data)) * 100 if prediction_data else 0
-    
     # Display metrics
     cols = st.columns(3)
     with cols[0]:
-        st.metric("Success Rate", f"{success_rate:.1f}%")
+        st.metric("Success Rate", f"{summary['success_rate'] * 100:.1f}%")
     with cols[1]:
-        st.metric("Predictions Made", len(prediction_data))
+        st.metric("Predictions Made", summary['predictions'])
     with cols[2]:
-        st.metric("Model Confidence", f"{sum(pred.get('confidence', 0) for pred in prediction_data) / len(prediction_data):.1f}%" if prediction_data else "N/A")
+        st.metric("Model Confidence", f"{summary['mean_confidence'] * 100:.1f}%")
     
     # Create and display a chart showing improvement over time
-    if len(prediction_data) >= 5:  # Only show chart with sufficient data
+    if summary['evaluated'] >= 5:  # Only show chart with sufficient data
         st.subheader("Model Improvement Over Time")
         
-        # Create data for chart
-        df_improvement = pd.DataFrame(prediction_data)
-        
-        # Ensure datetime conversion
-        if 'timestamp' in df_improvement.columns:
-            df_improvement['timestamp'] = pd.to_datetime(df_improvement['timestamp'])
-            df_improvement = df_improvement.sort_values('timestamp')
-            
-            # Calculate rolling success rate
-            df_improvement['rolling_success'] = df_improvement['success'].rolling(window=5, min_periods=1).mean() * 100
-            
-            # Plot the rolling success rate
-            st.line_chart(df_improvement.set_index('timestamp')['rolling_success'])
-            st.caption("Rolling average of prediction success rate (5-prediction window)")
+        # Plot the rolling success rate
+        st.line_chart(summary['rolling_success'])
+        st.caption("Rolling average of prediction success rate (5-prediction window)")
         
     # Display completion time comparison
     st.subheader("Task Completion Efficiency")
     st.write("Comparing completion times for AI-assigned vs. manually assigned tasks:")
     
-    # Extract AI-assigned and manually assigned tasks
-    ai_assigned = [task for task in completed_tasks if task.get('AI_Assigned', False)]
-    manually_assigned = [task for task in completed_tasks if not task.get('AI_Assigned', False)]
-    
-    # Calculate average completion time
-    def calculate_avg_completion_time(tasks):
-        if not tasks:
-            return 0
-        total_days = 0
-        count = 0
-        
-        for task in tasks:
-            assigned_date = task.get('Assigned_Date')
-            completion_date = task.get('Completion_Date')
-            
-            if assigned_date and completion_date:
-                try:
-                    assigned = pd.to_datetime(assigned_date)
-                    completed = pd.to_datetime(completion_date)
-                    days = (completed - assigned).days
-                    total_days += days
-                    count += 1
-                except:
-                    pass
-        
-        return total_days / count if count > 0 else 0
-    
-    ai_avg_time = calculate_avg_completion_time(ai_assigned)
-    manual_avg_time = calculate_avg_completion_time(manually_assigned)
+    ai_avg_time = summary['ai_avg_days']
+    manual_avg_time = summary['manual_avg_days']
     
     comparison_data = pd.DataFrame({
         'Assignment Method': ['AI Assigned', 'Manually Assigned'],
@@ -303,3 +267,70 @@ def display_ai_performance_metrics(prediction_data: List[Dict[str, Any]], comple
         st.bar_chart(comparison_data.set_index('Assignment Method'))
     else:
         st.info("Completion time comparison will be available once there are both AI-assigned and manually assigned completed tasks.")
+
+def display_performance_dashboard(function_summary: pd.DataFrame, slowest_reruns: pd.DataFrame, prometheus_text: str) -> None:
+    """
+    Display per-function latency, the slowest reruns and a Prometheus export
+    """
+    if len(function_summary) == 0:
+        st.info("No instrumented calls recorded yet. Use the app and come back to this page.")
+        return
+    
+    # Headline numbers
+    cols = st.columns(3)
+    with cols[0]:
+        st.metric("Instrumented Functions", len(function_summary))
+    with cols[1]:
+        st.metric("Total Calls", int(function_summary['Calls'].sum()))
+    with cols[2]:
+        st.metric("Rows Processed", f"{int(function_summary['Rows Processed'].sum()):,}")
+    
+    st.subheader("Latency by Function")
+    st.bar_chart(function_summary.set_index('Function')[['p50 (ms)', 'p95 (ms)', 'p99 (ms)']])
+    st.dataframe(function_summary, hide_index=True, use_container_width=True)
+    
+    st.subheader("Slowest Reruns")
+    if len(slowest_reruns) > 0:
+        st.dataframe(slowest_reruns, hide_index=True, use_container_width=True)
+    else:
+        st.info("No completed reruns recorded yet.")
+    
+    st.subheader("Export")
+    st.download_button("Download Prometheus Metrics", prometheus_text,
+                       file_name="taskflow_metrics.prom", mime="text/plain")
+    with st.expander("Prometheus text format"):
+        st.code(prometheus_text, language="text")
+
+def display_rerun_profiles(profiles: List[Any], profiling_active: bool) -> None:
+    """
+    Display the top functions of recent profiled script runs
+    
+    Parameters:
+    - profiles: RerunProfile objects, newest first
+    - profiling_active: Whether the current run is being profiled
+    """
+    if not profiling_active:
+        st.caption("Profiling is off. Start the app with TASKFLOW_PROFILE=1 or add ?profile=1 to the URL to profile every rerun.")
+    
+    if not profiles:
+        if profiling_active:
+            st.info("No profiled reruns yet. Interact with the app and come back to this page.")
+        return
+    
+    labels = [profile.label for profile in profiles]
+    selected = st.selectbox("Profiled Rerun", range(len(profiles)), format_func=lambda i: labels[i])
+    profile = profiles[selected]
+    
+    cols = st.columns(3)
+    with cols[0]:
+        st.metric("Section", profile.section)
+    with cols[1]:
+        st.metric("Duration", f"{profile.duration * 1000:.1f} ms")
+    with cols[2]:
+        st.metric("Function Calls", f"{profile.total_calls:,}")
+    
+    st.dataframe(profile.top_functions, hide_index=True, use_container_width=True)
+    st.download_button("Download Profile (.prof)", profile.raw_stats,
+                       file_name=f"rerun_{int(profile.started_at)}.prof",
+                       mime="application/octet-stream",
+                       help="Open with snakeviz or pstats for a flame graph / call tree")
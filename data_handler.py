@@ -1,74 +1,142 @@
 import pandas as pd
 import streamlit as st
 import os
+import sys
+import threading
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from task_events import TaskEventLog, workload_status
+from leaderboard import Leaderboard
+from ai_analytics import AIAnalytics
+from roster import RosterStore, with_values, with_columns
+import timestamps
+import notifications
+from instrumentation import instrumented, roster_rows
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+# Columns every employee roster CSV must provide
+REQUIRED_EMPLOYEE_COLUMNS = ["ID", "Name", "Role", "Position", "Experience", "Skills"]
+
+# Text columns whose repeated values are interned while streaming the roster in
+INTERNED_EMPLOYEE_COLUMNS = ["Name", "Role", "Position", "Experience"]
 
 class DataHandler:
     """
     Handles loading, processing, and storing employee and task data
     """
     def __init__(self):
-        # Initialized data containers
-        self.employee_df = None
-        self.tasks_df = pd.DataFrame(columns=["TaskID", "Description", "Required_Skills", 
-                                             "Assigned_To", "Status", "Due_Date", "Priority",
-                                             "AI_Assigned", "AI_Recommendation_Score"])
+        # Versioned copy-on-write roster, shared with TaskMatcher and EmployeeManagement
+        self.roster = RosterStore()
+        
+        # Source of the loaded roster, used for delta reloads
+        self.roster_path = None
+        self.roster_mtime = None
+        self.roster_hashes = None
+        
+        # Every skill seen in the roster, interned so each skill string is stored once
+        self.skill_vocabulary = {}
+        
+        # Bumped on every mutation of employee, task or AI prediction data;
+        # see generation, which also counts roster versions
+        self.mutations = 0
+        
+        # DataHandler is shared by every session (see initialize_components), and
+        # so are the tasks, the event log, the notification inbox and the AI
+        # history below. Their writers hold this lock; roster writes made while
+        # holding it always take the roster's own writer lock second.
+        self.lock = threading.RLock()
+        
+        # Tasks by ID, in creation order. Published task dicts are never modified:
+        # every change stores a new dict with the task's Version incremented, so
+        # a task read earlier stays consistent and can be used for compare-and-set
+        self.tasks = {}
+        self.task_counter = 1
+        
+        # tasks as a DataFrame, rebuilt on first use after a change
+        self._tasks_df = (None, None)
         
         # Define status options
         self.task_status_options = ["Not Started", "In Progress", "Completed", "Blocked"]
         self.employee_status_options = ["Unassigned", "Partially Assigned", "Fully Assigned"]
         
-        # Initialize session state for tasks if not exists
-        if 'tasks' not in st.session_state:
-            st.session_state.tasks = []
+        # Callbacks invoked with the task whenever it transitions to Completed
+        self.completion_listeners = []
         
-        if 'task_counter' not in st.session_state:
-            st.session_state.task_counter = 1
-            
-        # Initialize AI prediction tracking
-        if 'ai_predictions' not in st.session_state:
-            st.session_state.ai_predictions = []
+        # Callbacks invoked with (event, task) on every task change, under the lock
+        self.task_listeners = []
+        
+        # Top-N completion rankings (all-time, this week, this month)
+        self.leaderboard = Leaderboard()
+        
+        # Lookup of employee preferences, set by the app (see set_preference_provider)
+        self.preference_provider = None
+        
+        # Event log the employee workload counters are derived from
+        self.event_log = TaskEventLog()
         
-        if 'employee_data_loaded' not in st.session_state:
-            st.session_state.employee_data_loaded = False
+        # Per-recipient index of sent notifications
+        self.notification_inbox = notifications.NotificationInbox()
+        
+        # AI prediction tracking
+        self.ai_predictions = []
+        
+        # Columnar prediction/completion history with running aggregates
+        self.ai_analytics = AIAnalytics()
     
-    def load_employee_data(self, file_path: str) -> bool:
+    @instrumented(rows=roster_rows)
+    def load_employee_data(self, file_path: str, chunksize: int = 10000,
+                           progress_callback: Optional[Callable[[float, int], None]] = None) -> bool:
         """
         Load employee data from CSV file
+        
+        The file is streamed in chunks of `chunksize` rows so that parsing overhead
+        stays bounded by the chunk size rather than the file size.
+        
+        Parameters:
+        - file_path: Path of the roster CSV
+        - chunksize: Number of rows parsed per chunk
+        - progress_callback: Optional callback receiving (fraction of bytes read, rows loaded)
         """
         try:
             if os.path.exists(file_path):
-                self.employee_df = pd.read_csv(file_path)
-                
-                # Process skills column to ensure it's a list
-                self.employee_df['Skills'] = self.employee_df['Skills'].apply(
-                    lambda x: [skill.strip() for skill in str(x).split(',')]
-                )
+                roster_mtime = os.path.getmtime(file_path)
+                employee_df = self._read_roster(file_path, chunksize, progress_callback)
+                if employee_df is None:
+                    return False
                 
                 # Initialize availability status for all employees
-                if 'Status' not in self.employee_df.columns:
-                    self.employee_df['Status'] = 'Unassigned'
+                if 'Status' not in employee_df.columns:
+                    employee_df['Status'] = 'Unassigned'
                 
                 # Initialize task count for all employees
-                if 'TaskCount' not in self.employee_df.columns:
-                    self.employee_df['TaskCount'] = 0
+                if 'TaskCount' not in employee_df.columns:
+                    employee_df['TaskCount'] = 0
                 
                 # Initialize completed tasks count
-                if 'CompletedTasks' not in self.employee_df.columns:
-                    self.employee_df['CompletedTasks'] = 0
+                if 'CompletedTasks' not in employee_df.columns:
+                    employee_df['CompletedTasks'] = 0
                 
-                # Add email column if it doesn't exist
-                if 'Email' not in self.employee_df.columns:
-                    # Generate emails based on name
-                    self.employee_df['Email'] = self.employee_df['Name'].apply(
-                        lambda name: f"{name.lower().replace(' ', '.')}@example.com"
-                    )
+                # The new roster is complete before anyone can see it; it replaces
+                # whichever version is current, re-indexed along with the swap
+                def build(_: Optional[pd.DataFrame]) -> pd.DataFrame:
+                    self._reset_leaderboard(employee_df)
+                    return employee_df
+                
+                with self.lock:
+                    self.roster.update(build, reindex=True)
+                    
+                    # Tasks are shared, so they may predate this load: derive the
+                    # fresh roster's counters from the event log
+                    if len(self.event_log):
+                        self.rebuild_workload()
+                    
+                    # Remember the source so later reloads only apply what changed
+                    self.roster_path = file_path
+                    self.roster_mtime = roster_mtime
+                    self.roster_hashes = self._hash_roster_rows(employee_df)
+                    self.bump_generation()
                 
-                st.session_state.employee_data_loaded = True
                 return True
             else:
                 st.error(f"File not found: {file_path}")
@@ -77,6 +145,223 @@ class DataHandler:
             st.error(f"Error loading employee data: {e}")
             return False
     
+    def _read_roster(self, file_path: str, chunksize: int,
+                     progress_callback: Optional[Callable[[float, int], None]]) -> Optional[pd.DataFrame]:
+        """
+        Stream a roster CSV in chunks, validating and normalizing each chunk
+        
+        Returns None (after reporting the problem) if the file is not a valid roster.
+        """
+        file_size = os.path.getsize(file_path) or 1
+        chunks = []
+        seen_ids = set()
+        vocabulary = {}
+        rows_loaded = 0
+        rows_skipped = 0
+        
+        with open(file_path, 'rb') as f:
+            reader = pd.read_csv(
+                f, chunksize=chunksize,
+                dtype={column: str for column in REQUIRED_EMPLOYEE_COLUMNS if column != 'ID'}
+            )
+            
+            for chunk in reader:
+                # Validate the header once, on the first chunk
+                if not chunks:
+                    missing = [c for c in REQUIRED_EMPLOYEE_COLUMNS if c not in chunk.columns]
+                    if missing:
+                        st.error(f"Employee data is missing required columns: {', '.join(missing)}")
+                        return None
+                
+                chunk, skipped = self._process_employee_chunk(chunk, seen_ids, vocabulary)
+                rows_skipped += skipped
+                rows_loaded += len(chunk)
+                chunks.append(chunk)
+                
+                if progress_callback is not None:
+                    progress_callback(min(f.tell() / file_size, 1.0), rows_loaded)
+        
+        if not chunks:
+            st.error(f"Employee data file is empty: {file_path}")
+            return None
+        
+        if rows_skipped:
+            st.warning(f"Skipped {rows_skipped} employee rows with a missing or duplicate ID")
+        
+        self.skill_vocabulary = vocabulary
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    
+    def _process_employee_chunk(self, chunk: pd.DataFrame, seen_ids: set,
+                                vocabulary: Dict[str, str]) -> Tuple[pd.DataFrame, int]:
+        """
+        Validate and normalize one parsed chunk of the roster
+        
+        Returns the cleaned chunk and the number of rows that were dropped.
+        """
+        rows_in = len(chunk)
+        
+        # Drop rows without an ID, and IDs already seen in an earlier row
+        chunk = chunk[chunk['ID'].notnull()]
+        ids = chunk['ID'].astype(int)
+        keep = (~ids.isin(seen_ids) & ~ids.duplicated()).values
+        chunk = chunk[keep].copy()
+        chunk['ID'] = ids.values[keep]
+        seen_ids.update(chunk['ID'].tolist())
+        
+        # Intern repeated strings so equal values share one object across chunks
+        for column in INTERNED_EMPLOYEE_COLUMNS:
+            chunk[column] = [sys.intern(str(value)) for value in chunk[column]]
+        
+        # Process skills column to ensure it's a list of vocabulary entries
+        chunk['Skills'] = [
+            [vocabulary.setdefault(skill, sys.intern(skill)) for skill in (s.strip() for s in str(x).split(','))]
+            for x in chunk['Skills']
+        ]
+        
+        # Add email column if it doesn't exist
+        if 'Email' not in chunk.columns:
+            # Generate emails based on name
+            chunk['Email'] = [f"{name.lower().replace(' ', '.')}@example.com" for name in chunk['Name']]
+        
+        return chunk, rows_in - len(chunk)
+    
+    @property
+    def employee_df(self) -> Optional[pd.DataFrame]:
+        """
+        The current roster snapshot (read-only; changes publish a new version, see roster.py)
+        """
+        return self.roster.employee_df
+    
+    @property
+    def employee_contacts(self) -> Dict[int, Tuple[str, str]]:
+        """
+        (Name, Email) of every employee by ID, so notifications skip DataFrame lookups
+        """
+        return self.roster.current.contacts
+    
+    @property
+    def employee_rows(self) -> Dict[int, int]:
+        """
+        Row position of every employee by ID, so counter updates skip scanning the roster
+        
+        Positions index the current snapshot only; a reader holding an older
+        DataFrame takes both from one roster.snapshot() instead.
+        """
+        return self.roster.current.rows
+    
+    def _reset_leaderboard(self, employee_df: pd.DataFrame) -> None:
+        """
+        Rebuild the all-time leaderboard for a newly loaded roster
+        """
+        self.leaderboard.reset(employee_df['ID'].tolist(), employee_df['CompletedTasks'].tolist())
+    
+    def _hash_roster_rows(self, employee_df: pd.DataFrame) -> pd.Series:
+        """
+        Hash the CSV-sourced fields of every employee, indexed by employee ID
+        """
+        source = employee_df[[c for c in REQUIRED_EMPLOYEE_COLUMNS if c != 'ID'] + ['Email']].copy()
+        source['Skills'] = [', '.join(skills) for skills in source['Skills']]
+        hashes = pd.util.hash_pandas_object(source, index=False)
+        hashes.index = employee_df['ID'].values
+        return hashes
+    
+    def roster_file_changed(self) -> bool:
+        """
+        Check whether the roster CSV on disk is newer than the loaded one
+        """
+        path = self.roster_path
+        if path is None or not os.path.exists(path):
+            return False
+        return os.path.getmtime(path) > self.roster_mtime
+    
+    @instrumented(rows=roster_rows)
+    def reload_employee_data(self, file_path: Optional[str] = None, chunksize: int = 10000,
+                             progress_callback: Optional[Callable[[float, int], None]] = None) -> Optional[Dict[str, List[int]]]:
+        """
+        Apply only the changed employees from an updated roster CSV
+        
+        Rows are compared by ID using a hash of their CSV fields. Inserted employees
+        start unassigned, updated employees keep their live TaskCount, CompletedTasks
+        and Status, and deleted employees are removed.
+        
+        Returns a dict with the 'inserted', 'updated' and 'deleted' employee IDs,
+        or None if the reload failed.
+        """
+        file_path = file_path or self.roster_path
+        if self.employee_df is None or file_path is None:
+            return None
+        
+        try:
+            if not os.path.exists(file_path):
+                st.error(f"File not found: {file_path}")
+                return None
+            
+            roster_mtime = os.path.getmtime(file_path)
+            new_df = self._read_roster(file_path, chunksize, progress_callback)
+            if new_df is None:
+                return None
+            
+            old_hashes = self.roster_hashes
+            new_hashes = self._hash_roster_rows(new_df)
+            
+            common = old_hashes.index.intersection(new_hashes.index)
+            inserted = new_hashes.index.difference(old_hashes.index).tolist()
+            deleted = old_hashes.index.difference(new_hashes.index).tolist()
+            updated = common[old_hashes.loc[common].values != new_hashes.loc[common].values].tolist()
+            
+            if updated or inserted:
+                new_by_id = new_df.set_index('ID', drop=False)
+            
+            def build(employee_df: pd.DataFrame) -> pd.DataFrame:
+                # Merge into the latest version, so counter updates made while the
+                # file was being read are kept
+                if deleted:
+                    employee_df = employee_df[~employee_df['ID'].isin(deleted)]
+                
+                if updated:
+                    # Overwrite only the CSV-sourced fields; live counters are left as they are
+                    positions = pd.Index(employee_df['ID']).get_indexer(updated)
+                    changed_rows = new_by_id.loc[updated]
+                    employee_df = with_values(employee_df, positions, {
+                        column: changed_rows[column].to_numpy(dtype=object)
+                        for column in new_df.columns
+                        if column not in ('ID', 'Status', 'TaskCount', 'CompletedTasks')
+                    })
+                
+                if inserted:
+                    new_rows = new_by_id.loc[inserted].reset_index(drop=True)
+                    if 'Status' not in new_df.columns:
+                        new_rows['Status'] = 'Unassigned'
+                    if 'TaskCount' not in new_df.columns:
+                        new_rows['TaskCount'] = 0
+                    if 'CompletedTasks' not in new_df.columns:
+                        new_rows['CompletedTasks'] = 0
+                    employee_df = pd.concat([employee_df, new_rows.reindex(columns=employee_df.columns)], ignore_index=True)
+                elif deleted:
+                    employee_df = employee_df.reset_index(drop=True)
+                
+                # Row positions change with the new version, so it is re-indexed as it is published
+                self._reset_leaderboard(employee_df)
+                return employee_df
+            
+            with self.lock:
+                # Sessions share the roster: if another one applied a reload
+                # meanwhile, these changes are already in (or superseded)
+                if self.roster_hashes is not old_hashes:
+                    return {"inserted": [], "updated": [], "deleted": []}
+                
+                self.roster.update(build, reindex=True)
+                self.roster_path = file_path
+                self.roster_mtime = roster_mtime
+                self.roster_hashes = new_hashes
+                self.bump_generation()
+            
+            return {"inserted": inserted, "updated": updated, "deleted": deleted}
+        except Exception as e:
+            st.error(f"Error reloading employee data: {e}")
+            return None
+    
+    @instrumented()
     def get_all_skills(self) -> List[str]:
         """
         Get a unique list of all skills from the employee data
@@ -84,34 +369,40 @@ class DataHandler:
         if self.employee_df is None:
             return []
         
-        all_skills = []
-        for skills_list in self.employee_df['Skills']:
-            all_skills.extend(skills_list)
-        
-        return sorted(list(set(all_skills)))
+        return sorted(self.skill_vocabulary)
     
+    @instrumented()
     def add_task(self, description: str, required_skills: List[str], due_date: Optional[str] = None, 
-                priority: str = "Medium") -> int:
+                priority: str = "Medium", task_type: Optional[str] = None,
+                estimated_hours: Optional[float] = None) -> int:
         """
         Add a new task to the task list
-        """
-        task_id = st.session_state.task_counter
-        
-        new_task = {
-            "TaskID": task_id,
-            "Description": description,
-            "Required_Skills": required_skills,
-            "Assigned_To": None,
-            "Status": "Not Started",
-            "Due_Date": due_date,
-            "Priority": priority
-        }
-        
-        st.session_state.tasks.append(new_task)
-        st.session_state.task_counter += 1
         
-        # Update tasks DataFrame
-        self.tasks_df = pd.DataFrame(st.session_state.tasks)
+        task_type is the Role the task calls for (matched against employees'
+        preferred task types); estimated_hours is its effort (see capacity.py).
+        """
+        with self.lock:
+            task_id = self.task_counter
+            self.task_counter += 1
+            
+            new_task = {
+                "TaskID": task_id,
+                "Description": description,
+                "Required_Skills": required_skills,
+                "Assigned_To": None,
+                "Status": "Not Started",
+                "Due_Date": due_date,
+                "Priority": priority,
+                "Task_Type": task_type,
+                "Estimated_Hours": estimated_hours,
+                "Created_Date": timestamps.now(),
+                "Version": 1
+            }
+            
+            self.tasks[task_id] = new_task
+            self.event_log.append("created", task_id, status=new_task["Status"])
+            self._notify_task_listeners("created", new_task)
+            self.bump_generation()
         
         return task_id
     
@@ -121,18 +412,16 @@ class DataHandler:
         """
         # This is a mock function for demonstration. In production, you would use actual email service.
         try:
-            # Store email in session state for demo purposes
-            if 'sent_emails' not in st.session_state:
-                st.session_state.sent_emails = []
-            
+            # Store email in the session's notification inbox for demo purposes
             email_data = {
                 "to": to_email,
                 "subject": subject,
                 "message": message,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "timestamp": timestamps.now()
             }
             
-            st.session_state.sent_emails.append(email_data)
+            with self.lock:
+                self.notification_inbox.append(email_data)
             
             # In a real implementation, you would use:
             # sender_email = "your_email@gmail.com"
@@ -156,7 +445,21 @@ class DataHandler:
             st.error(f"Error sending email: {e}")
             return False
     
-    def assign_task(self, task_id: int, employee_id: int, ai_recommended: bool = False, ai_score: float = 0.0) -> bool:
+    def compact_notifications(self, retention_days: int = 90, recipient: Optional[str] = None) -> int:
+        """
+        Drop notifications older than the retention period
+        
+        Parameters:
+        - retention_days: Number of days notifications are kept
+        - recipient: Only compact this recipient's inbox (defaults to every inbox)
+        """
+        cutoff = timestamps.now() - retention_days * timestamps.SECONDS_PER_DAY
+        with self.lock:
+            return self.notification_inbox.compact(cutoff, recipient)
+    
+    @instrumented()
+    def assign_task(self, task_id: int, employee_id: int, ai_recommended: bool = False, ai_score: float = 0.0,
+                    expected_version: Optional[int] = None) -> bool:
         """
         Assign a task to an employee
         
@@ -165,193 +468,451 @@ class DataHandler:
         - employee_id: The ID of the employee to assign the task to
         - ai_recommended: Whether this assignment was recommended by AI
         - ai_score: The confidence score of the AI recommendation
-        """
-        # Check if employee exists
-        if self.employee_df is None or employee_id not in self.employee_df['ID'].values:
-            return False
+        - expected_version: Compare-and-set: only assign if the task is still at
+          this Version (None assigns unconditionally)
         
-        # Find the task in session state
-        for task in st.session_state.tasks:
-            if task["TaskID"] == task_id:
-                task["Assigned_To"] = employee_id
-                task["Status"] = "In Progress"
-                task["Assigned_Date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                task["AI_Assigned"] = ai_recommended
-                task["AI_Recommendation_Score"] = ai_score
-                
-                # Update employee task count
-                employee_idx = self.employee_df.index[self.employee_df['ID'] == employee_id].tolist()[0]
-                self.employee_df.at[employee_idx, 'TaskCount'] += 1
-                
-                # Update employee status based on task count
-                task_count = self.employee_df.at[employee_idx, 'TaskCount']
-                if task_count == 0:
-                    self.employee_df.at[employee_idx, 'Status'] = 'Unassigned'
-                elif 1 <= task_count <= 3:
-                    self.employee_df.at[employee_idx, 'Status'] = 'Partially Assigned'
-                else:
-                    self.employee_df.at[employee_idx, 'Status'] = 'Fully Assigned'
-                
-                # Send email notification to the employee
-                employee_email = self.employee_df.at[employee_idx, 'Email']
-                employee_name = self.employee_df.at[employee_idx, 'Name']
-                
-                email_subject = f"New Task Assignment: {task['Description'][:30]}..."
-                email_message = f"""
-                <html>
-                <body>
-                    <h2>New Task Assignment</h2>
-                    <p>Hello {employee_name},</p>
-                    <p>You have been assigned a new task:</p>
-                    <div style="background-color:#f0f0f0; padding:15px; border-radius:5px;">
-                        <p><strong>Task ID:</strong> {task_id}</p>
-                        <p><strong>Description:</strong> {task['Description']}</p>
-                        <p><strong>Required Skills:</strong> {', '.join(task['Required_Skills'])}</p>
-                        <p><strong>Priority:</strong> {task['Priority']}</p>
-                        <p><strong>Due Date:</strong> {task['Due_Date']}</p>
-                        <p><strong>Status:</strong> {task['Status']}</p>
-                    </div>
-                    <p>Please log in to the Task Management System to view more details and update your progress.</p>
-                    <p>Thank you,<br>Task Management System</p>
-                </body>
-                </html>
-                """
-                
+        Returns False if the task or employee does not exist, or the task has
+        changed since expected_version was read.
+        """
+        with self.lock:
+            # Check if employee exists
+            if self.employee_df is None or employee_id not in self.employee_contacts:
+                return False
+            
+            task = self.tasks.get(task_id)
+            if task is None or not self._version_matches(task, expected_version):
+                return False
+            
+            task = self._assign(task, employee_id, ai_recommended, ai_score)
+            
+            # Send email notification to the employee
+            if self._wants_notification(employee_id, "assignment"):
+                employee_name, employee_email = self.employee_contacts[employee_id]
+                email_subject, email_message = notifications.render_assignment(employee_name, task)
                 self.send_email_notification(employee_email, email_subject, email_message)
+            
+            self.bump_generation()
+        
+        return True
+    
+    @instrumented(rows=lambda assigned_count, *args, **kwargs: assigned_count)
+    def assign_tasks(self, assignments: List[Tuple[int, int, bool, float]],
+                     expected_versions: Optional[Dict[int, int]] = None) -> int:
+        """
+        Assign many tasks at once, sending each employee a single digest email
+        
+        Parameters:
+        - assignments: (task_id, employee_id, ai_recommended, ai_score) tuples
+        - expected_versions: Compare-and-set: Version by task ID; tasks that have
+          changed since are skipped (tasks not listed are assigned unconditionally)
+        
+        Returns the number of tasks that were assigned.
+        """
+        if self.employee_df is None:
+            return 0
+        
+        assigned_by_employee = {}
+        
+        with self.lock:
+            for task_id, employee_id, ai_recommended, ai_score in assignments:
+                task = self.tasks.get(task_id)
+                if task is None or employee_id not in self.employee_contacts:
+                    continue
+                if expected_versions and not self._version_matches(task, expected_versions.get(task_id)):
+                    continue
                 
-                # Update tasks DataFrame
-                self.tasks_df = pd.DataFrame(st.session_state.tasks)
-                
-                return True
+                task = self._assign(task, employee_id, ai_recommended, ai_score)
+                assigned_by_employee.setdefault(employee_id, []).append(task)
+            
+            # One email per recipient listing all of their new tasks
+            for employee_id, tasks in assigned_by_employee.items():
+                if self._wants_notification(employee_id, "assignment"):
+                    employee_name, employee_email = self.employee_contacts[employee_id]
+                    email_subject, email_message = notifications.render_assignment_digest(employee_name, tasks)
+                    self.send_email_notification(employee_email, email_subject, email_message)
+            
+            # Invalidate derived data once for the whole batch
+            self.bump_generation()
+        
+        return sum(len(tasks) for tasks in assigned_by_employee.values())
+    
+    def _assign(self, task: Dict[str, Any], employee_id: int, ai_recommended: bool, ai_score: float) -> Dict[str, Any]:
+        """
+        Store the next version of the task with the assignment recorded, update
+        workload counters and return the new version (caller holds the lock)
+        """
+        # Reassigning a completed task takes its completion back out of the analytics
+        if "Completion_Date" in task:
+            self._record_completion(task, -1)
+        
+        completed_at = task.get("Completion_Date")
+        task = self._next_version(task)
+        task["Assigned_To"] = employee_id
+        task["Status"] = "In Progress"
+        task["Assigned_Date"] = timestamps.now()
+        task["AI_Assigned"] = ai_recommended
+        task["AI_Recommendation_Score"] = ai_score
+        task.pop("Completion_Date", None)
+        self.tasks[task["TaskID"]] = task
         
-        return False
+        # Update workload counters (including the previous assignee's on reassignment)
+        deltas = self.event_log.append("assigned", task["TaskID"], employee_id, task["Status"])
+        self._apply_workload_deltas(deltas, completed_at)
+        self._notify_task_listeners("assigned", task)
+        return task
+    
+    def _next_version(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy of a task with its Version incremented, to be changed and stored in its place
+        """
+        task = dict(task)
+        task["Version"] = task.get("Version", 0) + 1
+        return task
+    
+    def _version_matches(self, task: Dict[str, Any], expected_version: Optional[int]) -> bool:
+        return expected_version is None or task.get("Version") == expected_version
+    
+    def get_task(self, task_id: int) -> Optional[Dict[str, Any]]:
+        """
+        The current version of a task (its Version can be passed back as expected_version)
+        """
+        return self.tasks.get(task_id)
+    
+    def set_preference_provider(self, provider: Callable[[int, str], Any]) -> None:
+        """
+        Set the lookup used to read employee preferences, e.g.
+        EmployeeManagement.get_employee_preference
+        """
+        self.preference_provider = provider
     
-    def update_task_status(self, task_id: int, status: str, progress_percentage: int = None) -> bool:
+    def _wants_notification(self, employee_id: int, kind: str) -> bool:
+        """
+        Check an employee's "Notification Preferences" for a kind of notification
+        
+        Employees who never saved preferences receive every notification.
+        """
+        if self.preference_provider is None:
+            return True
+        
+        preferences = self.preference_provider(employee_id, "notification_preferences")
+        if preferences is None:
+            return True
+        
+        return notifications.NOTIFICATION_PREFERENCES[kind] in preferences
+    
+    @instrumented()
+    def update_task_status(self, task_id: int, status: str, progress_percentage: int = None,
+                           expected_version: Optional[int] = None) -> bool:
         """
         Update the status of a task with optional progress percentage
+        
+        Parameters:
+        - task_id: The ID of the task to update
+        - status: The new status
+        - progress_percentage: The new progress (defaults by status if the task has none)
+        - expected_version: Compare-and-set: only update if the task is still at
+          this Version (None updates unconditionally)
+        
+        Returns False if the task does not exist or has changed since
+        expected_version was read.
         """
-        for task in st.session_state.tasks:
-            if task["TaskID"] == task_id:
-                prev_status = task["Status"]
-                task["Status"] = status
-                task["Last_Updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                # Update progress percentage if provided
-                if progress_percentage is not None:
-                    task["Progress"] = progress_percentage
-                elif "Progress" not in task:
-                    # Initialize progress based on status
-                    if status == "Not Started":
-                        task["Progress"] = 0
-                    elif status == "In Progress":
-                        task["Progress"] = 25
-                    elif status == "Completed":
-                        task["Progress"] = 100
-                    else:  # Blocked
-                        task["Progress"] = task.get("Progress", 25)  # Keep existing or default to 25%
-                
-                # If task is completed, increment employee's completed task count
-                if status == "Completed" and prev_status != "Completed" and task["Assigned_To"] is not None:
-                    employee_id = task["Assigned_To"]
-                    employee_idx = self.employee_df.index[self.employee_df['ID'] == employee_id].tolist()[0]
-                    self.employee_df.at[employee_idx, 'CompletedTasks'] += 1
-                    self.employee_df.at[employee_idx, 'TaskCount'] -= 1
-                    
-                    # Update employee status if needed
-                    new_task_count = self.employee_df.at[employee_idx, 'TaskCount']
-                    if new_task_count == 0:
-                        self.employee_df.at[employee_idx, 'Status'] = 'Unassigned'
-                    elif 1 <= new_task_count <= 3:
-                        self.employee_df.at[employee_idx, 'Status'] = 'Partially Assigned'
-                    
-                    # Send email notification about task completion
-                    employee_email = self.employee_df.at[employee_idx, 'Email']
-                    employee_name = self.employee_df.at[employee_idx, 'Name']
-                    
-                    email_subject = f"Task Completed: {task['Description'][:30]}..."
-                    email_message = f"""
-                    <html>
-                    <body>
-                        <h2>Task Completed</h2>
-                        <p>Hello {employee_name},</p>
-                        <p>You have successfully completed the following task:</p>
-                        <div style="background-color:#f0f0f0; padding:15px; border-radius:5px;">
-                            <p><strong>Task ID:</strong> {task_id}</p>
-                            <p><strong>Description:</strong> {task['Description']}</p>
-                            <p><strong>Completion Date:</strong> {task['Last_Updated']}</p>
-                        </div>
-                        <p>Thank you for your hard work!</p>
-                        <p>Best regards,<br>Task Management System</p>
-                    </body>
-                    </html>
-                    """
-                    
+        completed_task = None
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None or not self._version_matches(task, expected_version):
+                return False
+            
+            prev_status = task["Status"]
+            task = self._next_version(task)
+            task["Status"] = status
+            task["Last_Updated"] = timestamps.now()
+            
+            # Update progress percentage if provided
+            if progress_percentage is not None:
+                task["Progress"] = progress_percentage
+            elif "Progress" not in task:
+                # Initialize progress based on status
+                if status == "Not Started":
+                    task["Progress"] = 0
+                elif status == "In Progress":
+                    task["Progress"] = 25
+                elif status == "Completed":
+                    task["Progress"] = 100
+                else:  # Blocked
+                    task["Progress"] = task.get("Progress", 25)  # Keep existing or default to 25%
+            
+            # Update workload counters for any transition, including reopening and blocking
+            completed_at = task.get("Completion_Date")
+            if status != prev_status:
+                if status == "Completed":
+                    task["Completion_Date"] = completed_at = task["Last_Updated"]
+                    self._record_completion(task, 1)
+                elif prev_status == "Completed":
+                    self._record_completion(task, -1)
+                    task.pop("Completion_Date", None)
+            self.tasks[task_id] = task
+            
+            if status != prev_status:
+                deltas = self.event_log.append("status_changed", task_id, status=status)
+                self._apply_workload_deltas(deltas, completed_at)
+                self._notify_task_listeners("status_changed", task)
+            
+            employee_id = task["Assigned_To"]
+            
+            # If task is completed, notify the employee
+            if status == "Completed" and prev_status != "Completed" and employee_id is not None:
+                # Send email notification about task completion
+                if employee_id in self.employee_contacts and self._wants_notification(employee_id, "completion"):
+                    employee_name, employee_email = self.employee_contacts[employee_id]
+                    email_subject, email_message = notifications.render_completion(employee_name, task)
                     self.send_email_notification(employee_email, email_subject, email_message)
                 
-                # If task status has changed from previous status, send notification
-                elif status != prev_status and task["Assigned_To"] is not None and status != "Completed":
-                    employee_id = task["Assigned_To"]
-                    employee_idx = self.employee_df.index[self.employee_df['ID'] == employee_id].tolist()[0]
-                    employee_email = self.employee_df.at[employee_idx, 'Email']
-                    employee_name = self.employee_df.at[employee_idx, 'Name']
-                    
-                    email_subject = f"Task Status Update: {task['Description'][:30]}..."
-                    email_message = f"""
-                    <html>
-                    <body>
-                        <h2>Task Status Update</h2>
-                        <p>Hello {employee_name},</p>
-                        <p>The status of your task has been updated:</p>
-                        <div style="background-color:#f0f0f0; padding:15px; border-radius:5px;">
-                            <p><strong>Task ID:</strong> {task_id}</p>
-                            <p><strong>Description:</strong> {task['Description']}</p>
-                            <p><strong>Previous Status:</strong> {prev_status}</p>
-                            <p><strong>New Status:</strong> {status}</p>
-                            <p><strong>Progress:</strong> {task['Progress']}%</p>
-                            <p><strong>Last Updated:</strong> {task['Last_Updated']}</p>
-                        </div>
-                        <p>Please log in to the Task Management System to view more details.</p>
-                        <p>Thank you,<br>Task Management System</p>
-                    </body>
-                    </html>
-                    """
-                    
+                completed_task = task
+            
+            # If task status has changed from previous status, send notification
+            elif status != prev_status and employee_id is not None and status != "Completed":
+                if employee_id in self.employee_contacts and self._wants_notification(employee_id, "status_update"):
+                    employee_name, employee_email = self.employee_contacts[employee_id]
+                    email_subject, email_message = notifications.render_status_update(employee_name, task, prev_status)
                     self.send_email_notification(employee_email, email_subject, email_message)
+            
+            self.bump_generation()
+        
+        # Let listeners (e.g. the online learner) see the completion, after
+        # releasing the lock so a slow listener never blocks other writers
+        if completed_task is not None:
+            for listener in self.completion_listeners:
+                listener(completed_task)
+        
+        return True
+    
+    @instrumented()
+    def delete_task(self, task_id: int) -> bool:
+        """
+        Delete a task, releasing it from its assignee's workload
+        """
+        with self.lock:
+            task = self.tasks.pop(task_id, None)
+            if task is None:
+                return False
+            
+            deltas = self.event_log.append("deleted", task_id)
+            self._apply_workload_deltas(deltas, task.get("Completion_Date"))
+            if "Completion_Date" in task:
+                self._record_completion(task, -1)
+            self._notify_task_listeners("deleted", task)
+            
+            self.bump_generation()
+        
+        return True
+    
+    @instrumented()
+    def reschedule_task(self, task_id: int, priority: Optional[str] = None, due_date: Optional[str] = None,
+                        expected_version: Optional[int] = None) -> bool:
+        """
+        Change a task's priority and/or due date
+        
+        Returns False if the task does not exist or has changed since
+        expected_version was read.
+        """
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None or not self._version_matches(task, expected_version):
+                return False
+            
+            task = self._next_version(task)
+            if priority is not None:
+                task["Priority"] = priority
+            if due_date is not None:
+                task["Due_Date"] = due_date
+            task["Last_Updated"] = timestamps.now()
+            self.tasks[task_id] = task
+            self._notify_task_listeners("rescheduled", task)
+            
+            self.bump_generation()
+        
+        return True
+    
+    def _get_employee_idx(self, employee_id: int) -> Optional[int]:
+        """
+        Get the row position of an employee in employee_df
+        """
+        if self.employee_df is None:
+            return None
+        
+        return self.employee_rows.get(employee_id)
+    
+    def _apply_workload_deltas(self, deltas: Dict[int, Tuple[int, int]], completed_at: Optional[float] = None) -> None:
+        """
+        Apply per-employee (active, completed) count deltas from the event log to
+        the roster and the leaderboard
+        
+        Parameters:
+        - deltas: Deltas returned by TaskEventLog.append
+        - completed_at: Completion time (epoch seconds) of the task the deltas are
+          about, used by the weekly and monthly leaderboards
+        """
+        changed_ids = []
+        
+        def build(employee_df: pd.DataFrame) -> Optional[pd.DataFrame]:
+            # Next roster version with just these employees' counters changed;
+            # positions are looked up here, where no reload can move them
+            positions, task_counts, completed_counts = [], [], []
+            for employee_id, (active_delta, completed_delta) in deltas.items():
+                employee_idx = self._get_employee_idx(employee_id)
+                if employee_idx is None:
+                    continue
                 
-                # Update tasks DataFrame
-                self.tasks_df = pd.DataFrame(st.session_state.tasks)
-                
-                return True
+                changed_ids.append(employee_id)
+                positions.append(employee_idx)
+                task_counts.append(employee_df['TaskCount'].iat[employee_idx] + active_delta)
+                completed_counts.append(employee_df['CompletedTasks'].iat[employee_idx] + completed_delta)
+            
+            if not positions:
+                return None
+            
+            return with_values(employee_df, positions, {
+                'TaskCount': task_counts,
+                'CompletedTasks': completed_counts,
+                'Status': [workload_status(count) for count in task_counts]
+            })
         
-        return False
+        self.roster.update(build)
+        
+        for employee_id in changed_ids:
+            completed_delta = deltas[employee_id][1]
+            if completed_delta:
+                self.leaderboard.record(employee_id, completed_delta, completed_at)
+    
+    def _record_completion(self, task: Dict[str, Any], sign: int) -> None:
+        """
+        Add (sign=1) or take back (sign=-1) a completed task's completion time in the analytics
+        """
+        self.ai_analytics.record_completion(task.get("AI_Assigned", False), task.get("Assigned_Date"),
+                                            task.get("Completion_Date"), sign)
+    
+    def rebuild_workload(self) -> None:
+        """
+        Recompute every employee's TaskCount, CompletedTasks and Status from the event log
+        """
+        if self.employee_df is None:
+            return
+        
+        def build(employee_df: pd.DataFrame) -> pd.DataFrame:
+            employee_ids = employee_df['ID']
+            task_counts = employee_ids.map(aggregates['ActiveTasks']).fillna(0).astype(int)
+            return with_columns(employee_df, {
+                'TaskCount': task_counts,
+                'CompletedTasks': employee_ids.map(aggregates['CompletedTasks']).fillna(0).astype(int),
+                'Status': task_counts.map(workload_status)
+            })
+        
+        with self.lock:
+            aggregates = self.event_log.rebuild()
+            snapshot = self.roster.update(build)
+            employee_df = snapshot.employee_df
+            self.leaderboard.reset(employee_df['ID'].tolist(), employee_df['CompletedTasks'].tolist())
+            self.bump_generation()
+    
+    def bump_generation(self) -> None:
+        """
+        Mark the data as changed, invalidating every cached view model
+        """
+        self.mutations += 1
+    
+    @property
+    def generation(self) -> int:
+        """
+        Grows on every change to the data, so derived views (see view_models.py)
+        know when to recompute
+        
+        Every published roster version counts too, including those published
+        without going through DataHandler (e.g. EmployeeManagement's skill edits).
+        """
+        return self.mutations + self.roster.version
+    
+    def add_completion_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Register a callback to be invoked with each task that transitions to Completed
+        
+        Unlike task listeners, these run after the lock is released, and may
+        run concurrently from several threads.
+        """
+        if listener not in self.completion_listeners:
+            self.completion_listeners.append(listener)
+    
+    def add_task_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        """
+        Register a callback to be invoked with (event, task) whenever a task is
+        created, assigned, changes status, is rescheduled or is deleted
+        
+        Listeners run while the lock is held, so they must be quick and must not
+        wait on anything that needs the lock from another thread.
+        """
+        if listener not in self.task_listeners:
+            self.task_listeners.append(listener)
+    
+    def _notify_task_listeners(self, event: str, task: Dict[str, Any]) -> None:
+        for listener in self.task_listeners:
+            listener(event, task)
     
     def get_employee_tasks(self, employee_id: int) -> List[Dict[str, Any]]:
         """
         Get all tasks assigned to a specific employee
         """
-        if not st.session_state.tasks:
-            return []
-        
-        return [task for task in st.session_state.tasks if task["Assigned_To"] == employee_id]
+        return [task for task in self.get_all_tasks() if task["Assigned_To"] == employee_id]
     
     def get_all_tasks(self) -> List[Dict[str, Any]]:
         """
-        Get all tasks
+        Get all tasks (the current version of each, as a new list)
         """
-        return st.session_state.tasks
+        with self.lock:
+            return list(self.tasks.values())
+    
+    @property
+    def tasks_df(self) -> pd.DataFrame:
+        """
+        All tasks as a DataFrame, rebuilt on first use after the data changed
+        """
+        generation, tasks_df = self._tasks_df
+        if generation != self.generation:
+            with self.lock:
+                generation = self.generation
+                tasks = list(self.tasks.values())
+            if tasks:
+                tasks_df = pd.DataFrame(tasks)
+            else:
+                tasks_df = pd.DataFrame(columns=["TaskID", "Description", "Required_Skills",
+                                                 "Assigned_To", "Status", "Due_Date", "Priority",
+                                                 "AI_Assigned", "AI_Recommendation_Score"])
+            self._tasks_df = (generation, tasks_df)
+        return tasks_df
     
-    def get_leaderboard_data(self) -> pd.DataFrame:
+    @instrumented()
+    def get_leaderboard_data(self, limit: int = 10, window: Optional[str] = None) -> pd.DataFrame:
         """
         Get data for the performance leaderboard
+        
+        Parameters:
+        - limit: Number of top performers to return
+        - window: None for all-time, "week" or "month" for completions in the current period
         """
-        if self.employee_df is None:
+        # Row positions and the DataFrame they index come from one roster version
+        snapshot = self.roster.snapshot()
+        if snapshot.employee_df is None:
             return pd.DataFrame()
         
-        leaderboard = self.employee_df[['ID', 'Name', 'Role', 'CompletedTasks']].copy()
-        leaderboard = leaderboard.sort_values(by='CompletedTasks', ascending=False)
+        # Rankings are updated by writers in place, so read them under the lock
+        with self.lock:
+            ranked = [(emp_id, count) for emp_id, count in self.leaderboard.top(limit, window)
+                      if emp_id in snapshot.rows]
         
-        return leaderboard
+        positions = [snapshot.rows[emp_id] for emp_id, _ in ranked]
+        leaderboard = snapshot.employee_df.iloc[positions][['ID', 'Name', 'Role']].copy()
+        leaderboard['CompletedTasks'] = [count for _, count in ranked]
         
+        return leaderboard
+    
     def record_ai_prediction(self, task_id: int, employee_id: int, confidence_score: float) -> None:
         """
         Record an AI prediction for later evaluation
@@ -365,11 +926,14 @@ class DataHandler:
             "task_id": task_id,
             "recommended_employee_id": employee_id,
             "confidence_score": confidence_score,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": timestamps.now(),
             "success": None  # Will be updated when task is completed
         }
         
-        st.session_state.ai_predictions.append(prediction)
+        with self.lock:
+            self.ai_predictions.append(prediction)
+            self.ai_analytics.record_prediction(task_id, employee_id, confidence_score, prediction["timestamp"])
+            self.bump_generation()
     
     def update_ai_prediction_success(self, task_id: int, success: bool) -> bool:
         """
@@ -379,30 +943,28 @@ class DataHandler:
         - task_id: The ID of the completed task
         - success: Whether the AI prediction was successful (task completed on time, etc.)
         """
-        for prediction in st.session_state.ai_predictions:
-            if prediction["task_id"] == task_id and prediction["success"] is None:
-                prediction["success"] = success
-                prediction["evaluation_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                return True
-        
-        return False
+        # The analytics know the pending prediction's row, which is also its list position
+        evaluation_date = timestamps.now()
+        with self.lock:
+            row = self.ai_analytics.evaluate(task_id, success, evaluation_date)
+            if row is None:
+                return False
+            
+            prediction = self.ai_predictions[row]
+            prediction["success"] = success
+            prediction["evaluation_date"] = evaluation_date
+            self.bump_generation()
+        return True
     
     def get_ai_performance_data(self) -> List[Dict[str, Any]]:
         """
         Get AI prediction performance data for visualization
         """
-        return st.session_state.ai_predictions
-        
+        with self.lock:
+            return list(self.ai_predictions)
+    
     def get_ai_success_rate(self) -> float:
         """
         Calculate the success rate of AI predictions
         """
-        predictions = st.session_state.ai_predictions
-        evaluated_predictions = [p for p in predictions if p["success"] is not None]
-        
-        if not evaluated_predictions:
-            return 0.0
-            
-        successful_predictions = [p for p in evaluated_predictions if p["success"]]
-        
-        return len(successful_predictions) / len(evaluated_predictions)
+        return self.ai_analytics.success_rate()
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from typing import Optional, Dict, Any, List, Callable
 from components import task_card
+from timestamps import format_timestamp
 
 def login_screen() -> Optional[int]:
     """
@@ -100,24 +101,39 @@ def employee_task_dashboard(
             employee_view=True
         )
 
-def notifications_view(emails: List[Dict[str, Any]]) -> None:
+def notifications_view(
+    fetch_page: Callable[[int, int], List[Dict[str, Any]]],
+    total_count: int,
+    unread_count: int,
+    page_size: int = 20
+) -> None:
     """
-    Display all email notifications received by the employee
+    Display the email notifications received by the employee, one page at a time
+    
+    fetch_page(page, page_size) must return that page of notifications, newest first.
     """
     st.header("Notifications")
     
-    if not emails:
+    if total_count == 0:
         st.info("You don't have any notifications.")
         return
     
-    # Sort emails by timestamp (newest first)
-    sorted_emails = sorted(emails, key=lambda x: x['timestamp'], reverse=True)
+    page_count = (total_count + page_size - 1) // page_size
+    
+    cols = st.columns([1, 1, 2])
+    with cols[0]:
+        st.metric("Notifications", total_count)
+    with cols[1]:
+        st.metric("Unread", unread_count)
+    with cols[2]:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1) - 1
     
-    for email in sorted_emails:
-        with st.expander(f"{email['subject']} - {email['timestamp']}"):
+    for email in fetch_page(int(page), page_size):
+        sent_at = format_timestamp(email['timestamp'])
+        with st.expander(f"{email['subject']} - {sent_at}"):
             st.write(f"**From:** Task Management System")
             st.write(f"**To:** {email['to']}")
-            st.write(f"**Date:** {email['timestamp']}")
+            st.write(f"**Date:** {sent_at}")
             st.write(f"**Subject:** {email['subject']}")
             st.divider()
             st.markdown(email['message'], unsafe_allow_html=True)
\ No newline at end of file
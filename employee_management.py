@@ -1,32 +1,47 @@
+import numpy as np
 import pandas as pd
-import streamlit as st
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional
+from roster import RosterStore, with_values
+from preference_store import PreferenceStore
 
 class EmployeeManagement:
     """
     Manages employee preferences and settings
     """
-    def __init__(self, employee_df: Optional[pd.DataFrame] = None):
-        self.employee_df = employee_df
+    def __init__(self, employee_df: Optional[pd.DataFrame] = None, roster: Optional[RosterStore] = None,
+                 preference_store: Optional[PreferenceStore] = None):
+        # Shared roster that skill changes are published to; without one, the
+        # roster last passed to set_employee_data is used
+        self.roster = roster
+        self._employee_df = employee_df
         
-        # Initialize employee preferences
-        if 'employee_preferences' not in st.session_state:
-            st.session_state.employee_preferences = {}
+        # Where preferences are persisted; without one they last for this process only
+        self.preference_store = preference_store if preference_store is not None else PreferenceStore(":memory:")
+    
+    @property
+    def employee_df(self) -> Optional[pd.DataFrame]:
+        """
+        The current roster snapshot
+        """
+        if self.roster is not None:
+            return self.roster.employee_df
+        return self._employee_df
     
     def set_employee_data(self, employee_df: pd.DataFrame) -> None:
         """
         Set or update the employee data
         """
-        self.employee_df = employee_df
+        self._employee_df = employee_df
     
     def get_employee_by_id(self, employee_id: int) -> Optional[Dict[str, Any]]:
         """
         Get employee information by ID
         """
-        if self.employee_df is None:
+        employee_df = self.employee_df
+        if employee_df is None:
             return None
         
-        employee = self.employee_df[self.employee_df['ID'] == employee_id]
+        employee = employee_df[employee_df['ID'] == employee_id]
         
         if len(employee) == 0:
             return None
@@ -37,53 +52,54 @@ class EmployeeManagement:
         """
         Set a preference for an employee
         """
-        if employee_id not in st.session_state.employee_preferences:
-            st.session_state.employee_preferences[employee_id] = {}
-        
-        st.session_state.employee_preferences[employee_id][preference_type] = preference_value
+        self.preference_store.set(employee_id, preference_type, preference_value)
         return True
     
     def get_employee_preference(self, employee_id: int, preference_type: str) -> Any:
         """
         Get a preference for an employee
         """
-        if (employee_id not in st.session_state.employee_preferences or 
-            preference_type not in st.session_state.employee_preferences[employee_id]):
-            return None
-        
-        return st.session_state.employee_preferences[employee_id][preference_type]
+        return self.preference_store.get(employee_id, preference_type)
     
     def get_employee_preferences(self, employee_id: int) -> Dict[str, Any]:
         """
         Get all preferences for an employee
         """
-        if employee_id not in st.session_state.employee_preferences:
-            return {}
-        
-        return st.session_state.employee_preferences[employee_id]
+        return self.preference_store.get_all(employee_id)
     
     def update_employee_skill(self, employee_id: int, skill: str, add: bool = True) -> bool:
         """
         Add or remove a skill for an employee
+        
+        The skills list of a published roster is never modified: the employee
+        gets a new list in a new roster version.
         """
-        if self.employee_df is None:
-            return False
+        def build(employee_df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+            if employee_df is None:
+                return None
+            
+            employee_idx = np.flatnonzero(employee_df['ID'].to_numpy() == employee_id)
+            if len(employee_idx) == 0:
+                return None
+            
+            employee_idx = employee_idx[0]
+            current_skills = employee_df['Skills'].iat[employee_idx]
+            
+            if add and skill not in current_skills:
+                new_skills = current_skills + [skill]
+            elif not add and skill in current_skills:
+                new_skills = [s for s in current_skills if s != skill]
+            else:
+                return None
+            
+            return with_values(employee_df, [employee_idx], {'Skills': [new_skills]})
         
-        employee_idx = self.employee_df.index[self.employee_df['ID'] == employee_id].tolist()
+        if self.roster is not None:
+            return self.roster.update(build) is not None
         
-        if not employee_idx:
+        employee_df = build(self._employee_df)
+        if employee_df is None:
             return False
-        
-        employee_idx = employee_idx[0]
-        current_skills = self.employee_df.at[employee_idx, 'Skills']
-        
-        if add and skill not in current_skills:
-            current_skills.append(skill)
-            self.employee_df.at[employee_idx, 'Skills'] = current_skills
-            return True
-        elif not add and skill in current_skills:
-            current_skills.remove(skill)
-            self.employee_df.at[employee_idx, 'Skills'] = current_skills
-            return True
-            
-        return False
+        self._employee_df = employee_df
+        return True
+            
\ No newline at end of file
@@ -0,0 +1,233 @@
+import threading
+import time
+import functools
+import numpy as np
+import pandas as pd
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Optional, Callable
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus-style
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class FunctionStats:
+    """
+    Cumulative statistics of one instrumented function
+    """
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.rows_processed = 0
+        # One count per bucket plus the +Inf bucket
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+    
+    def observe(self, duration: float, rows: Optional[int], failed: bool) -> None:
+        self.calls += 1
+        self.errors += failed
+        self.total_seconds += duration
+        if rows:
+            self.rows_processed += rows
+        
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and duration > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        self.bucket_counts[bucket] += 1
+
+class Metrics:
+    """
+    Process-wide registry of call counts, latency histograms and rows processed
+    
+    The most recent calls and script reruns are also kept in ring buffers for
+    percentile charts and the slowest-rerun table.
+    """
+    def __init__(self, call_capacity: int = 5000, rerun_capacity: int = 500):
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.recent_calls = deque(maxlen=call_capacity)
+        self.recent_reruns = deque(maxlen=rerun_capacity)
+    
+    def record(self, name: str, duration: float, rows: Optional[int] = None, failed: bool = False) -> None:
+        """
+        Record one call of an instrumented function
+        """
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = FunctionStats()
+            stats.observe(duration, rows, failed)
+            self.recent_calls.append((name, time.time(), duration, rows))
+    
+    def record_rerun(self, section: str, duration: float) -> None:
+        """
+        Record one full Streamlit script run
+        """
+        with self.lock:
+            self.recent_reruns.append((section, time.time(), duration))
+    
+    def reset(self) -> None:
+        with self.lock:
+            self.stats = {}
+            self.recent_calls.clear()
+            self.recent_reruns.clear()
+    
+    def summary(self) -> pd.DataFrame:
+        """
+        Per-function summary: cumulative counts plus percentiles over the recent-call buffer
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            recent = list(self.recent_calls)
+        
+        durations = {}
+        for name, _, duration, _ in recent:
+            durations.setdefault(name, []).append(duration)
+        
+        rows = []
+        for name, function_stats in stats.items():
+            samples_ms = np.asarray(durations.get(name, [0.0])) * 1000.0
+            p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+            rows.append({
+                "Function": name,
+                "Calls": function_stats.calls,
+                "Errors": function_stats.errors,
+                "Mean (ms)": function_stats.total_seconds * 1000.0 / function_stats.calls,
+                "p50 (ms)": p50,
+                "p95 (ms)": p95,
+                "p99 (ms)": p99,
+                "Rows Processed": function_stats.rows_processed
+            })
+        
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows).sort_values("p95 (ms)", ascending=False).reset_index(drop=True)
+    
+    def slowest_reruns(self, limit: int = 10) -> pd.DataFrame:
+        """
+        The slowest script runs still in the rerun buffer
+        """
+        with self.lock:
+            reruns = list(self.recent_reruns)
+        
+        if not reruns:
+            return pd.DataFrame()
+        
+        reruns_df = pd.DataFrame(reruns, columns=["Section", "Timestamp", "Duration"])
+        reruns_df["Timestamp"] = pd.to_datetime(reruns_df["Timestamp"], unit="s")
+        reruns_df["Duration (ms)"] = reruns_df.pop("Duration") * 1000.0
+        return reruns_df.nlargest(limit, "Duration (ms)").reset_index(drop=True)
+    
+    def to_prometheus(self) -> str:
+        """
+        Export the cumulative statistics in the Prometheus text exposition format
+        """
+        with self.lock:
+            stats = {name: (s.calls, s.errors, s.total_seconds, s.rows_processed, list(s.bucket_counts))
+                     for name, s in self.stats.items()}
+        
+        lines = [
+            "# HELP taskflow_function_calls_total Calls of instrumented functions.",
+            "# TYPE taskflow_function_calls_total counter"
+        ]
+        lines += [f'taskflow_function_calls_total{{function="{name}"}} {calls}'
+                  for name, (calls, _, _, _, _) in stats.items()]
+        
+        lines += [
+            "# HELP taskflow_function_errors_total Calls of instrumented functions that raised.",
+            "# TYPE taskflow_function_errors_total counter"
+        ]
+        lines += [f'taskflow_function_errors_total{{function="{name}"}} {errors}'
+                  for name, (_, errors, _, _, _) in stats.items()]
+        
+        lines += [
+            "# HELP taskflow_rows_processed_total Rows processed by instrumented functions.",
+            "# TYPE taskflow_rows_processed_total counter"
+        ]
+        lines += [f'taskflow_rows_processed_total{{function="{name}"}} {rows}'
+                  for name, (_, _, _, rows, _) in stats.items()]
+        
+        lines += [
+            "# HELP taskflow_function_latency_seconds Latency of instrumented functions.",
+            "# TYPE taskflow_function_latency_seconds histogram"
+        ]
+        for name, (calls, _, total_seconds, _, bucket_counts) in stats.items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, bucket_counts):
+                cumulative += count
+                lines.append(f'taskflow_function_latency_seconds_bucket{{function="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'taskflow_function_latency_seconds_bucket{{function="{name}",le="+Inf"}} {calls}')
+            lines.append(f'taskflow_function_latency_seconds_sum{{function="{name}"}} {total_seconds}')
+            lines.append(f'taskflow_function_latency_seconds_count{{function="{name}"}} {calls}')
+        
+        return "\n".join(lines) + "\n"
+
+# Registry shared by every session of the app process
+METRICS = Metrics()
+
+def _count_rows(result: Any) -> Optional[int]:
+    """
+    Rows processed by default: the length of a returned DataFrame
+    """
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    return None
+
+def instrumented(name: Optional[str] = None, rows: Optional[Callable[..., Optional[int]]] = None):
+    """
+    Decorator recording call count, latency and rows processed of a function
+    
+    Parameters:
+    - name: Metric name (defaults to the function's qualified name)
+    - rows: Callable receiving (result, *args, **kwargs) and returning the rows
+      processed; defaults to the length of a returned DataFrame
+    """
+    def decorator(func):
+        metric_name = name or func.__qualname__
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                METRICS.record(metric_name, time.perf_counter() - started, failed=True)
+                raise
+            duration = time.perf_counter() - started
+            row_count = rows(result, *args, **kwargs) if rows is not None else _count_rows(result)
+            METRICS.record(metric_name, duration, row_count)
+            return result
+        
+        return wrapper
+    
+    return decorator
+
+@contextmanager
+def timed(name: str, rows: Optional[int] = None):
+    """
+    Context manager recording the latency of a block under `name`
+    """
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        METRICS.record(name, time.perf_counter() - started, rows, failed)
+
+def roster_rows(result: Any, owner: Any, *args, **kwargs) -> Optional[int]:
+    """
+    Rows processed by methods that scan the owner's whole roster
+    """
+    employee_df = getattr(owner, 'employee_df', None)
+    return len(employee_df) if employee_df is not None else None
+
+def employees_arg_rows(result: Any, owner: Any, *args, **kwargs) -> Optional[int]:
+    """
+    Rows processed by model methods that take the employee DataFrame as an argument
+    """
+    for value in list(args) + list(kwargs.values()):
+        if isinstance(value, pd.DataFrame) and 'ID' in value.columns:
+            return len(value)
+    return None
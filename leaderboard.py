@@ -0,0 +1,165 @@
+import bisect
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+class RankIndex:
+    """
+    Order-statistics index of employees by completed task count
+    
+    Employees are bucketed by count, and the distinct counts are kept sorted,
+    so changing one employee's count costs O(log K) for K distinct counts and
+    reading the top N walks only the buckets it returns. Within a bucket,
+    employees rank in the order they reached that count.
+    """
+    def __init__(self):
+        self.counts = {}
+        # count -> insertion-ordered dict of employee IDs with that count
+        self.buckets = {}
+        # Distinct counts, ascending
+        self.levels = []
+    
+    def __len__(self) -> int:
+        return len(self.counts)
+    
+    @classmethod
+    def from_counts(cls, employee_ids: List[int], counts: List[int]) -> 'RankIndex':
+        """
+        Build an index in one pass, ranking ties in the given order
+        """
+        index = cls()
+        for employee_id, count in zip(employee_ids, counts):
+            count = int(count)
+            index.counts[employee_id] = count
+            index.buckets.setdefault(count, {})[employee_id] = None
+        index.levels = sorted(index.buckets)
+        return index
+    
+    def get(self, employee_id: int) -> int:
+        return self.counts.get(employee_id, 0)
+    
+    def set(self, employee_id: int, count: int) -> None:
+        """
+        Set an employee's count, adding the employee if needed
+        """
+        previous = self.counts.get(employee_id)
+        if previous == count:
+            return
+        if previous is not None:
+            self._leave(employee_id, previous)
+        
+        self.counts[employee_id] = count
+        bucket = self.buckets.get(count)
+        if bucket is None:
+            bucket = self.buckets[count] = {}
+            bisect.insort(self.levels, count)
+        bucket[employee_id] = None
+    
+    def add(self, employee_id: int, delta: int) -> None:
+        self.set(employee_id, self.get(employee_id) + delta)
+    
+    def remove(self, employee_id: int) -> None:
+        previous = self.counts.pop(employee_id, None)
+        if previous is not None:
+            self._leave(employee_id, previous)
+    
+    def _leave(self, employee_id: int, count: int) -> None:
+        bucket = self.buckets[count]
+        del bucket[employee_id]
+        if not bucket:
+            del self.buckets[count]
+            del self.levels[bisect.bisect_left(self.levels, count)]
+    
+    def top(self, n: int) -> List[Tuple[int, int]]:
+        """
+        The n employees with the highest counts, as (employee ID, count) pairs
+        """
+        ranked = []
+        for count in reversed(self.levels):
+            for employee_id in self.buckets[count]:
+                if len(ranked) == n:
+                    return ranked
+                ranked.append((employee_id, count))
+        return ranked
+
+def _period(window: str, when: datetime) -> Tuple[int, int]:
+    """
+    Key of the leaderboard period containing `when`: ISO (year, week) or (year, month)
+    """
+    if window == "week":
+        year, week, _ = when.isocalendar()
+        return (year, week)
+    return (when.year, when.month)
+
+class Leaderboard:
+    """
+    All-time and time-windowed (this week / this month) completion rankings
+    
+    The all-time ranking mirrors the roster's CompletedTasks column. Windowed
+    rankings only count completions recorded in the current period and roll
+    over to an empty ranking when a new period starts, so they never rescan
+    the task history.
+    """
+    WINDOWS = ("week", "month")
+    
+    def __init__(self):
+        self.all_time = RankIndex()
+        # window -> (period key, ranking of completions within that period)
+        self.windows = {window: (None, RankIndex()) for window in self.WINDOWS}
+    
+    def reset(self, employee_ids: List[int], completed_counts: List[int]) -> None:
+        """
+        Rebuild the all-time ranking from the roster, keeping windowed counts of remaining employees
+        """
+        self.all_time = RankIndex.from_counts(employee_ids, completed_counts)
+        
+        for _, ranking in self.windows.values():
+            for employee_id in [emp_id for emp_id in ranking.counts if emp_id not in self.all_time.counts]:
+                ranking.remove(employee_id)
+    
+    def record(self, employee_id: int, delta: int, completed_at: Optional[float] = None) -> None:
+        """
+        Apply a change in an employee's completed task count
+        
+        Parameters:
+        - employee_id: The employee whose count changed
+        - delta: +1 for a completion, -1 for an undone completion (reopened, reassigned or deleted task)
+        - completed_at: Epoch seconds of the completion being added or undone;
+          windowed rankings only change if it falls in their current period
+        """
+        self.all_time.add(employee_id, delta)
+        
+        if completed_at is None:
+            return
+        
+        completed_at = datetime.fromtimestamp(completed_at)
+        now = datetime.now()
+        for window in self.WINDOWS:
+            period = _period(window, completed_at)
+            if period != _period(window, now):
+                continue
+            
+            _, ranking = self._current(window, now)
+            ranking.add(employee_id, delta)
+            if ranking.get(employee_id) <= 0:
+                ranking.remove(employee_id)
+    
+    def _current(self, window: str, now: datetime) -> Tuple[Tuple[int, int], RankIndex]:
+        """
+        The ranking of the current period, rolling the window over if a new period started
+        """
+        period = _period(window, now)
+        current, ranking = self.windows[window]
+        if current != period:
+            ranking = RankIndex()
+            self.windows[window] = (period, ranking)
+        return period, ranking
+    
+    def top(self, n: int = 10, window: Optional[str] = None) -> List[Tuple[int, int]]:
+        """
+        The top n (employee ID, completed count) pairs, all-time or for "week"/"month"
+        """
+        if window is None:
+            return self.all_time.top(n)
+        
+        _, ranking = self._current(window, datetime.now())
+        return ranking.top(n)
@@ -0,0 +1,131 @@
+import threading
+import time
+import pandas as pd
+from collections import deque
+from concurrent.futures import Future
+from typing import List, Dict, Any, Tuple
+from instrumentation import timed
+
+# Default limits of one batch: tasks per batch, and seconds the first request
+# of a batch may wait for others to join it
+DEFAULT_MAX_BATCH = 32
+DEFAULT_MAX_LATENCY = 0.005
+
+class MatchCoalescer:
+    """
+    Micro-batches concurrent TaskMatcher.find_ai_matches calls
+    
+    Callers on any thread submit a task and receive a Future. A dispatcher
+    thread takes the oldest waiting request and keeps collecting until
+    max_batch tasks are waiting or max_latency seconds have passed since that
+    request arrived. It then scores the whole batch with a single
+    find_ai_matches_many call, so the models run on one large matrix instead of
+    many small ones, and resolves each Future with its own result (or the
+    batch's exception).
+    
+    A batch shares what one call pays regardless of its size: deduplicating
+    the feature rows and one model call over the distinct ones (few, since
+    features repeat across tasks, so the flattened forest usually scores
+    them). Building each task's ranked DataFrame stays per task. On
+    benchmarks/run.py, a batch of 32 takes about half as long as 32
+    sequential find_ai_matches calls at 1,000 and 10,000 employees.
+    
+    max_latency bounds the time a request waits for company. A request that
+    arrives while a batch is being scored waits for that batch to finish and
+    joins the next one, which starts without further waiting if its deadline
+    has already passed.
+    
+    With `ranked`, batches are scored with rank_matches_many instead, which
+    orders every task's matches by the matcher's scoring spec.
+    """
+    def __init__(self, matcher: Any, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_latency: float = DEFAULT_MAX_LATENCY, ranked: bool = False):
+        self.matcher = matcher
+        self.score_batch = matcher.rank_matches_many if ranked else matcher.find_ai_matches_many
+        self.max_batch = max(1, max_batch)
+        self.max_latency = max(0.0, max_latency)
+        
+        # (task, future, arrival time) of requests not yet taken into a batch
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.dispatcher = None
+        
+        # Batch statistics, for tuning max_batch and max_latency
+        self.batches = 0
+        self.batched_tasks = 0
+    
+    def submit(self, task: Dict[str, Any]) -> Future:
+        """
+        Queue a task for matching; the Future resolves to its find_ai_matches DataFrame
+        """
+        future = Future()
+        with self.condition:
+            self.pending.append((task, future, time.monotonic()))
+            
+            if self.dispatcher is None:
+                self.dispatcher = threading.Thread(target=self._dispatch_loop, name="match-coalescer", daemon=True)
+                self.dispatcher.start()
+            
+            # Wake the dispatcher when it idles on an empty queue or a batch fills up
+            if len(self.pending) == 1 or len(self.pending) >= self.max_batch:
+                self.condition.notify()
+        return future
+    
+    def match(self, task: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Blocking find_ai_matches through the coalescer
+        """
+        return self.submit(task).result()
+    
+    def match_many(self, tasks: List[Dict[str, Any]]) -> List[pd.DataFrame]:
+        """
+        Blocking find_ai_matches of several tasks, batched together with any concurrent requests
+        """
+        futures = [self.submit(task) for task in tasks]
+        return [future.result() for future in futures]
+    
+    def average_batch_size(self) -> float:
+        return self.batched_tasks / self.batches if self.batches else 0.0
+    
+    def _next_batch(self) -> List[Tuple[Dict[str, Any], Future, float]]:
+        """
+        Wait for the next batch to fill up or reach its deadline, and take it off the queue
+        """
+        with self.condition:
+            while not self.pending:
+                self.condition.wait()
+            
+            deadline = self.pending[0][2] + self.max_latency
+            while len(self.pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            
+            batch = [self.pending.popleft() for _ in range(min(self.max_batch, len(self.pending)))]
+        
+        # Drop requests whose callers cancelled them
+        return [request for request in batch if request[1].set_running_or_notify_cancel()]
+    
+    def _dispatch_loop(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._score(batch)
+    
+    def _score(self, batch: List[Tuple[Dict[str, Any], Future, float]]) -> None:
+        """
+        Score a batch with one find_ai_matches_many (or rank_matches_many) call and fan the results out
+        """
+        try:
+            with timed("MatchCoalescer.batch", rows=len(batch)):
+                results = self.score_batch([task for task, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        
+        self.batches += 1
+        self.batched_tasks += len(batch)
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,106 @@
+import json
+import os
+import pickle
+import threading
+from typing import List, Dict, Any, Optional
+from timestamps import now
+
+# Directory the app keeps registered assignment models in
+DEFAULT_REGISTRY_DIR = "model_registry"
+
+# Index of the registered models, inside the registry directory
+INDEX_FILE = "registry.json"
+
+class ModelRegistry:
+    """
+    Versioned store of trained assignment models and how well they did
+    
+    Every registered model is pickled to its own file next to a JSON index
+    of records: version, model family and parameters, evaluation metrics,
+    training time and inference latency, plus whatever else the caller
+    records. One version at a time is promoted, i.e. the one served;
+    ModelTuner promotes the best model of each search.
+    
+    The index is rewritten whole (through a temporary file) on every change,
+    so readers never see a partial write.
+    """
+    def __init__(self, directory: str = DEFAULT_REGISTRY_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+    
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILE)
+    
+    def _read_index(self) -> Dict[str, Any]:
+        if not os.path.exists(self.index_path):
+            return {"promoted": None, "models": []}
+        with open(self.index_path) as f:
+            return json.load(f)
+    
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        temporary_path = self.index_path + ".tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(temporary_path, self.index_path)
+    
+    def register(self, estimator: Any, record: Dict[str, Any], promote: bool = False) -> int:
+        """
+        Store a fitted estimator with its record; returns its version
+        """
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            index = self._read_index()
+            version = max((model["version"] for model in index["models"]), default=0) + 1
+            
+            file_name = f"model_v{version}.pkl"
+            with open(os.path.join(self.directory, file_name), "wb") as f:
+                pickle.dump(estimator, f)
+            
+            index["models"].append({**record, "version": version, "file": file_name, "registered_at": now()})
+            if promote:
+                index["promoted"] = version
+            self._write_index(index)
+        return version
+    
+    def promote(self, version: int) -> None:
+        """
+        Mark a registered version as the one to serve
+        """
+        with self.lock:
+            index = self._read_index()
+            if not any(model["version"] == version for model in index["models"]):
+                raise ValueError(f"Model version {version} is not registered")
+            index["promoted"] = version
+            self._write_index(index)
+    
+    def models(self) -> List[Dict[str, Any]]:
+        """
+        Records of every registered model, oldest first
+        """
+        with self.lock:
+            return self._read_index()["models"]
+    
+    def record(self, version: int) -> Optional[Dict[str, Any]]:
+        """
+        The record of a registered version
+        """
+        return next((model for model in self.models() if model["version"] == version), None)
+    
+    def promoted(self) -> Optional[Dict[str, Any]]:
+        """
+        The record of the promoted version, if any
+        """
+        with self.lock:
+            index = self._read_index()
+        return next((model for model in index["models"] if model["version"] == index["promoted"]), None)
+    
+    def load(self, version: Optional[int] = None) -> Any:
+        """
+        The estimator of a registered version (the promoted one by default)
+        """
+        record = self.promoted() if version is None else self.record(version)
+        if record is None:
+            return None
+        with open(os.path.join(self.directory, record["file"]), "rb") as f:
+            return pickle.load(f)
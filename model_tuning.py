@@ -0,0 +1,218 @@
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional, Tuple
+from task_prediction_model import TaskAssignmentModel, build_estimator
+from model_registry import ModelRegistry
+
+# Configurations tried by ModelTuner: every combination of each family's
+# parameter values (see task_prediction_model.MODEL_FAMILIES)
+DEFAULT_SEARCH_SPACE = {
+    "random_forest": {"n_estimators": [100, 300], "max_depth": [None, 12], "min_samples_leaf": [1, 3]},
+    "extra_trees": {"n_estimators": [100, 300], "max_depth": [None, 12], "min_samples_leaf": [1, 3]},
+    "logistic_regression": {"C": [0.1, 1.0, 10.0]}
+}
+
+# Time-ordered folds, and the cut-off of the top-k metrics
+DEFAULT_SPLITS = 3
+DEFAULT_TOP_K = 5
+
+# Fewest completed tasks in the first training fold (train_model's minimum)
+MIN_TRAINING_TASKS = 5
+
+# Single-task predictions timed per fold for the inference latency
+LATENCY_SAMPLES = 5
+
+# Metric configurations are ranked by, then the tie-breakers
+RANKING_METRICS = [("ndcg_at_k", False), ("hit_rate_at_1", False), ("inference_ms", True)]
+
+def completed_history(employees_df: pd.DataFrame, tasks_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Completed tasks of employees on the roster, in completion order
+    
+    These are exactly the rows preprocess_data turns into training samples,
+    in the same order, so samples and tasks stay aligned.
+    """
+    if tasks_df is None or len(tasks_df) == 0 or 'Completion_Date' not in tasks_df.columns:
+        return tasks_df.iloc[0:0] if tasks_df is not None else pd.DataFrame()
+    
+    completed = tasks_df[
+        tasks_df['Assigned_To'].notnull() &
+        (tasks_df['Status'] == 'Completed') &
+        tasks_df['Assigned_To'].isin(employees_df['ID'])
+    ]
+    return completed.sort_values(['Completion_Date', 'TaskID'], kind='stable')
+
+def assignee_rank(ranking: pd.DataFrame, employee_id: int) -> float:
+    """
+    1-based rank of the employee who did the task in a predicted ranking
+    (inf if absent); employees tied with them count as ranked ahead
+    """
+    ids = ranking['ID'].to_numpy()
+    scores = ranking['PredictionScore'].to_numpy(dtype=np.float64)
+    hits = np.flatnonzero(ids == employee_id)
+    if len(hits) == 0:
+        return np.inf
+    return float((scores >= scores[hits[0]]).sum())
+
+def ranking_metrics(ranks: List[float], k: int) -> Dict[str, float]:
+    """
+    Top-1 and top-k hit rates, NDCG@k and mean reciprocal rank of the true assignees' ranks
+    
+    Each task has one relevant employee, so its NDCG@k is 1 / log2(rank + 1)
+    within the top k and 0 beyond.
+    """
+    ranks = np.asarray(ranks, dtype=np.float64)
+    if len(ranks) == 0:
+        return {"hit_rate_at_1": 0.0, "hit_rate_at_k": 0.0, "ndcg_at_k": 0.0, "mrr": 0.0}
+    
+    within_k = ranks <= k
+    return {
+        "hit_rate_at_1": float(np.mean(ranks <= 1)),
+        "hit_rate_at_k": float(np.mean(within_k)),
+        "ndcg_at_k": float(np.mean(np.where(within_k, 1.0 / np.log2(np.where(within_k, ranks, 1.0) + 1.0), 0.0))),
+        "mrr": float(np.mean(1.0 / ranks))
+    }
+
+def evaluate_configuration(family: str, params: Dict[str, Any], folds: List[Tuple[pd.DataFrame, pd.Series, List[Dict], List[int]]],
+                           employees_df: pd.DataFrame, features: List[str], k: int) -> Dict[str, Any]:
+    """
+    Fit one configuration on every fold's training tasks and rank the roster
+    for each of its test tasks, as TaskAssignmentModel.predict_many would
+    
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    ranks, training_seconds, latencies = [], [], []
+    for X_train, y_train, test_tasks, assignees in folds:
+        estimator = build_estimator(family, params)
+        with warnings.catch_warnings():
+            # Small folds stop linear models early; the metrics show the cost
+            warnings.simplefilter("ignore")
+            started = time.perf_counter()
+            estimator.fit(X_train, y_train)
+            training_seconds.append(time.perf_counter() - started)
+        
+        scorer = TaskAssignmentModel()
+        scorer.features = features
+        scorer.install_model(estimator)
+        
+        rankings = scorer.predict_many(test_tasks, employees_df)
+        ranks.extend(assignee_rank(ranking, employee_id) for ranking, employee_id in zip(rankings, assignees))
+        
+        for task in test_tasks[:LATENCY_SAMPLES]:
+            started = time.perf_counter()
+            scorer.predict(task, employees_df)
+            latencies.append(time.perf_counter() - started)
+    
+    return {
+        "family": family,
+        "params": params,
+        **ranking_metrics(ranks, k),
+        "training_seconds": float(np.mean(training_seconds)),
+        "inference_ms": float(np.median(latencies) * 1000) if latencies else 0.0
+    }
+
+class ModelTuner:
+    """
+    Cross-validated hyperparameter search for a TaskAssignmentModel
+    
+    Completed tasks are split in completion order into expanding-window folds
+    (train on everything before a block, test on the block), so models are
+    always judged on tasks completed after the ones they learned from. Every
+    configuration of the search space is evaluated on all folds in parallel
+    worker processes (n_jobs, -1 for all cores), recording ranking quality
+    (hit rates, NDCG@k, MRR), mean fit time and single-task inference latency.
+    
+    The best configuration is refitted on the whole history, installed in the
+    model (which train_model and compact then keep using), and registered and
+    promoted in the model registry with its metrics.
+    """
+    def __init__(self, model: TaskAssignmentModel, registry: Optional[ModelRegistry] = None,
+                 search_space: Optional[Dict[str, Dict[str, List[Any]]]] = None,
+                 n_splits: int = DEFAULT_SPLITS, k: int = DEFAULT_TOP_K, n_jobs: int = -1):
+        self.model = model
+        self.registry = registry
+        self.search_space = search_space if search_space is not None else DEFAULT_SEARCH_SPACE
+        self.n_splits = n_splits
+        self.k = k
+        self.n_jobs = n_jobs
+        
+        # Record of the configuration promoted by the last successful search
+        self.best = None
+    
+    def configurations(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Every (family, params) combination of the search space
+        """
+        from sklearn.model_selection import ParameterGrid
+        
+        return [(family, params) for family, grid in self.search_space.items() for params in ParameterGrid(grid)]
+    
+    def folds(self, employees_df: pd.DataFrame, history: pd.DataFrame) -> List[Tuple[pd.DataFrame, pd.Series, List[Dict], List[int]]]:
+        """
+        (training features, training targets, test tasks, their assignees) of each time-ordered fold
+        """
+        from sklearn.model_selection import TimeSeriesSplit
+        
+        X, y = self.model.preprocess_data(employees_df, history)
+        tasks = history.to_dict('records')
+        
+        folds = []
+        for train_rows, test_rows in TimeSeriesSplit(n_splits=self.n_splits).split(X):
+            folds.append((X.iloc[train_rows], y.iloc[train_rows],
+                          [tasks[row] for row in test_rows], y.iloc[test_rows].tolist()))
+        return folds
+    
+    def search(self, employees_df: pd.DataFrame, tasks_df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Evaluate every configuration and promote the best
+        
+        Returns the configurations' metrics, best first, or None if there are
+        too few completed tasks for the folds.
+        """
+        history = completed_history(employees_df, tasks_df)
+        if len(history) < MIN_TRAINING_TASKS * (self.n_splits + 1):
+            return None
+        
+        from joblib import Parallel, delayed
+        
+        folds = self.folds(employees_df, history)
+        features = list(self.model.features)
+        evaluations = Parallel(n_jobs=self.n_jobs)(
+            delayed(evaluate_configuration)(family, params, folds, employees_df, features, self.k)
+            for family, params in self.configurations()
+        )
+        
+        results = pd.DataFrame(evaluations).sort_values(
+            [metric for metric, _ in RANKING_METRICS], ascending=[ascending for _, ascending in RANKING_METRICS],
+            kind='stable'
+        ).reset_index(drop=True)
+        
+        self._promote(results.iloc[0].to_dict(), employees_df, history, len(results))
+        return results
+    
+    def _promote(self, best: Dict[str, Any], employees_df: pd.DataFrame, history: pd.DataFrame, candidates: int) -> None:
+        """
+        Refit the best configuration on the whole history and register it as the served model
+        """
+        self.model.estimator_family = best["family"]
+        self.model.estimator_params = dict(best["params"])
+        
+        started = time.perf_counter()
+        self.model.train_model(employees_df, history)
+        full_training_seconds = time.perf_counter() - started
+        
+        record = {
+            **best,
+            "params": dict(best["params"]),
+            "k": self.k,
+            "folds": self.n_splits,
+            "features": list(self.model.features),
+            "samples": len(history),
+            "configurations": candidates,
+            "full_training_seconds": full_training_seconds
+        }
+        if self.registry is not None:
+            record["version"] = self.registry.register(self.model.model, record, promote=True)
+        self.best = record
@@ -0,0 +1,256 @@
+import bisect
+import html
+from string import Template
+from typing import List, Dict, Any, Optional, Tuple
+from timestamps import format_timestamp
+
+# Notification kinds and the "Notification Preferences" option that enables each
+NOTIFICATION_PREFERENCES = {
+    "assignment": "New Task Assignments",
+    "status_update": "Task Status Updates",
+    "completion": "Task Status Updates"
+}
+
+# Templates are compiled once at import time and only substituted per email
+_ASSIGNMENT_TEMPLATE = Template("""
+<html>
+<body>
+    <h2>New Task Assignment</h2>
+    <p>Hello $employee_name,</p>
+    <p>You have been assigned a new task:</p>
+    $task_details
+    <p>Please log in to the Task Management System to view more details and update your progress.</p>
+    <p>Thank you,<br>Task Management System</p>
+</body>
+</html>
+""")
+
+_DIGEST_TEMPLATE = Template("""
+<html>
+<body>
+    <h2>New Task Assignments</h2>
+    <p>Hello $employee_name,</p>
+    <p>You have been assigned $task_count new tasks:</p>
+    $task_details
+    <p>Please log in to the Task Management System to view more details and update your progress.</p>
+    <p>Thank you,<br>Task Management System</p>
+</body>
+</html>
+""")
+
+_TASK_DETAILS_TEMPLATE = Template("""<div style="background-color:#f0f0f0; padding:15px; border-radius:5px; margin-bottom:10px;">
+        <p><strong>Task ID:</strong> $task_id</p>
+        <p><strong>Description:</strong> $description</p>
+        <p><strong>Required Skills:</strong> $required_skills</p>
+        <p><strong>Priority:</strong> $priority</p>
+        <p><strong>Due Date:</strong> $due_date</p>
+        <p><strong>Status:</strong> $status</p>
+    </div>""")
+
+_COMPLETION_TEMPLATE = Template("""
+<html>
+<body>
+    <h2>Task Completed</h2>
+    <p>Hello $employee_name,</p>
+    <p>You have successfully completed the following task:</p>
+    <div style="background-color:#f0f0f0; padding:15px; border-radius:5px;">
+        <p><strong>Task ID:</strong> $task_id</p>
+        <p><strong>Description:</strong> $description</p>
+        <p><strong>Completion Date:</strong> $completion_date</p>
+    </div>
+    <p>Thank you for your hard work!</p>
+    <p>Best regards,<br>Task Management System</p>
+</body>
+</html>
+""")
+
+_STATUS_UPDATE_TEMPLATE = Template("""
+<html>
+<body>
+    <h2>Task Status Update</h2>
+    <p>Hello $employee_name,</p>
+    <p>The status of your task has been updated:</p>
+    <div style="background-color:#f0f0f0; padding:15px; border-radius:5px;">
+        <p><strong>Task ID:</strong> $task_id</p>
+        <p><strong>Description:</strong> $description</p>
+        <p><strong>Previous Status:</strong> $prev_status</p>
+        <p><strong>New Status:</strong> $status</p>
+        <p><strong>Progress:</strong> $progress%</p>
+        <p><strong>Last Updated:</strong> $last_updated</p>
+    </div>
+    <p>Please log in to the Task Management System to view more details.</p>
+    <p>Thank you,<br>Task Management System</p>
+</body>
+</html>
+""")
+
+def _short_description(task: Dict[str, Any]) -> str:
+    return f"{task['Description'][:30]}..."
+
+def _task_details(task: Dict[str, Any]) -> str:
+    return _TASK_DETAILS_TEMPLATE.substitute(
+        task_id=task['TaskID'],
+        description=html.escape(str(task['Description'])),
+        required_skills=html.escape(', '.join(task['Required_Skills'])),
+        priority=html.escape(str(task['Priority'])),
+        due_date=html.escape(str(task['Due_Date'])),
+        status=html.escape(str(task['Status']))
+    )
+
+def render_assignment(employee_name: str, task: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Render the subject and HTML body of a new task assignment email
+    """
+    subject = f"New Task Assignment: {_short_description(task)}"
+    message = _ASSIGNMENT_TEMPLATE.substitute(
+        employee_name=html.escape(employee_name),
+        task_details=_task_details(task)
+    )
+    return subject, message
+
+def render_assignment_digest(employee_name: str, tasks: List[Dict[str, Any]]) -> Tuple[str, str]:
+    """
+    Render one email listing several new task assignments for the same employee
+    """
+    if len(tasks) == 1:
+        return render_assignment(employee_name, tasks[0])
+    
+    subject = f"{len(tasks)} New Task Assignments"
+    message = _DIGEST_TEMPLATE.substitute(
+        employee_name=html.escape(employee_name),
+        task_count=len(tasks),
+        task_details="\n    ".join(_task_details(task) for task in tasks)
+    )
+    return subject, message
+
+def render_completion(employee_name: str, task: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Render the subject and HTML body of a task completion email
+    """
+    subject = f"Task Completed: {_short_description(task)}"
+    message = _COMPLETION_TEMPLATE.substitute(
+        employee_name=html.escape(employee_name),
+        task_id=task['TaskID'],
+        description=html.escape(str(task['Description'])),
+        completion_date=format_timestamp(task['Completion_Date'])
+    )
+    return subject, message
+
+def render_status_update(employee_name: str, task: Dict[str, Any], prev_status: str) -> Tuple[str, str]:
+    """
+    Render the subject and HTML body of a task status update email
+    """
+    subject = f"Task Status Update: {_short_description(task)}"
+    message = _STATUS_UPDATE_TEMPLATE.substitute(
+        employee_name=html.escape(employee_name),
+        task_id=task['TaskID'],
+        description=html.escape(str(task['Description'])),
+        prev_status=html.escape(str(prev_status)),
+        status=html.escape(str(task['Status'])),
+        progress=task['Progress'],
+        last_updated=format_timestamp(task['Last_Updated'])
+    )
+    return subject, message
+
+class NotificationInbox:
+    """
+    Per-recipient notification index, kept in time order as messages are appended
+    
+    Messages are stored oldest-first per recipient, so newest-first pages are
+    reverse slices and unread counts only need a per-recipient read marker.
+    """
+    def __init__(self, max_messages_per_recipient: int = 1000):
+        self.messages = {}
+        self.timestamps = {}
+        self.read_upto = {}
+        self.max_messages_per_recipient = max_messages_per_recipient
+    
+    def append(self, message: Dict[str, Any]) -> None:
+        """
+        Add a message to its recipient's inbox
+        """
+        recipient = message['to']
+        messages = self.messages.setdefault(recipient, [])
+        timestamps = self.timestamps.setdefault(recipient, [])
+        timestamp = message['timestamp']
+        
+        if not timestamps or timestamp >= timestamps[-1]:
+            messages.append(message)
+            timestamps.append(timestamp)
+        else:
+            # Out-of-order message: insert it where it belongs
+            position = bisect.bisect_right(timestamps, timestamp)
+            messages.insert(position, message)
+            timestamps.insert(position, timestamp)
+            if position < self.read_upto.get(recipient, 0):
+                self.read_upto[recipient] += 1
+        
+        # Trim in batches so retention stays amortized O(1) per message
+        if len(messages) > self.max_messages_per_recipient * 1.25:
+            self._drop_oldest(recipient, len(messages) - self.max_messages_per_recipient)
+    
+    def count(self, recipient: str) -> int:
+        """
+        Number of messages in a recipient's inbox
+        """
+        return len(self.messages.get(recipient, []))
+    
+    def unread_count(self, recipient: str) -> int:
+        """
+        Number of messages the recipient has not read yet
+        """
+        return self.count(recipient) - self.read_upto.get(recipient, 0)
+    
+    def mark_read(self, recipient: str) -> None:
+        """
+        Mark every message currently in the inbox as read
+        """
+        self.read_upto[recipient] = self.count(recipient)
+    
+    def page(self, recipient: str, page: int = 0, page_size: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get one page of a recipient's messages, newest first
+        
+        Parameters:
+        - recipient: Email address of the recipient
+        - page: Zero-based page number
+        - page_size: Number of messages per page
+        """
+        messages = self.messages.get(recipient, [])
+        end = len(messages) - page * page_size
+        if end <= 0:
+            return []
+        
+        return messages[max(0, end - page_size):end][::-1]
+    
+    def compact(self, older_than: Any, recipient: Optional[str] = None) -> int:
+        """
+        Drop messages with a timestamp before `older_than`
+        
+        Parameters:
+        - older_than: Cutoff timestamp (epoch seconds, like the message timestamps)
+        - recipient: Only compact this recipient's inbox (defaults to every inbox)
+        
+        Returns the number of messages dropped.
+        """
+        recipients = [recipient] if recipient is not None else list(self.messages)
+        dropped = 0
+        
+        for name in recipients:
+            timestamps = self.timestamps.get(name)
+            if timestamps:
+                dropped += self._drop_oldest(name, bisect.bisect_left(timestamps, older_than))
+        
+        return dropped
+    
+    def _drop_oldest(self, recipient: str, count: int) -> int:
+        """
+        Drop the `count` oldest messages of a recipient
+        """
+        if count <= 0:
+            return 0
+        
+        del self.messages[recipient][:count]
+        del self.timestamps[recipient][:count]
+        self.read_upto[recipient] = max(0, self.read_upto.get(recipient, 0) - count)
+        return count
@@ -0,0 +1,235 @@
+import json
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Optional
+from timestamps import now
+
+# SQLite database the app keeps employee preferences in
+DEFAULT_PREFERENCES_PATH = "employee_preferences.db"
+
+# Seconds revision() reuses its last check for commits by other connections
+REVISION_POLL_SECONDS = 1.0
+
+# One row per (employee, preference type). The value lives in the column of
+# its kind: numbers in `number`, strings in `text`, lists of strings one row
+# each in preference_items (in order), and anything else as JSON in `json`.
+# The (type, value) indexes answer "who prefers X" without a table scan.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS preferences (
+    employee_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    number REAL,
+    text TEXT,
+    json TEXT,
+    updated_at INTEGER NOT NULL,
+    PRIMARY KEY (employee_id, type)
+);
+CREATE INDEX IF NOT EXISTS preferences_by_number ON preferences (type, number);
+CREATE INDEX IF NOT EXISTS preferences_by_text ON preferences (type, text);
+CREATE TABLE IF NOT EXISTS preference_items (
+    employee_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (employee_id, type, position)
+);
+CREATE INDEX IF NOT EXISTS preference_items_by_value ON preference_items (type, item);
+"""
+
+def _value_kind(value: Any) -> str:
+    """
+    Column kind a preference value is stored as
+    """
+    if isinstance(value, bool):
+        return "json"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "real"
+    if isinstance(value, str):
+        return "text"
+    if isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value):
+        return "list"
+    return "json"
+
+class PreferenceStore:
+    """
+    Persistent employee preferences in SQLite, with bulk reads for the roster
+    
+    Single values (get, set) serve the preference forms and notifications.
+    The bulk reads (numbers, has, employees_with, matches) run one indexed
+    query per preference type and return NumPy arrays aligned to the given
+    employee IDs, so the matcher reads a preference for a whole roster
+    without a lookup per employee.
+    
+    One connection is shared by every thread, serialized by `lock`. A file
+    database can be shared by several processes (e.g. the app and the API);
+    revision() changes on every write through this store, and within
+    REVISION_POLL_SECONDS of a commit by any other, so readers can cache
+    their bulk reads until it does. Pass ":memory:" for a private store.
+    """
+    def __init__(self, path: str = DEFAULT_PREFERENCES_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        
+        with self.lock:
+            if path != ":memory:":
+                # Readers in other processes don't block on this one's writes
+                self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+        
+        # Commits through this connection (data_version only counts other connections')
+        self.writes = 0
+        
+        # Last data_version read, and when (other connections can't write to ":memory:")
+        self.data_version = 0
+        self.polled_at = float("inf") if path == ":memory:" else float("-inf")
+    
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+    
+    def revision(self) -> tuple:
+        """
+        A token that changes whenever the stored preferences may have changed
+        
+        Writes through this store count at once. Other connections' commits
+        are polled with a PRAGMA round-trip at most every
+        REVISION_POLL_SECONDS, so callers can ask on every read.
+        """
+        current = time.monotonic()
+        if current - self.polled_at >= REVISION_POLL_SECONDS:
+            with self.lock:
+                self.data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+                self.polled_at = current
+        return (self.data_version, self.writes)
+    
+    def set(self, employee_id: int, preference_type: str, value: Any) -> None:
+        """
+        Store a preference, replacing any earlier value; None removes it
+        """
+        employee_id = int(employee_id)
+        kind = _value_kind(value)
+        number = value if kind in ("integer", "real") else None
+        text = value if kind == "text" else None
+        encoded = json.dumps(value) if kind == "json" else None
+        
+        with self.lock:
+            with self.connection:
+                self.connection.execute("BEGIN IMMEDIATE")
+                self.connection.execute("DELETE FROM preference_items WHERE employee_id = ? AND type = ?",
+                                        (employee_id, preference_type))
+                if value is None:
+                    self.connection.execute("DELETE FROM preferences WHERE employee_id = ? AND type = ?",
+                                            (employee_id, preference_type))
+                else:
+                    self.connection.execute(
+                        "INSERT OR REPLACE INTO preferences (employee_id, type, kind, number, text, json, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (employee_id, preference_type, kind, number, text, encoded, now())
+                    )
+                    if kind == "list":
+                        self.connection.executemany(
+                            "INSERT INTO preference_items (employee_id, type, position, item) VALUES (?, ?, ?, ?)",
+                            [(employee_id, preference_type, position, item) for position, item in enumerate(value)]
+                        )
+            self.writes += 1
+    
+    def get(self, employee_id: int, preference_type: str) -> Any:
+        """
+        A preference of an employee, or None if it was never set
+        """
+        return self.get_all(employee_id, preference_type).get(preference_type)
+    
+    def get_all(self, employee_id: int, preference_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        All preferences of an employee (or just the given type), by type
+        """
+        query = "SELECT type, kind, number, text, json FROM preferences WHERE employee_id = ?"
+        params = [int(employee_id)]
+        if preference_type is not None:
+            query += " AND type = ?"
+            params.append(preference_type)
+        
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+            items = {}
+            if any(kind == "list" for _, kind, _, _, _ in rows):
+                item_rows = self.connection.execute(
+                    "SELECT type, item FROM preference_items WHERE employee_id = ? ORDER BY type, position",
+                    (int(employee_id),)
+                ).fetchall()
+                for item_type, item in item_rows:
+                    items.setdefault(item_type, []).append(item)
+        
+        preferences = {}
+        for row_type, kind, number, text, encoded in rows:
+            if kind == "integer":
+                preferences[row_type] = int(number)
+            elif kind == "real":
+                preferences[row_type] = number
+            elif kind == "text":
+                preferences[row_type] = text
+            elif kind == "list":
+                preferences[row_type] = items.get(row_type, [])
+            else:
+                preferences[row_type] = json.loads(encoded)
+        return preferences
+    
+    def numbers(self, preference_type: str, employee_ids: Any, default: float = np.nan) -> np.ndarray:
+        """
+        A numeric preference of each employee, aligned to employee_ids (default where unset)
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT employee_id, number FROM preferences WHERE type = ? AND number IS NOT NULL",
+                (preference_type,)
+            ).fetchall()
+        values = pd.Series(dict(rows), dtype=np.float64)
+        return pd.Series(np.asarray(employee_ids)).map(values).fillna(default).to_numpy(dtype=np.float64)
+    
+    def has(self, preference_type: str, employee_ids: Any) -> np.ndarray:
+        """
+        Whether each employee set the preference (a list counts only if it is non-empty)
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT employee_id FROM preferences WHERE type = ? AND kind != 'list' "
+                "UNION SELECT DISTINCT employee_id FROM preference_items WHERE type = ?",
+                (preference_type, preference_type)
+            ).fetchall()
+        return np.isin(np.asarray(employee_ids), [employee_id for employee_id, in rows])
+    
+    def employees_with(self, preference_type: str, value: Any) -> np.ndarray:
+        """
+        IDs of the employees whose preference equals `value` or, for lists, contains it
+        """
+        with self.lock:
+            if isinstance(value, str):
+                rows = self.connection.execute(
+                    "SELECT employee_id FROM preference_items WHERE type = ? AND item = ? "
+                    "UNION SELECT employee_id FROM preferences WHERE type = ? AND text = ?",
+                    (preference_type, value, preference_type, value)
+                ).fetchall()
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                rows = self.connection.execute(
+                    "SELECT employee_id FROM preferences WHERE type = ? AND number = ?",
+                    (preference_type, value)
+                ).fetchall()
+            else:
+                rows = self.connection.execute(
+                    "SELECT employee_id FROM preferences WHERE type = ? AND json = ?",
+                    (preference_type, json.dumps(value))
+                ).fetchall()
+        return np.array([employee_id for employee_id, in rows], dtype=np.int64)
+    
+    def matches(self, preference_type: str, value: Any, employee_ids: Any) -> np.ndarray:
+        """
+        employees_with as a mask aligned to employee_ids
+        """
+        return np.isin(np.asarray(employee_ids), self.employees_with(preference_type, value))
@@ -0,0 +1,139 @@
+import cProfile
+import marshal
+import os
+import threading
+import time
+import pandas as pd
+import streamlit as st
+from collections import deque
+from typing import List, Dict, Any, Optional
+
+# Profiling is opt-in: set TASKFLOW_PROFILE=1 or open the app with ?profile=1
+PROFILE_ENV_VAR = "TASKFLOW_PROFILE"
+PROFILE_QUERY_PARAM = "profile"
+_TRUTHY = ("1", "true", "yes", "on")
+
+# Read once, so the disabled path costs a single query param lookup per rerun
+PROFILING_FROM_ENV = os.environ.get(PROFILE_ENV_VAR, "").strip().lower() in _TRUTHY
+
+# Rows kept per profile for the in-app top-functions table
+TOP_FUNCTIONS = 40
+
+class RerunProfile:
+    """
+    cProfile results of one Streamlit script run
+    """
+    def __init__(self, section: str, started_at: float, duration: float,
+                 stats: Dict[Any, Any], interrupted: bool = False):
+        self.section = section
+        self.started_at = started_at
+        self.duration = duration
+        self.interrupted = interrupted
+        self.total_calls = sum(entry[1] for entry in stats.values())
+        self.top_functions = self._top_functions(stats)
+        # Raw pstats data, loadable with pstats/snakeviz for flame graphs
+        self.raw_stats = marshal.dumps(stats)
+    
+    @property
+    def label(self) -> str:
+        started = time.strftime("%H:%M:%S", time.localtime(self.started_at))
+        suffix = " (interrupted by rerun)" if self.interrupted else ""
+        return f"{started} - {self.section} - {self.duration * 1000:.1f} ms{suffix}"
+    
+    @staticmethod
+    def _top_functions(stats: Dict[Any, Any]) -> pd.DataFrame:
+        """
+        Reduce pstats data to the functions with the highest cumulative time
+        """
+        rows = []
+        for (filename, line, function), (_, calls, total_time, cumulative_time, _) in stats.items():
+            rows.append({
+                "Function": function,
+                "Location": f"{os.path.basename(filename)}:{line}" if line else filename,
+                "Calls": calls,
+                "Own Time (ms)": total_time * 1000.0,
+                "Cumulative (ms)": cumulative_time * 1000.0
+            })
+        
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows).nlargest(TOP_FUNCTIONS, "Cumulative (ms)").reset_index(drop=True)
+
+class ProfileStore:
+    """
+    Ring buffer of the most recent rerun profiles, shared by every session
+    """
+    def __init__(self, capacity: int = 20):
+        self.lock = threading.Lock()
+        self.profiles = deque(maxlen=capacity)
+    
+    def add(self, profile: RerunProfile) -> None:
+        with self.lock:
+            self.profiles.append(profile)
+    
+    def recent(self) -> List[RerunProfile]:
+        """
+        Stored profiles, newest first
+        """
+        with self.lock:
+            return list(reversed(self.profiles))
+    
+    def clear(self) -> None:
+        with self.lock:
+            self.profiles.clear()
+
+PROFILES = ProfileStore()
+
+def profiling_enabled() -> bool:
+    """
+    Check whether this rerun should be profiled
+    """
+    if PROFILING_FROM_ENV:
+        return True
+    return st.query_params.get(PROFILE_QUERY_PARAM, "").lower() in _TRUTHY
+
+def begin_rerun_profile() -> None:
+    """
+    Start profiling the current script run, if profiling is enabled
+    
+    Call at the very top of app.py. A profile left running by a run that was
+    cut short (st.rerun, st.stop) is stored as interrupted first.
+    """
+    pending = st.session_state.get('_rerun_profile')
+    if pending is not None:
+        _finish(pending, interrupted=True)
+    
+    if not profiling_enabled():
+        return
+    
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another session's run is being profiled (one profiler per process on 3.12+)
+        return
+    st.session_state._rerun_profile = (profiler, time.time(), time.perf_counter())
+
+def end_rerun_profile(section: str) -> None:
+    """
+    Stop profiling the current script run and store it tagged with `section`
+    
+    Call at the very bottom of app.py.
+    """
+    pending = st.session_state.get('_rerun_profile')
+    if pending is not None:
+        _finish(pending, section=section)
+
+def _finish(pending: Any, section: Optional[str] = None, interrupted: bool = False) -> None:
+    profiler, started_at, started = pending
+    profiler.disable()
+    duration = time.perf_counter() - started
+    st.session_state._rerun_profile = None
+    
+    profiler.create_stats()
+    if interrupted:
+        # Wall time would include the idle gap until this rerun; use profiled time
+        duration = sum(entry[2] for entry in profiler.stats.values())
+    if section is None:
+        section = st.session_state.get('active_section', "Unknown")
+    PROFILES.add(RerunProfile(section, started_at, duration, profiler.stats, interrupted))
@@ -0,0 +1,137 @@
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Callable, Optional, Sequence, Tuple
+
+class RosterSnapshot:
+    """
+    One immutable version of the employee roster
+    
+    Nothing writes into a published snapshot's DataFrame, so a reader that
+    holds on to one sees the same roster for as long as it keeps it. The
+    lookups by employee ID belong to the snapshot too, so positions read from
+    `rows` always index this version's DataFrame.
+    """
+    __slots__ = ('version', 'employee_df', 'rows', 'contacts')
+    
+    def __init__(self, version: int, employee_df: Optional[pd.DataFrame],
+                 rows: Dict[int, int], contacts: Dict[int, Tuple[str, str]]):
+        self.version = version
+        self.employee_df = employee_df
+        # Row position of every employee by ID
+        self.rows = rows
+        # (Name, Email) of every employee by ID
+        self.contacts = contacts
+
+def index_roster(employee_df: Optional[pd.DataFrame]) -> Tuple[Dict[int, int], Dict[int, Tuple[str, str]]]:
+    """
+    The ID -> row position and ID -> (Name, Email) lookups of a roster
+    """
+    if employee_df is None:
+        return {}, {}
+    
+    employee_ids = employee_df['ID'].tolist()
+    rows = dict(zip(employee_ids, range(len(employee_ids))))
+    contacts = dict(zip(employee_ids, zip(employee_df['Name'].tolist(), employee_df['Email'].tolist())))
+    return rows, contacts
+
+class RosterStore:
+    """
+    Versioned copy-on-write employee roster shared by DataHandler, TaskMatcher
+    and EmployeeManagement
+    
+    Readers take the current snapshot without locking; it is a single attribute
+    read. Writers build the next version from the current one (see with_values
+    and with_columns, which share every unchanged column with the previous
+    version) and publish it by swapping the reference. A lock serializes
+    writers only, so two read-modify-write updates never lose each other's
+    changes and readers are never blocked.
+    """
+    def __init__(self, employee_df: Optional[pd.DataFrame] = None):
+        self.current = RosterSnapshot(0, employee_df, *index_roster(employee_df))
+        self.write_lock = threading.Lock()
+    
+    def snapshot(self) -> RosterSnapshot:
+        return self.current
+    
+    @property
+    def employee_df(self) -> Optional[pd.DataFrame]:
+        """
+        The roster of the current snapshot
+        """
+        return self.current.employee_df
+    
+    @property
+    def version(self) -> int:
+        return self.current.version
+    
+    def publish(self, employee_df: Optional[pd.DataFrame]) -> RosterSnapshot:
+        """
+        Replace the roster with a newly built one (e.g. after a load or reload)
+        """
+        with self.write_lock:
+            return self._swap(employee_df, reindex=True)
+    
+    def update(self, build: Callable[[Optional[pd.DataFrame]], Optional[pd.DataFrame]],
+               reindex: bool = False) -> Optional[RosterSnapshot]:
+        """
+        Publish build(current roster) as the next version
+        
+        `build` runs with other writers held off, so it always sees the latest
+        version (None before the first load). It must not modify the DataFrame
+        it is given; it returns the next version, or None to leave the roster
+        unchanged.
+        
+        The next version keeps the current ID lookups unless `reindex` is set,
+        which it must be whenever `build` adds, removes or reorders employees
+        or changes their names or emails.
+        
+        Returns the published snapshot, or None if nothing changed.
+        """
+        with self.write_lock:
+            employee_df = self.current.employee_df
+            next_df = build(employee_df)
+            if next_df is None or next_df is employee_df:
+                return None
+            return self._swap(next_df, reindex or employee_df is None)
+    
+    def _swap(self, employee_df: Optional[pd.DataFrame], reindex: bool) -> RosterSnapshot:
+        if reindex:
+            rows, contacts = index_roster(employee_df)
+        else:
+            rows, contacts = self.current.rows, self.current.contacts
+        self.current = RosterSnapshot(self.current.version + 1, employee_df, rows, contacts)
+        return self.current
+
+def with_values(employee_df: pd.DataFrame, positions: Sequence[int],
+                values: Dict[str, Sequence[Any]]) -> pd.DataFrame:
+    """
+    Next roster version with values[column][i] stored at row position positions[i]
+    
+    Only the changed columns are copied; every other column is shared with
+    `employee_df`, which is left as it was. Columns missing from the roster
+    are added (empty outside `positions`).
+    """
+    next_df = employee_df.copy(deep=False)
+    
+    for column, column_values in values.items():
+        if column in employee_df.columns:
+            array = employee_df[column].to_numpy(copy=True)
+        else:
+            array = np.full(len(employee_df), None, dtype=object)
+        
+        # Element by element, so list values (e.g. Skills) are stored as they are
+        for position, value in zip(positions, column_values):
+            array[position] = value
+        next_df[column] = array
+    
+    return next_df
+
+def with_columns(employee_df: pd.DataFrame, columns: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Next roster version with whole columns replaced, sharing every other column
+    """
+    next_df = employee_df.copy(deep=False)
+    for column, column_values in columns.items():
+        next_df[column] = column_values
+    return next_df
@@ -0,0 +1,356 @@
+import math
+import threading
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional, Tuple
+from instrumentation import instrumented
+from scoring import PRIORITY_LEVELS
+from timestamps import now, parse_date, SECONDS_PER_DAY
+
+# Assumed days per task for employees with no completed tasks, when nobody has any
+DEFAULT_TASK_DAYS = 3.0
+
+# How far ahead the capacity planner looks, in days
+DEFAULT_HORIZON_DAYS = 14
+
+def schedule_key(task: Dict[str, Any]) -> Tuple[int, float, int, int]:
+    """
+    Urgency order of a task: higher priority first, then earlier due date
+    (tasks without one last), then earlier creation
+    """
+    due = parse_date(task.get("Due_Date"))
+    return (-PRIORITY_LEVELS.get(task.get("Priority"), 0),
+            due if due is not None else math.inf,
+            task.get("Created_Date") or 0,
+            task["TaskID"])
+
+class TaskQueue:
+    """
+    Priority queue of task IDs with O(log n) insert, update and removal
+    
+    A binary min-heap of (key, task_id) entries plus the heap position of
+    every task, so a task's key can be changed in place (decrease-key, or an
+    increase) and a task removed without searching the heap.
+    """
+    def __init__(self):
+        self.heap = []
+        self.positions = {}
+    
+    def __len__(self) -> int:
+        return len(self.heap)
+    
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self.positions
+    
+    def push(self, task_id: int, key: Tuple) -> None:
+        """
+        Insert a task, or move it to its new key if already queued
+        """
+        position = self.positions.get(task_id)
+        if position is None:
+            self.heap.append((key, task_id))
+            self.positions[task_id] = len(self.heap) - 1
+            self._sift_up(len(self.heap) - 1)
+            return
+        
+        old_key = self.heap[position][0]
+        self.heap[position] = (key, task_id)
+        if key < old_key:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+    
+    def remove(self, task_id: int) -> bool:
+        """
+        Take a task out of the queue; False if it was not queued
+        """
+        position = self.positions.pop(task_id, None)
+        if position is None:
+            return False
+        
+        last = self.heap.pop()
+        if position < len(self.heap):
+            # Fill the hole with the last entry and restore the heap around it
+            self.heap[position] = last
+            self.positions[last[1]] = position
+            self._sift_up(position)
+            self._sift_down(self.positions[last[1]])
+        return True
+    
+    def peek(self) -> Optional[int]:
+        return self.heap[0][1] if self.heap else None
+    
+    def pop(self) -> Optional[int]:
+        """
+        Remove and return the most urgent task ID (None if empty)
+        """
+        task_id = self.peek()
+        if task_id is not None:
+            self.remove(task_id)
+        return task_id
+    
+    def ordered(self) -> List[int]:
+        """
+        Every queued task ID, most urgent first (the queue is unchanged)
+        """
+        return [task_id for _, task_id in sorted(self.heap)]
+    
+    def _sift_up(self, position: int) -> None:
+        entry = self.heap[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if self.heap[parent][0] <= entry[0]:
+                break
+            self.heap[position] = self.heap[parent]
+            self.positions[self.heap[position][1]] = position
+            position = parent
+        self.heap[position] = entry
+        self.positions[entry[1]] = position
+    
+    def _sift_down(self, position: int) -> None:
+        entry = self.heap[position]
+        size = len(self.heap)
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and self.heap[child + 1][0] < self.heap[child][0]:
+                child += 1
+            if entry[0] <= self.heap[child][0]:
+                break
+            self.heap[position] = self.heap[child]
+            self.positions[self.heap[position][1]] = position
+            position = child
+        self.heap[position] = entry
+        self.positions[entry[1]] = position
+
+class TaskScheduler:
+    """
+    Assigns unassigned tasks in urgency order as employees gain capacity
+    
+    The scheduler keeps every unassigned, unfinished task in a TaskQueue keyed
+    on schedule_key, kept current by a DataHandler task listener: creating a
+    task queues it, rescheduling it moves it, assigning or deleting it takes it
+    out. drain() then hands the queued tasks to the matcher most urgent first,
+    each going to the best match among employees with enough available hours
+    for its effort (the matcher's CapacityModel), until nobody has capacity left.
+    
+    With auto_drain on, a background thread drains whenever capacity frees
+    up: a task completes or is deleted, or a task is queued while someone has
+    room. Draining never runs inside the listener, since the listener is
+    called with the DataHandler lock held.
+    """
+    def __init__(self, data_handler: Any, task_matcher: Any, auto_drain: bool = False):
+        self.data_handler = data_handler
+        self.task_matcher = task_matcher
+        self.auto_drain = auto_drain
+        
+        self.queue = TaskQueue()
+        self.lock = threading.Lock()
+        
+        # Background draining (auto_drain): set when capacity may have freed up
+        self.wakeup = threading.Condition(self.lock)
+        self.drain_requested = False
+        self.drainer = None
+        
+        # Serializes drains (manual and background)
+        self.drain_lock = threading.Lock()
+        
+        with data_handler.lock:
+            for task in data_handler.get_all_tasks():
+                self.on_task_event("created", task)
+            data_handler.add_task_listener(self.on_task_event)
+    
+    def on_task_event(self, event: str, task: Dict[str, Any]) -> None:
+        """
+        DataHandler task listener keeping the queue in step with the tasks
+        """
+        task_id = task["TaskID"]
+        with self.lock:
+            if event != "deleted" and task["Assigned_To"] is None and task["Status"] != "Completed":
+                self.queue.push(task_id, schedule_key(task))
+            else:
+                self.queue.remove(task_id)
+            
+            # Finishing or removing assigned work frees capacity for someone
+            frees_capacity = task["Assigned_To"] is not None and (
+                (event == "deleted" and task["Status"] != "Completed") or
+                (event == "status_changed" and task["Status"] == "Completed"))
+            if self.auto_drain and (frees_capacity or event in ("created", "rescheduled")):
+                self._request_drain()
+    
+    def _request_drain(self) -> None:
+        """
+        Wake the background drainer, starting it on first use (caller holds self.lock)
+        """
+        self.drain_requested = True
+        if self.drainer is None:
+            self.drainer = threading.Thread(target=self._drain_loop, name="task-scheduler", daemon=True)
+            self.drainer.start()
+        self.wakeup.notify()
+    
+    def _drain_loop(self) -> None:
+        while True:
+            with self.lock:
+                while not self.drain_requested:
+                    self.wakeup.wait()
+                self.drain_requested = False
+            self.drain()
+    
+    def has_capacity(self) -> bool:
+        """
+        Whether any employee has available hours left
+        """
+        employee_df = self.data_handler.employee_df
+        if employee_df is None:
+            return False
+        return bool((self.task_matcher.capacity.arrays(employee_df)['available_hours'] > 0).any())
+    
+    def pending(self) -> List[Dict[str, Any]]:
+        """
+        The queued tasks, most urgent first
+        """
+        with self.lock:
+            task_ids = self.queue.ordered()
+        tasks = [self.data_handler.get_task(task_id) for task_id in task_ids]
+        return [task for task in tasks if task is not None]
+    
+    @instrumented()
+    def drain(self, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Assign queued tasks, most urgent first, while employees have capacity
+        
+        Tasks nobody with capacity can take stay queued for a later drain.
+        Returns the (task_id, employee_id) pairs assigned.
+        """
+        assigned = []
+        # Popped tasks not (yet) assigned by this drain
+        unassigned = []
+        
+        # One drain at a time, so two drains never fill the same free slot
+        with self.drain_lock:
+            try:
+                while (limit is None or len(assigned) < limit) and self.has_capacity():
+                    with self.lock:
+                        task_id = self.queue.pop()
+                    if task_id is None:
+                        break
+                    unassigned.append(task_id)
+                    
+                    task = self.data_handler.get_task(task_id)
+                    if task is None or task["Assigned_To"] is not None:
+                        continue
+                    
+                    best_match = self.task_matcher.recommend_best_match(
+                        task["Required_Skills"], priority=task["Priority"], due_date=task["Due_Date"],
+                        task_type=task.get("Task_Type"), estimated_hours=task.get("Estimated_Hours"),
+                        require_capacity=True
+                    )
+                    if not best_match:
+                        continue
+                    
+                    ai_powered = best_match.get('AI_Powered', False)
+                    match_score = best_match.get('MatchPercentage', 0) / 100.0
+                    
+                    # Compare-and-set; on any failure (another session changed the
+                    # task, the employee was removed) the task goes back in the queue
+                    if self.data_handler.assign_task(task_id, best_match['ID'], ai_powered, match_score,
+                                                     expected_version=task["Version"]):
+                        if ai_powered:
+                            self.data_handler.record_ai_prediction(task_id, best_match['ID'], match_score)
+                        assigned.append((task_id, best_match['ID']))
+                        unassigned.pop()
+            finally:
+                # Put back every popped task that is still waiting for an employee
+                # (even if a recommendation raised), taking the locks in the same
+                # order as the listener
+                with self.data_handler.lock, self.lock:
+                    for task_id in unassigned:
+                        task = self.data_handler.get_task(task_id)
+                        if task is not None and task["Assigned_To"] is None and task["Status"] != "Completed":
+                            self.queue.push(task_id, schedule_key(task))
+        
+        return assigned
+
+class CapacityPlanner:
+    """
+    Lookahead projection of each employee's workload against due dates
+    
+    Every employee is assumed to work through their active tasks one at a
+    time in urgency order (schedule_key), each taking their average days
+    from assignment to completion so far (the team's median for employees
+    without history, DEFAULT_TASK_DAYS if nobody has any). A task is at risk
+    when its projected finish falls after its due date.
+    """
+    def __init__(self, data_handler: Any):
+        self.data_handler = data_handler
+    
+    def days_per_task(self, tasks: List[Dict[str, Any]]) -> Tuple[pd.Series, float]:
+        """
+        Average days per completed task by employee ID, and the fallback for everyone else
+        """
+        finished = [task for task in tasks
+                    if task.get("Completion_Date") is not None and task.get("Assigned_Date") is not None]
+        if not finished:
+            return pd.Series(dtype=np.float64), DEFAULT_TASK_DAYS
+        
+        durations = pd.Series(
+            [(task["Completion_Date"] - task["Assigned_Date"]) / SECONDS_PER_DAY for task in finished],
+            index=[task["Assigned_To"] for task in finished]
+        ).clip(lower=0)
+        averages = durations.groupby(level=0).mean()
+        return averages, float(averages.median())
+    
+    @instrumented()
+    def plan(self, horizon_days: float = DEFAULT_HORIZON_DAYS, current_time: Optional[int] = None) -> pd.DataFrame:
+        """
+        Overdue risk of every employee with active tasks, riskiest first
+        
+        Columns: ID, Name, ActiveTasks, DaysPerTask, ProjectedFree (epoch
+        seconds the last active task is projected to finish), DueInHorizon
+        (active tasks due within horizon_days), AtRisk (tasks projected to
+        finish after their due date) and OverdueRisk (AtRisk over the active
+        tasks with a due date).
+        """
+        current_time = current_time if current_time is not None else now()
+        tasks = self.data_handler.get_all_tasks()
+        columns = ["ID", "Name", "ActiveTasks", "DaysPerTask", "ProjectedFree", "DueInHorizon", "AtRisk", "OverdueRisk"]
+        
+        active = [task for task in tasks if task["Assigned_To"] is not None and task["Status"] != "Completed"]
+        if not active:
+            return pd.DataFrame(columns=columns)
+        
+        active.sort(key=lambda task: (task["Assigned_To"], schedule_key(task)))
+        employee_ids = np.array([task["Assigned_To"] for task in active])
+        due = np.array([parse_date(task.get("Due_Date")) or np.nan for task in active], dtype=np.float64)
+        
+        averages, fallback = self.days_per_task(tasks)
+        days = pd.Series(employee_ids).map(averages).fillna(fallback).to_numpy()
+        
+        # Position of each task in its employee's sequence, from 1
+        position = pd.Series(employee_ids).groupby(employee_ids).cumcount().to_numpy() + 1
+        finish = current_time + position * days * SECONDS_PER_DAY
+        
+        projection = pd.DataFrame({
+            "ID": employee_ids,
+            "DaysPerTask": days,
+            "Finish": finish,
+            "HasDue": ~np.isnan(due),
+            "DueInHorizon": due <= current_time + horizon_days * SECONDS_PER_DAY,
+            "AtRisk": finish > due
+        })
+        summary = projection.groupby("ID").agg(
+            ActiveTasks=("Finish", "size"),
+            DaysPerTask=("DaysPerTask", "first"),
+            ProjectedFree=("Finish", "max"),
+            WithDue=("HasDue", "sum"),
+            DueInHorizon=("DueInHorizon", "sum"),
+            AtRisk=("AtRisk", "sum")
+        ).reset_index()
+        
+        summary["ProjectedFree"] = summary["ProjectedFree"].astype(np.int64)
+        summary["OverdueRisk"] = np.where(summary["WithDue"] > 0, summary["AtRisk"] / summary["WithDue"].clip(lower=1), 0.0)
+        contacts = self.data_handler.employee_contacts
+        summary["Name"] = [contacts.get(employee_id, ("",))[0] for employee_id in summary["ID"]]
+        
+        return summary.sort_values(["OverdueRisk", "AtRisk", "ProjectedFree"], ascending=False)[columns].reset_index(drop=True)
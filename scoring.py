@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from timestamps import now, parse_date, SECONDS_PER_DAY
+
+# Numerical value of each experience level (unknown levels are 0)
+EXPERIENCE_LEVELS = {
+    'Junior': 1,
+    'Mid-Level': 2,
+    'Senior': 3,
+    'Expert': 4
+}
+
+# Numerical value of each task priority (unknown priorities are 0)
+PRIORITY_LEVELS = {
+    'Low': 1,
+    'Medium': 2,
+    'High': 3
+}
+
+# Workload tiers in order of active task count: (Status, most active tasks in
+# the tier, score multiplier of its employees); the last tier is unbounded
+WORKLOAD_TIERS = [
+    ('Unassigned', 0, 1.0),
+    ('Partially Assigned', 3, 0.8),
+    ('Fully Assigned', None, 0.5)
+]
+
+# Upper bound of active tasks for the "Partially Assigned" tier
+PARTIALLY_ASSIGNED_MAX_TASKS = WORKLOAD_TIERS[1][1]
+
+# Days before its due date at which a task starts becoming urgent; urgency
+# then grows linearly to 1 on the due date and stays there once overdue
+URGENCY_HORIZON_DAYS = 14
+
+# role_preference factor of employees whose "preferred_tasks" include the
+# task's type, who named no preferred task types, and who named others
+ROLE_PREFERRED = 1.0
+ROLE_NO_PREFERENCE = 0.9
+ROLE_NOT_PREFERRED = 0.75
+
+# How candidates are ranked: every term turns a factor into a score in [0, 1],
+# raised to the term's weight, and the final score is the product of the
+# terms. A weight of 0 ignores a factor; `urgency_weight` is added to the
+# weight in proportion to the task's due-date urgency, so urgent tasks lean
+# harder on that factor. "availability" (share of weekly hours still free,
+# see capacity.py) is available but not used by default, as "workload"
+# already rewards free employees.
+DEFAULT_SCORING_SPEC = [
+    {"factor": "skill_match", "weight": 1.0},
+    {"factor": "workload", "weight": 1.0, "urgency_weight": 1.0},
+    {"factor": "experience_distance", "weight": 1.0},
+    {"factor": "completion_rate", "weight": 0.5},
+    {"factor": "role_preference", "weight": 1.0}
+]
+
+def workload_factor(candidates: pd.DataFrame, context: Dict[str, Any]) -> np.ndarray:
+    """
+    Multiplier of each candidate's workload tier (unknown tiers keep their full score)
+    """
+    multipliers = {status: multiplier for status, _, multiplier in WORKLOAD_TIERS}
+    return candidates['Status'].map(multipliers).fillna(1.0).to_numpy(dtype=np.float64)
+
+def skill_match_factor(candidates: pd.DataFrame, context: Dict[str, Any]) -> np.ndarray:
+    """
+    The matcher's skill score (similarity, prediction or match percentage), scaled to [0, 1]
+    """
+    scores = candidates[context['score_column']].to_numpy(dtype=np.float64) / context['score_scale']
+    return np.clip(scores, 0.0, 1.0)
+
+def experience_distance_factor(candidates: pd.DataFrame, context: Dict[str, Any]) -> np.ndarray:
+    """
+    1 at the preferred experience level, less by an equal step per level
+    away; the furthest level keeps one step, so every candidate stays ranked
+    """
+    target = EXPERIENCE_LEVELS.get(context['experience'])
+    if target is None:
+        return np.ones(len(candidates))
+    levels = candidates['Experience'].map(EXPERIENCE_LEVELS).fillna(0).to_numpy(dtype=np.float64)
+    steps = max(EXPERIENCE_LEVELS.values()) - min(EXPERIENCE_LEVELS.values()) + 1
+    return np.clip(1.0 - np.abs(levels - target) / steps, 1.0 / steps, 1.0)
+
+def completion_rate_factor(candidates: pd.DataFrame, context: Dict[str, Any]) -> np.ndarray:
+    """
+    Share of each candidate's tasks they completed, smoothed so employees without history score 0.5
+    """
+    completed = candidates['CompletedTasks'].to_numpy(dtype=np.float64)
+    active = candidates['TaskCount'].to_numpy(dtype=np.float64)
+    return (completed + 1.0) / (completed + active + 2.0)
+
+def role_preference_factor(candidates: pd.DataFrame, context: Dict[str, Any]) -> np.ndarray:
+    """
+    ROLE_PREFERRED, ROLE_NO_PREFERENCE or ROLE_NOT_PREFERRED by each
+    candidate's preferred task types (1 for tasks without a Task_Type)
+    """
+    capacity, task = context['capacity'], context['task']
+    task_type = task.get('Task_Type') if task else None
+    if capacity is None or not task_type:
+        return np.ones(len(candidates))
+    
+    rows = capacity.rows(context['employee_df'], candidates['ID'])
+    has_preference = capacity.arrays(context['employee_df'])['has_role_preference'][rows]
+    prefers = capacity.prefers_role(candidates['ID'], task_type)
+    return np.where(prefers, ROLE_PREFERRED, np.where(has_preference, ROLE_NOT_PREFERRED, ROLE_NO_PREFERENCE))
+
+def availability_factor(candidates: pd.DataFrame, context: Dict[str, Any]) -> np.ndarray:
+    """
+    Share of each candidate's weekly capacity hours still free
+    """
+    capacity = context['capacity']
+    if capacity is None:
+        return np.ones(len(candidates))
+    
+    arrays = capacity.arrays(context['employee_df'])
+    rows = capacity.rows(context['employee_df'], candidates['ID'])
+    return np.clip(arrays['available_hours'][rows] / arrays['capacity_hours'][rows], 0.0, 1.0)
+
+# Factors a scoring spec can name
+SCORING_FACTORS: Dict[str, Callable[[pd.DataFrame, Dict[str, Any]], np.ndarray]] = {
+    "skill_match": skill_match_factor,
+    "workload": workload_factor,
+    "experience_distance": experience_distance_factor,
+    "completion_rate": completion_rate_factor,
+    "role_preference": role_preference_factor,
+    "availability": availability_factor
+}
+
+def task_urgency(task: Optional[Dict[str, Any]], current_time: Optional[int] = None) -> float:
+    """
+    Due-date urgency of a task in [0, 1] (0 without a due date)
+    """
+    due = parse_date(task.get('Due_Date')) if task else None
+    if due is None:
+        return 0.0
+    days_left = (due - (current_time if current_time is not None else now())) / SECONDS_PER_DAY
+    return float(np.clip(1.0 - days_left / URGENCY_HORIZON_DAYS, 0.0, 1.0))
+
+class ScoringFunction:
+    """
+    A declarative scoring spec compiled for whole candidate sets
+    
+    Compiling drops the terms that can never affect a score (both weights 0)
+    and packs the weights into arrays, so scoring evaluates each factor once
+    as a column and combines them in a single NumPy expression:
+    prod(factors ** (weights + urgency * urgency_weights)) over the rows.
+    """
+    def __init__(self, spec: Optional[List[Dict[str, Any]]] = None):
+        self.spec = spec if spec is not None else DEFAULT_SCORING_SPEC
+        
+        terms = []
+        for term in self.spec:
+            if term.get("factor") not in SCORING_FACTORS:
+                raise ValueError(f"Unknown scoring factor {term.get('factor')!r}; "
+                                 f"expected one of {', '.join(SCORING_FACTORS)}")
+            weight = float(term.get("weight", 1.0))
+            urgency_weight = float(term.get("urgency_weight", 0.0))
+            if weight < 0 or urgency_weight < 0:
+                raise ValueError(f"Scoring factor {term['factor']!r} has a negative weight")
+            if weight or urgency_weight:
+                terms.append((term["factor"], weight, urgency_weight))
+        
+        self.names = [name for name, _, _ in terms]
+        self.factors = [SCORING_FACTORS[name] for name in self.names]
+        self.weights = np.array([weight for _, weight, _ in terms], dtype=np.float64)
+        self.urgency_weights = np.array([urgency_weight for _, _, urgency_weight in terms], dtype=np.float64)
+    
+    def terms(self, candidates: pd.DataFrame, score_column: str, score_scale: float = 1.0,
+              task: Optional[Dict[str, Any]] = None, experience: Optional[str] = None,
+              capacity: Any = None, employee_df: Optional[pd.DataFrame] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Every factor of every candidate row (one column per term, in self.names
+        order) and the weights they are raised to for `task`
+        
+        `score_column` holds the skill score the matcher produced, on a scale
+        of 0 to `score_scale`; `experience` is the preferred experience level;
+        `capacity` is a capacity.CapacityModel read with the roster snapshot
+        employee_df the candidates were taken from.
+        """
+        context = {'score_column': score_column, 'score_scale': score_scale, 'experience': experience,
+                   'task': task, 'capacity': capacity, 'employee_df': employee_df}
+        if len(candidates) == 0 or not self.factors:
+            return np.ones((len(candidates), len(self.factors))), self.weights
+        
+        matrix = np.column_stack([factor(candidates, context) for factor in self.factors])
+        return matrix, self.weights + task_urgency(task) * self.urgency_weights
+    
+    def __call__(self, candidates: pd.DataFrame, score_column: str, score_scale: float = 1.0,
+                 task: Optional[Dict[str, Any]] = None, experience: Optional[str] = None,
+                 capacity: Any = None, employee_df: Optional[pd.DataFrame] = None) -> np.ndarray:
+        """
+        Final score of every candidate row for `task` (see terms for the arguments)
+        """
+        matrix, weights = self.terms(candidates, score_column, score_scale, task, experience, capacity, employee_df)
+        return np.prod(np.power(matrix, weights), axis=1)
@@ -0,0 +1,176 @@
+import pandas as pd
+from typing import Dict, Optional, Tuple
+from scoring import WORKLOAD_TIERS
+import timestamps
+
+def workload_status(active_count: int) -> str:
+    """
+    Map an employee's active task count to their workload status tier
+    """
+    for status, max_tasks, _ in WORKLOAD_TIERS:
+        if max_tasks is None or active_count <= max_tasks:
+            return status
+    return WORKLOAD_TIERS[-1][0]
+
+class TaskEventLog:
+    """
+    Append-only log of task events with per-employee workload aggregates
+    
+    Events are stored column-wise so the aggregates can be rebuilt from the
+    whole log (or any prefix of it) in one vectorized pass, while appending an
+    event updates the aggregates incrementally.
+    """
+    EVENT_TYPES = ("created", "assigned", "status_changed", "deleted")
+    
+    def __init__(self):
+        # Columnar event storage, one entry per event
+        self.columns = {
+            "task_id": [],
+            "event_type": [],
+            "employee_id": [],
+            "status": [],
+            "timestamp": []
+        }
+        
+        # Current (assignee, status) of every live task
+        self.task_state = {}
+        
+        # Materialized per-employee aggregates
+        self.active_counts = {}
+        self.completed_counts = {}
+    
+    def __len__(self) -> int:
+        return len(self.columns["task_id"])
+    
+    def append(self, event_type: str, task_id: int, employee_id: Optional[int] = None,
+               status: Optional[str] = None) -> Dict[int, Tuple[int, int]]:
+        """
+        Append an event and update the aggregates
+        
+        Parameters:
+        - event_type: One of EVENT_TYPES
+        - task_id: The task the event is about
+        - employee_id: The new assignee (assigned events only)
+        - status: The task status after the event (created, assigned and status_changed events)
+        
+        Returns the per-employee (active, completed) count deltas caused by the event.
+        """
+        if event_type not in self.EVENT_TYPES:
+            raise ValueError(f"Unknown task event type: {event_type}")
+        
+        self.columns["task_id"].append(task_id)
+        self.columns["event_type"].append(event_type)
+        self.columns["employee_id"].append(employee_id)
+        self.columns["status"].append(status)
+        self.columns["timestamp"].append(timestamps.now())
+        
+        deltas = {}
+        prev_assignee, prev_status = self.task_state.get(task_id, (None, None))
+        
+        if event_type == "created":
+            self.task_state[task_id] = (None, status)
+            return deltas
+        
+        # Take the task's current contribution away, then add the new one
+        self._contribute(deltas, prev_assignee, prev_status, -1)
+        
+        if event_type == "deleted":
+            self.task_state.pop(task_id, None)
+            return deltas
+        
+        assignee = employee_id if event_type == "assigned" else prev_assignee
+        self.task_state[task_id] = (assignee, status)
+        self._contribute(deltas, assignee, status, 1)
+        
+        return {emp_id: delta for emp_id, delta in deltas.items() if delta != (0, 0)}
+    
+    def _contribute(self, deltas: Dict[int, Tuple[int, int]], employee_id: Optional[int],
+                    status: Optional[str], sign: int) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) one task's contribution to an employee's aggregates
+        """
+        if employee_id is None:
+            return
+        
+        active, completed = deltas.get(employee_id, (0, 0))
+        if status == "Completed":
+            self.completed_counts[employee_id] = self.completed_counts.get(employee_id, 0) + sign
+            completed += sign
+        else:
+            # Not Started, In Progress and Blocked tasks all occupy the employee
+            self.active_counts[employee_id] = self.active_counts.get(employee_id, 0) + sign
+            active += sign
+        deltas[employee_id] = (active, completed)
+    
+    def get_active_count(self, employee_id: int) -> int:
+        return self.active_counts.get(employee_id, 0)
+    
+    def get_completed_count(self, employee_id: int) -> int:
+        return self.completed_counts.get(employee_id, 0)
+    
+    def get_employee_status(self, employee_id: int) -> str:
+        return workload_status(self.get_active_count(employee_id))
+    
+    def _replay_tasks(self, upto: Optional[int] = None) -> pd.DataFrame:
+        """
+        Reduce the log to the final (assignee, status) of every live task
+        """
+        log = pd.DataFrame({name: values[:upto] for name, values in self.columns.items()})
+        if len(log) == 0:
+            return pd.DataFrame(columns=["assignee", "status"])
+        
+        # Only assigned events change the assignee; 'last' skips the other events' NaNs
+        log["assignee"] = log["employee_id"].where(log["event_type"] == "assigned")
+        by_task = log.groupby("task_id", sort=False)
+        tasks = pd.DataFrame({
+            "assignee": by_task["assignee"].last(),
+            "status": by_task["status"].last(),
+            "deleted": log["event_type"].eq("deleted").groupby(log["task_id"], sort=False).any()
+        })
+        
+        return tasks.loc[~tasks["deleted"], ["assignee", "status"]]
+    
+    def compute_aggregates(self, upto: Optional[int] = None) -> pd.DataFrame:
+        """
+        Compute per-employee aggregates from the log in one vectorized pass
+        
+        Parameters:
+        - upto: Only replay the first `upto` events (defaults to the whole log)
+        
+        Returns a DataFrame indexed by employee ID with ActiveTasks, CompletedTasks and Status.
+        """
+        return self._aggregate(self._replay_tasks(upto))
+    
+    def _aggregate(self, tasks: pd.DataFrame) -> pd.DataFrame:
+        """
+        Group replayed task states into per-employee aggregates
+        """
+        tasks = tasks[tasks["assignee"].notnull()]
+        if len(tasks) == 0:
+            return pd.DataFrame(columns=["ActiveTasks", "CompletedTasks", "Status"])
+        
+        completed = tasks["status"].eq("Completed")
+        assignee = tasks["assignee"].astype(int)
+        aggregates = pd.DataFrame({
+            "ActiveTasks": (~completed).groupby(assignee).sum(),
+            "CompletedTasks": completed.groupby(assignee).sum()
+        }).astype(int)
+        aggregates.index.name = "ID"
+        aggregates["Status"] = aggregates["ActiveTasks"].map(workload_status)
+        
+        return aggregates
+    
+    def rebuild(self) -> pd.DataFrame:
+        """
+        Recompute the materialized aggregates and task state from the whole log
+        """
+        tasks = self._replay_tasks()
+        aggregates = self._aggregate(tasks)
+        
+        self.active_counts = aggregates["ActiveTasks"].to_dict()
+        self.completed_counts = aggregates["CompletedTasks"].to_dict()
+        
+        assignees = [None if pd.isna(emp_id) else int(emp_id) for emp_id in tasks["assignee"]]
+        self.task_state = dict(zip(tasks.index, zip(assignees, tasks["status"])))
+        
+        return aggregates
@@ -1,27 +1,115 @@
+import numpy as np
 import pandas as pd
+from collections import Counter
 from typing import List, Dict, Any, Optional
 import streamlit as st
 from task_prediction_model import TaskAssignmentModel, SkillSimilarityModel
+from scoring import ScoringFunction, ROLE_NO_PREFERENCE
+from capacity import CapacityModel
+from model_registry import ModelRegistry
+from model_tuning import ModelTuner
+from instrumentation import instrumented, roster_rows
+from roster import RosterStore
 
 class TaskMatcher:
     """
     Handles matching tasks to employees based on skills and availability
     """
-    def __init__(self, employee_df: Optional[pd.DataFrame] = None):
-        self.employee_df = employee_df
+    def __init__(self, employee_df: Optional[pd.DataFrame] = None, roster: Optional[RosterStore] = None):
+        # Shared roster to match against; without one, matching uses the
+        # roster last passed to set_employee_data
+        self.roster = roster
+        self._employee_df = employee_df
         self.ml_model = TaskAssignmentModel()
         self.similarity_model = SkillSimilarityModel()
         self.use_ml_model = False
+        self.online_learning = False
         self.tasks_df = None
+        
+        # Inverted index of skill -> IDs of employees having it, plus the skills
+        # each employee was indexed under so single rows can be re-indexed
+        self.skill_index = {}
+        self.indexed_skills = {}
+        
+        # Working hours, committed effort and role preferences of every
+        # employee, fed by a DataHandler listener and a PreferenceStore
+        self.capacity = CapacityModel()
+        
+        # Candidate retrieval in front of the ML scorer (see shortlist_candidates):
+        # the most candidates ranked (None keeps every eligible employee) and
+        # whether candidates need room for the task's effort;
+        # benchmarks/shortlist.py measures the recall of both
+        self.use_shortlist = True
+        self.shortlist_size = None
+        self.shortlist_require_capacity = True
+        
+        # How recommend_best_match ranks candidates (see scoring.DEFAULT_SCORING_SPEC)
+        self.scoring = ScoringFunction()
+        
+        # Models found by tune_prediction_model: the promoted one is served,
+        # and retraining keeps its configuration
+        self.model_registry = ModelRegistry()
+        promoted = self.model_registry.promoted()
+        if promoted is not None:
+            self.ml_model.estimator_family = promoted["family"]
+            self.ml_model.estimator_params = promoted["params"]
+            if self.ml_model.load_registered(self.model_registry, promoted):
+                self.use_ml_model = True
     
+    @property
+    def employee_df(self) -> Optional[pd.DataFrame]:
+        """
+        The current roster snapshot
+        
+        Methods read this once and use that snapshot throughout, so a request
+        sees one consistent roster even while other sessions publish new versions.
+        """
+        if self.roster is not None:
+            return self.roster.employee_df
+        return self._employee_df
+    
+    @instrumented(rows=roster_rows)
     def set_employee_data(self, employee_df: pd.DataFrame) -> None:
         """
         Set or update the employee data
         """
-        self.employee_df = employee_df
+        self._employee_df = employee_df
+        
+        # Rebuild the skill index from scratch
+        self.skill_index = {}
+        self.indexed_skills = {}
+        self._index_employees(employee_df)
         
-        # Fit the similarity model with the updated employee data
-        self.similarity_model.fit(employee_df)
+        # Refit the similarity model lazily, on the first AI match against this roster
+        self.similarity_model.reset()
+    
+    @instrumented(rows=roster_rows)
+    def apply_roster_delta(self, employee_df: pd.DataFrame, changes: Dict[str, List[int]]) -> None:
+        """
+        Update the employee data after a delta reload, invalidating only the
+        skill index entries and similarity rows of the affected employees
+        """
+        self._employee_df = employee_df
+        
+        changed_ids = changes['inserted'] + changes['updated']
+        
+        # Un-index updated and deleted employees, then index the new versions
+        for employee_id in changes['updated'] + changes['deleted']:
+            for skill in self.indexed_skills.pop(employee_id, []):
+                self.skill_index[skill].discard(employee_id)
+        
+        self._index_employees(employee_df[employee_df['ID'].isin(changed_ids)])
+        
+        self.similarity_model.update(employee_df, changed_ids, changes['deleted'])
+    
+    def _index_employees(self, employee_df: pd.DataFrame) -> None:
+        """
+        Add employees to the skill index
+        """
+        for employee_id, skills in zip(employee_df['ID'].tolist(), employee_df['Skills']):
+            self.indexed_skills[employee_id] = list(skills)
+            for skill in skills:
+                self.skill_index.setdefault(skill, set()).add(employee_id)
         
     def set_tasks_data(self, tasks_df: pd.DataFrame) -> None:
         """
@@ -29,29 +117,78 @@ class TaskMatcher:
         """
         self.tasks_df = tasks_df
         
+    @instrumented(rows=roster_rows)
     def train_prediction_model(self) -> bool:
         """
         Train the ML prediction model with current employee and task data
         """
-        if self.employee_df is None or self.tasks_df is None:
+        employee_df = self.employee_df
+        if employee_df is None or self.tasks_df is None:
             return False
             
-        success = self.ml_model.train_model(self.employee_df, self.tasks_df)
+        success = self.ml_model.train_model(employee_df, self.tasks_df)
         if success:
             self.use_ml_model = True
             st.success("AI task assignment model trained successfully!")
         return success
     
-    def find_matching_employees(self, required_skills: List[str], experience_level: Optional[str] = None) -> pd.DataFrame:
+    @instrumented(rows=roster_rows)
+    def tune_prediction_model(self, n_splits: int = 3, n_jobs: int = -1) -> Optional[pd.DataFrame]:
+        """
+        Search model families and hyperparameters on the completed task history
+        and promote the best into the model registry (see model_tuning.ModelTuner)
+        
+        Returns every configuration's metrics, best first, or None without
+        enough completed tasks.
+        """
+        employee_df = self.employee_df
+        if employee_df is None or self.tasks_df is None:
+            return None
+        
+        tuner = ModelTuner(self.ml_model, self.model_registry, n_splits=n_splits, n_jobs=n_jobs)
+        results = tuner.search(employee_df, self.tasks_df)
+        if results is not None:
+            self.use_ml_model = True
+        return results
+    
+    @instrumented()
+    def learn_from_completed_task(self, task: Dict[str, Any]) -> bool:
+        """
+        Feed a single completed task into the online learner (online learning mode only)
+        """
+        employee_df = self.employee_df
+        if not self.online_learning or employee_df is None:
+            return False
+        
+        employee = employee_df[employee_df['ID'] == task.get('Assigned_To')]
+        if len(employee) == 0:
+            return False
+        
+        self.ml_model.partial_fit(employee.iloc[0], task, classes=employee_df['ID'].values)
+        
+        # Start serving ML predictions once the forest has been compacted (compactions
+        # run in the background, so this may be picked up on a later completion)
+        if self.ml_model.trained:
+            self.use_ml_model = True
+        return True
+    
+    @instrumented(rows=roster_rows)
+    def find_matching_employees(self, required_skills: List[str], experience_level: Optional[str] = None,
+                                employee_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
         """
         Find employees that match the required skills and optionally experience level
+        
+        Searches `employee_df` when given (a snapshot the caller already holds),
+        otherwise the current roster.
         """
-        if self.employee_df is None or len(self.employee_df) == 0:
+        if employee_df is None:
+            employee_df = self.employee_df
+        if employee_df is None or len(employee_df) == 0:
             return pd.DataFrame()
         
         matching_employees = []
         
-        for idx, employee in self.employee_df.iterrows():
+        for idx, employee in employee_df.iterrows():
             employee_skills = employee['Skills']
             skill_match_count = sum(1 for skill in required_skills if skill in employee_skills)
             
@@ -84,42 +221,153 @@ class TaskMatcher:
         
         return pd.DataFrame()
     
+    def skill_overlaps(self, required_skills: List[str], employee_df: pd.DataFrame) -> Optional[np.ndarray]:
+        """
+        Number of the required skills each employee of employee_df has, counted
+        from the skill index (None if nothing has been indexed)
+        """
+        if not self.skill_index:
+            return None
+        
+        overlap = Counter()
+        for skill in set(required_skills):
+            overlap.update(self.skill_index.get(skill, ()))
+        
+        counts = np.zeros(len(employee_df), dtype=np.int64)
+        if overlap:
+            candidate_ids = np.fromiter(overlap.keys(), dtype=np.int64, count=len(overlap))
+            candidate_counts = np.fromiter(overlap.values(), dtype=np.int64, count=len(overlap))
+            
+            # Employees indexed under an older roster version may be gone from this snapshot
+            positions = pd.Index(employee_df['ID'].to_numpy()).get_indexer(candidate_ids)
+            present = positions >= 0
+            counts[positions[present]] = candidate_counts[present]
+        return counts
+    
+    @instrumented()
+    def shortlist_candidates(self, required_skills: List[str], employee_df: pd.DataFrame,
+                             overlaps: Optional[np.ndarray] = None,
+                             task: Optional[Dict[str, Any]] = None) -> Optional[np.ndarray]:
+        """
+        Cheap retrieval stage in front of the ML scorer
+        
+        Employees sharing no skill with the task are never worth ranking, so
+        candidates are the union of the skill index entries of the required
+        skills, narrowed by a capacity cutoff (enough available hours for the
+        task's effort). Experience is left to the scoring spec, which ranks
+        nearby levels instead of excluding them. If more than shortlist_size
+        remain, those with the most matching skills (then the most available
+        hours) are kept.
+        
+        Returns the candidates' row positions in employee_df (in roster order),
+        or None to rank the whole roster: when use_shortlist is off, or no
+        indexed employee has any of the skills.
+        """
+        if not self.use_shortlist:
+            return None
+        
+        if overlaps is None:
+            overlaps = self.skill_overlaps(required_skills, employee_df)
+        if overlaps is None or not overlaps.any():
+            return None
+        
+        eligible = overlaps > 0
+        
+        if self.shortlist_require_capacity:
+            # Keep the cutoff only if it leaves someone to recommend
+            within_capacity = eligible & self.capacity.within_capacity(employee_df, task)
+            if within_capacity.any():
+                eligible = within_capacity
+        
+        positions = np.flatnonzero(eligible)
+        if len(positions) == 0:
+            return None
+        
+        if self.shortlist_size is not None and len(positions) > self.shortlist_size:
+            # Most matching skills first, then the least loaded
+            available = self.capacity.arrays(employee_df)['available_hours']
+            order = np.lexsort((-available[positions], -overlaps[positions]))[:self.shortlist_size]
+            positions = np.sort(positions[order])
+        
+        return positions
+    
+    @instrumented()
     def find_employees_by_skill(self, skill: str) -> pd.DataFrame:
         """
         Find employees who have a specific skill
         """
-        if self.employee_df is None or len(self.employee_df) == 0:
+        employee_df = self.employee_df
+        if employee_df is None or len(employee_df) == 0:
             return pd.DataFrame()
         
-        filtered_employees = []
+        # Look the skill up in the index instead of scanning every employee
+        employee_ids = self.skill_index.get(skill)
         
-        for idx, employee in self.employee_df.iterrows():
-            if skill in employee['Skills']:
-                filtered_employees.append({
-                    'ID': employee['ID'],
-                    'Name': employee['Name'],
-                    'Role': employee['Role'],
-                    'Position': employee['Position'],
-                    'Experience': employee['Experience'],
-                    'Skills': employee['Skills'],
-                    'Status': employee['Status'],
-                    'TaskCount': employee['TaskCount']
-                })
-        
-        if filtered_employees:
-            return pd.DataFrame(filtered_employees)
+        if employee_ids:
+            columns = ['ID', 'Name', 'Role', 'Position', 'Experience', 'Skills', 'Status', 'TaskCount']
+            filtered_employees = employee_df[employee_df['ID'].isin(employee_ids)]
+            return filtered_employees[columns].reset_index(drop=True)
         
         return pd.DataFrame()
     
-    def recommend_best_match(self, required_skills: List[str], experience_preference: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    def set_scoring_spec(self, spec: List[Dict[str, Any]]) -> None:
+        """
+        Rank recommendations with a new scoring spec (raises ValueError if it is invalid)
+        """
+        self.scoring = ScoringFunction(spec)
+    
+    def _best_scored(self, candidates: pd.DataFrame, score_column: str, score_scale: float,
+                     task: Dict[str, Any], experience_preference: Optional[str],
+                     employee_df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        The candidate with the highest final score, with its FinalScore and
+        (for typed tasks) the score multiplier its role preference applied
+        """
+        matrix, weights = self.scoring.terms(candidates, score_column, score_scale, task, experience_preference,
+                                             self.capacity, employee_df)
+        final_scores = np.prod(np.power(matrix, weights), axis=1)
+        best = int(np.argmax(final_scores))
+        best_match = candidates.iloc[best].to_dict()
+        best_match['FinalScore'] = float(final_scores[best])
+        
+        # Record how much the role preference raised or lowered the score,
+        # relative to an employee without preferences
+        if task.get('Task_Type') and 'role_preference' in self.scoring.names:
+            term = self.scoring.names.index('role_preference')
+            multiplier = float((matrix[best, term] / ROLE_NO_PREFERENCE) ** weights[term])
+            best_match['RolePreferenceEffect'] = multiplier
+            self.capacity.record_preference_effect(best_match['ID'], task['Task_Type'], multiplier)
+        return best_match
+    
+    def _with_capacity(self, candidates: pd.DataFrame, employee_df: pd.DataFrame, task: Dict[str, Any]) -> pd.DataFrame:
+        """
+        The candidates with enough available hours for the task, in one vectorized mask
+        """
+        rows = self.capacity.rows(employee_df, candidates['ID'])
+        return candidates[self.capacity.within_capacity(employee_df, task, rows)]
+    
+    @instrumented(rows=roster_rows)
+    def recommend_best_match(self, required_skills: List[str], experience_preference: Optional[str] = None,
+                             priority: str = "Medium", due_date: Optional[str] = None,
+                             task_type: Optional[str] = None, estimated_hours: Optional[float] = None,
+                             require_capacity: bool = False) -> Optional[Dict[str, Any]]:
         """
         Recommend the best employee match for a task based on skills, experience, and current workload
-        Uses AI models when available
+        Uses AI models when available; candidates are ranked by the scoring spec
+        
+        With require_capacity, only employees with enough available hours for
+        the task's effort are considered (see TaskScheduler).
         """
+        # One roster snapshot for the whole recommendation
+        employee_df = self.employee_df
+        
         # Create a mock task for prediction
         task = {
             'Required_Skills': required_skills,
-            'Priority': 'Medium',  # Default priority if not specified
+            'Priority': priority,
+            'Due_Date': due_date,
+            'Task_Type': task_type,
+            'Estimated_Hours': estimated_hours,
             'Status': 'Not Started'
         }
         
@@ -128,96 +376,125 @@ class TaskMatcher:
         
         # First try the ML model if it's trained
         if self.use_ml_model and self.ml_model.trained:
-            # Use the machine learning model for prediction
-            employees_with_scores = self.ml_model.predict(task, self.employee_df)
+            # Use the machine learning model for prediction, ranking only the shortlisted candidates
+            overlaps = self.skill_overlaps(required_skills, employee_df)
+            candidates = self.shortlist_candidates(required_skills, employee_df, overlaps, task)
+            employees_with_scores = self.ml_model.predict(task, employee_df, candidates, overlaps)
             
             if employees_with_scores is not None and len(employees_with_scores) > 0:
-                # Apply experience filter if specified
-                if experience_preference and experience_preference != "Any":
-                    employees_with_scores = employees_with_scores[
-                        employees_with_scores['Experience'] == experience_preference
-                    ]
+                # The experience preference is scored by distance (see _best_scored), not filtered
+                if require_capacity:
+                    employees_with_scores = self._with_capacity(employees_with_scores, employee_df, task)
                 
                 if len(employees_with_scores) > 0:
-                    # Get the best match
-                    best_match = employees_with_scores.iloc[0].to_dict()
+                    best_match = self._best_scored(employees_with_scores, 'PredictionScore', 1.0,
+                                                   task, experience_preference, employee_df)
                     best_match['MatchPercentage'] = float(best_match.get('PredictionScore', 0) * 100)
                     best_match['AI_Powered'] = True
                     return best_match
         
         # If ML model fails or not enough data, try the similarity model
-        employees_with_scores = self.similarity_model.predict(task, self.employee_df)
+        employees_with_scores = self.similarity_model.predict(task, employee_df)
         if employees_with_scores is not None and len(employees_with_scores) > 0:
-            # Apply experience filter if specified
-            if experience_preference and experience_preference != "Any":
-                employees_with_scores = employees_with_scores[
-                    employees_with_scores['Experience'] == experience_preference
-                ]
+            if require_capacity:
+                employees_with_scores = self._with_capacity(employees_with_scores, employee_df, task)
             
             if len(employees_with_scores) > 0:
-                # Get the best match considering similarity and workload
-                employees_with_scores['WorkloadFactor'] = 1.0
-                for idx, emp in employees_with_scores.iterrows():
-                    if emp['Status'] == 'Partially Assigned':
-                        employees_with_scores.at[idx, 'WorkloadFactor'] = 0.8
-                    elif emp['Status'] == 'Fully Assigned':
-                        employees_with_scores.at[idx, 'WorkloadFactor'] = 0.5
-                
-                # Adjust score by workload factor
-                employees_with_scores['FinalScore'] = employees_with_scores['SimilarityScore'] * employees_with_scores['WorkloadFactor']
-                
-                # Get best match
-                best_match = employees_with_scores.sort_values(by='FinalScore', ascending=False).iloc[0].to_dict()
+                best_match = self._best_scored(employees_with_scores, 'SimilarityScore', 1.0,
+                                               task, experience_preference, employee_df)
                 best_match['MatchPercentage'] = float(best_match.get('SimilarityScore', 0) * 100)
                 best_match['AI_Powered'] = True
                 return best_match
         
         # Fall back to the original algorithm if AI methods fail
-        matching_employees = self.find_matching_employees(required_skills, experience_preference)
+        matching_employees = self.find_matching_employees(required_skills, employee_df=employee_df)
+        if require_capacity and len(matching_employees) > 0:
+            matching_employees = self._with_capacity(matching_employees, employee_df, task)
         
         if len(matching_employees) == 0:
             return None
         
-        # Consider both match percentage and current workload
-        matching_employees['WorkloadFactor'] = 1.0
-        for idx, emp in matching_employees.iterrows():
-            if emp['Status'] == 'Partially Assigned':
-                matching_employees.at[idx, 'WorkloadFactor'] = 0.8
-            elif emp['Status'] == 'Fully Assigned':
-                matching_employees.at[idx, 'WorkloadFactor'] = 0.5
-        
-        # Adjust match score by workload factor
-        matching_employees['FinalScore'] = matching_employees['MatchPercentage'] * matching_employees['WorkloadFactor']
-        
-        # Get best match
-        best_match = matching_employees.sort_values(by='FinalScore', ascending=False).iloc[0].to_dict()
+        best_match = self._best_scored(matching_employees, 'MatchPercentage', 100.0, task, experience_preference,
+                                       employee_df)
         best_match['AI_Powered'] = False
         
         return best_match
         
+    @instrumented(rows=roster_rows)
     def find_ai_matches(self, task: Dict[str, Any]) -> pd.DataFrame:
         """
         Use AI models to find the best matches for a task
         """
-        # Try the ML model first if trained
+        return self.find_ai_matches_many([task])[0]
+    
+    @instrumented(rows=roster_rows)
+    def find_ai_matches_many(self, tasks: List[Dict[str, Any]],
+                             employee_df: Optional[pd.DataFrame] = None) -> List[pd.DataFrame]:
+        """
+        find_ai_matches for several tasks, each model scoring its share of
+        the tasks in one batch (see MatchCoalescer)
+        
+        Matches against `employee_df` when given (a snapshot the caller already
+        holds), otherwise the current roster.
+        """
+        # One roster snapshot for the whole batch
+        if employee_df is None:
+            employee_df = self.employee_df
+        results = [None] * len(tasks)
+        
+        # Try the ML model first if trained, ranking only each task's shortlisted candidates
         if self.use_ml_model and self.ml_model.trained:
-            matches = self.ml_model.predict(task, self.employee_df)
-            if matches is not None and len(matches) > 0:
-                # Add AI flag
-                matches['AI_Method'] = 'Machine Learning'
-                matches['MatchPercentage'] = matches['PredictionScore'] * 100
-                return matches
+            overlaps = [self.skill_overlaps(task.get('Required_Skills', []), employee_df) for task in tasks]
+            candidates = [self.shortlist_candidates(task.get('Required_Skills', []), employee_df, overlaps=task_overlaps,
+                                                    task=task)
+                          for task, task_overlaps in zip(tasks, overlaps)]
+            for i, matches in enumerate(self.ml_model.predict_many(tasks, employee_df, candidates,
+                                                                   overlaps if self.skill_index else None) or []):
+                if matches is not None and len(matches) > 0:
+                    # Add AI flag
+                    matches['AI_Method'] = 'Machine Learning'
+                    matches['MatchPercentage'] = matches['PredictionScore'] * 100
+                    results[i] = matches
         
         # Fall back to similarity model
-        matches = self.similarity_model.predict(task, self.employee_df)
-        if matches is not None and len(matches) > 0:
-            # Add AI flag
-            matches['AI_Method'] = 'Skill Similarity'
-            matches['MatchPercentage'] = matches['SimilarityScore'] * 100
-            return matches
-            
+        remaining = [i for i, matches in enumerate(results) if matches is None]
+        if remaining:
+            predictions = self.similarity_model.predict_many([tasks[i] for i in remaining], employee_df)
+            for i, matches in zip(remaining, predictions):
+                if matches is not None and len(matches) > 0:
+                    # Add AI flag
+                    matches['AI_Method'] = 'Skill Similarity'
+                    matches['MatchPercentage'] = matches['SimilarityScore'] * 100
+                    results[i] = matches
+        
         # If all else fails, use the basic matching algorithm
-        if 'Required_Skills' in task:
-            return self.find_matching_employees(task['Required_Skills'])
-            
-        return pd.DataFrame()
+        for i, matches in enumerate(results):
+            if matches is None:
+                if 'Required_Skills' in tasks[i]:
+                    results[i] = self.find_matching_employees(tasks[i]['Required_Skills'], employee_df=employee_df)
+                else:
+                    results[i] = pd.DataFrame()
+        
+        return results
+    
+    @instrumented(rows=roster_rows)
+    def rank_matches_many(self, tasks: List[Dict[str, Any]]) -> List[pd.DataFrame]:
+        """
+        find_ai_matches_many with every task's matches ordered by the scoring
+        spec, highest FinalScore first
+        
+        The first row is the employee recommend_best_match would pick for the
+        task, so ranked recommendations and automatic assignments agree.
+        """
+        # One roster snapshot for the model scores and the capacity terms
+        employee_df = self.employee_df
+        
+        results = []
+        for task, matches in zip(tasks, self.find_ai_matches_many(tasks, employee_df)):
+            if len(matches) > 0:
+                # Every path reports its skill score as MatchPercentage (0-100)
+                matches['FinalScore'] = self.scoring(matches, 'MatchPercentage', 100.0, task, None,
+                                                     self.capacity, employee_df)
+                matches = matches.sort_values('FinalScore', ascending=False, kind='stable')
+            results.append(matches)
+        return results
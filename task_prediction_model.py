@@ -1,16 +1,73 @@
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, OneHotEncoder
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
 import streamlit as st
+from instrumentation import instrumented, employees_arg_rows
+from scoring import EXPERIENCE_LEVELS, PRIORITY_LEVELS
+from tree_ensemble import FlatForest, is_tree_ensemble
 import pickle
 import os
+import threading
+
+# scikit-learn and scipy are imported inside the methods that use them, so
+# importing this module (and the app's first paint) does not pay for the ML stack
+
+# Most task/employee feature rows stacked into one batch by predict_many
+MAX_PREDICT_ROWS = 1000000
+
+# Most distinct feature rows scored with the flattened forest; above this
+# sklearn's predict_proba is faster (benchmarks/tree_inference.py)
+FLAT_FOREST_MAX_ROWS = 256
+
+# Feature columns of models saved before their features were recorded, in training order
+DEFAULT_FEATURES = ['skill_match_score', 'employee_experience', 'task_priority', 'current_workload', 'completed_tasks']
+
+# Estimators TaskAssignmentModel can be configured with, by family name:
+# (module, class, default parameters)
+MODEL_FAMILIES = {
+    "random_forest": ("sklearn.ensemble", "RandomForestClassifier", {"n_estimators": 100, "random_state": 42}),
+    "extra_trees": ("sklearn.ensemble", "ExtraTreesClassifier", {"n_estimators": 100, "random_state": 42}),
+    "logistic_regression": ("sklearn.linear_model", "LogisticRegression", {"max_iter": 1000})
+}
+
+def distinct_feature_rows(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The distinct rows of a feature matrix, and the index of each row among them
+    
+    np.unique(axis=0) sorts the rows as opaque byte strings, which dominates a
+    large batch's cost. Hashing each column (pd.factorize) and folding the
+    codes into one row code keeps this linear in the number of rows.
+    """
+    row_codes = np.zeros(len(matrix), dtype=np.int64)
+    for column in matrix.T:
+        codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        # Both codes are below len(matrix), so the combined one fits in an int64
+        row_codes, _ = pd.factorize(row_codes * len(uniques) + codes)
+    
+    # Codes number the distinct rows in order of first appearance
+    _, first_rows = np.unique(row_codes, return_index=True)
+    return matrix[first_rows], row_codes
+
+def descending_order(values: np.ndarray) -> np.ndarray:
+    """
+    Positions of `values` from highest to lowest, with ties in the order
+    pandas' sort_values(ascending=False) leaves them (values must not be NaN)
+    """
+    reversed_order = values[::-1].argsort(kind='quicksort')
+    return (len(values) - 1 - reversed_order)[::-1]
+
+def build_estimator(family: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    A new unfitted estimator of a MODEL_FAMILIES family, with `params` over its defaults
+    """
+    if family not in MODEL_FAMILIES:
+        raise ValueError(f"Unknown model family {family!r}; expected one of {', '.join(MODEL_FAMILIES)}")
+    
+    import importlib
+    
+    module, class_name, defaults = MODEL_FAMILIES[family]
+    estimator_class = getattr(importlib.import_module(module), class_name)
+    return estimator_class(**{**defaults, **(params or {})})
 
 class TaskAssignmentModel:
     """
@@ -18,13 +75,44 @@ class TaskAssignmentModel:
     """
     def __init__(self):
         self.model = None
-        self.skill_vectorizer = TfidfVectorizer(analyzer='word', stop_words='english')
-        self.label_encoder = LabelEncoder()
         self.trained = False
         self.features = None
         self.model_path = "task_assignment_model.pkl"
         self.vectorizer_path = "skill_vectorizer.pkl"
         
+        # Guards replacing the served model: model, flat_model and trained are
+        # swapped together (see install_model), and readers take all three at once
+        self.lock = threading.Lock()
+        
+        # Estimator fitted by train_model and compact (see MODEL_FAMILIES);
+        # model_tuning.ModelTuner replaces these with the best configuration found
+        self.estimator_family = "random_forest"
+        self.estimator_params = {}
+        
+        # Tree ensembles are also kept flattened into arrays (see install_model)
+        # for low-latency scoring of small batches
+        self.flat_model = None
+        self.use_flat_model = True
+        
+        # Online learning state: an incrementally updated learner plus the
+        # feature rows seen so far, which compaction folds into the forest;
+        # online_lock guards it, as completions may arrive from several threads
+        self.online_model = None
+        self.sample_features = []
+        self.sample_targets = []
+        self.pending_updates = 0
+        self.compaction_interval = 20
+        self.online_lock = threading.Lock()
+        
+        # Share of the online learner in the served scores while it holds updates
+        # the forest has not seen yet; the forest keeps the rest
+        self.online_weight = 0.25
+        
+        # Compactions triggered by partial_fit refit on this background thread;
+        # compaction_lock lets only one refit run at a time
+        self.compaction_thread = None
+        self.compaction_lock = threading.Lock()
+        
     def preprocess_data(self, employees_df: pd.DataFrame, tasks_df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
         """
         Preprocess employee and task data for model training
@@ -51,13 +139,7 @@ class TaskAssignmentModel:
                 employee = employees_df[employees_df['ID'] == task['Assigned_To']].iloc[0]
                 
                 # Create features
-                features = {
-                    'skill_match_score': self._calculate_skill_match(employee['Skills'], task['Required_Skills']),
-                    'employee_experience': self._encode_experience(employee['Experience']),
-                    'task_priority': self._encode_priority(task['Priority']),
-                    'current_workload': employee['TaskCount'],
-                    'completed_tasks': employee['CompletedTasks']
-                }
+                features = self._build_features(employee, task)
                 
                 # Add employee ID as the target
                 features['assigned_to'] = employee['ID']
@@ -79,6 +161,18 @@ class TaskAssignmentModel:
         
         return X, y
     
+    def _build_features(self, employee: Any, task: Dict) -> Dict[str, Any]:
+        """
+        Build the feature row for one employee/task pair
+        """
+        return {
+            'skill_match_score': self._calculate_skill_match(employee['Skills'], task['Required_Skills']),
+            'employee_experience': self._encode_experience(employee['Experience']),
+            'task_priority': self._encode_priority(task['Priority']),
+            'current_workload': employee['TaskCount'],
+            'completed_tasks': employee['CompletedTasks']
+        }
+    
     def _calculate_skill_match(self, employee_skills: List[str], task_skills: List[str]) -> float:
         """
         Calculate skill match score between employee and task
@@ -99,25 +193,15 @@ class TaskAssignmentModel:
         """
         Encode experience level to numerical value
         """
-        experience_map = {
-            'Junior': 1,
-            'Mid-Level': 2,
-            'Senior': 3,
-            'Expert': 4
-        }
-        return experience_map.get(experience, 0)
+        return EXPERIENCE_LEVELS.get(experience, 0)
     
     def _encode_priority(self, priority: str) -> int:
         """
         Encode task priority to numerical value
         """
-        priority_map = {
-            'Low': 1,
-            'Medium': 2,
-            'High': 3
-        }
-        return priority_map.get(priority, 0)
+        return PRIORITY_LEVELS.get(priority, 0)
         
+    @instrumented(rows=employees_arg_rows)
     def train_model(self, employees_df: pd.DataFrame, tasks_df: pd.DataFrame) -> bool:
         """
         Train the task assignment prediction model
@@ -128,79 +212,307 @@ class TaskAssignmentModel:
         if X is None or len(X) < 5:  # Need at least a few samples to train
             return False
             
-        # Create and train a Random Forest classifier
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+        # Keep the feature rows so online updates and compaction can build on them
+        with self.online_lock:
+            self.sample_features = X.to_dict('records')
+            self.sample_targets = y.tolist()
+            self.online_model = None
+            self.pending_updates = 0
+        
+        # Create and train the configured classifier (a Random Forest by default)
+        self._fit_estimator(X, y)
         
-        # Train the model
-        self.model.fit(X, y)
-        self.trained = True
+        return True
+    
+    def _fit_estimator(self, X: pd.DataFrame, y: pd.Series) -> None:
+        """
+        Fit the configured estimator on a feature matrix, serve it and persist it
+        """
+        # Train a new model off to the side; the current one keeps serving meanwhile
+        estimator = build_estimator(self.estimator_family, self.estimator_params)
+        estimator.fit(X, y)
+        self.install_model(estimator)
         
         # Save the model
         self.save_model()
+    
+    @instrumented()
+    def partial_fit(self, employee: Any, task: Dict, classes: Optional[np.ndarray] = None) -> bool:
+        """
+        Learn from a single completed task without retraining from scratch
+        
+        Costs one incremental update of the online learner; every
+        compaction_interval updates, the forest is refitted on a background
+        thread (see compact) while the current one keeps serving, blended
+        with the online learner by online_weight.
+        
+        Parameters:
+        - employee: The employee row (Series or dict) that completed the task
+        - task: The completed task
+        - classes: All employee IDs the online learner may predict; only needed
+          the first time the online learner is created
+        """
+        features = self._build_features(employee, task)
+        if self.features is None:
+            self.features = list(features.keys())
+        
+        with self.online_lock:
+            self.sample_features.append(features)
+            self.sample_targets.append(employee['ID'])
+            
+            if self.online_model is None:
+                if classes is None:
+                    classes = np.unique(self.sample_targets)
+                classes = np.union1d(np.asarray(classes), np.asarray(self.sample_targets))
+                
+                from sklearn.linear_model import SGDClassifier
+                
+                # Seed the learner with everything seen so far (including this sample)
+                self.online_model = SGDClassifier(loss='log_loss', random_state=42)
+                X = pd.DataFrame(self.sample_features)[self.features]
+                self.online_model.partial_fit(X, self.sample_targets, classes=classes)
+            elif employee['ID'] in self.online_model.classes_:
+                # Employees unknown to the learner are picked up at the next compaction
+                X = pd.DataFrame([features])[self.features]
+                self.online_model.partial_fit(X, [employee['ID']])
+            
+            self.pending_updates += 1
+            
+            # Periodically fold the accumulated updates into the forest, off this thread
+            if self.pending_updates >= self.compaction_interval:
+                self._compact_in_background()
+        
+        return True
+    
+    def _compact_in_background(self) -> None:
+        """
+        Start a background compaction unless one is already running (call with online_lock held)
+        """
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return
+        self.compaction_thread = threading.Thread(target=self._compact_while_due, name="model-compaction", daemon=True)
+        self.compaction_thread.start()
+    
+    def _compact_while_due(self) -> None:
+        """
+        Compact until fewer than compaction_interval updates are pending, so
+        updates that arrived during a refit are not left waiting
+        """
+        while self.compact():
+            with self.online_lock:
+                if self.pending_updates < self.compaction_interval:
+                    return
+    
+    @instrumented()
+    def compact(self) -> bool:
+        """
+        Fold online updates into the Random Forest by refitting it on the cached
+        feature rows, without re-preprocessing the task history
+        
+        Runs synchronously (e.g. "Compact Now"); updates that arrive during
+        the refit stay pending for the next compaction.
+        """
+        with self.compaction_lock:
+            with self.online_lock:
+                if len(self.sample_targets) < 5:  # Same minimum as train_model
+                    return False
+                sample_features = list(self.sample_features)
+                sample_targets = list(self.sample_targets)
+                folded_updates = self.pending_updates
+            
+            X = pd.DataFrame(sample_features)[self.features]
+            y = pd.Series(sample_targets)
+            self._fit_estimator(X, y)
+            
+            with self.online_lock:
+                self.pending_updates = max(0, self.pending_updates - folded_updates)
         
         return True
+    
+    def install_model(self, estimator: Any) -> None:
+        """
+        Serve a fitted estimator, flattened first if it is a tree ensemble
+        (see tree_ensemble.FlatForest)
         
-    def predict(self, task: Dict, employees_df: pd.DataFrame) -> pd.DataFrame:
+        Concurrent predictions see either the old model or the new one, never
+        a mix of the two.
+        """
+        flat_model = FlatForest.from_sklearn(estimator) if is_tree_ensemble(estimator) else None
+        with self.lock:
+            self.model, self.flat_model, self.trained = estimator, flat_model, True
+    
+    def _scoring_estimators(self):
+        """
+        The estimators to score with: the forest and its flattened form, plus
+        the online learner while it holds updates the forest has not seen yet
+        (None otherwise)
+        """
+        with self.lock:
+            estimator, flat_model = self.model, self.flat_model
+        with self.online_lock:
+            if self.pending_updates > 0 and self.online_weight > 0:
+                return estimator, flat_model, self.online_model
+        return estimator, flat_model, None
+        
+    @instrumented(rows=employees_arg_rows)
+    def predict(self, task: Dict, employees_df: pd.DataFrame, candidate_positions: Optional[np.ndarray] = None,
+                skill_overlaps: Optional[np.ndarray] = None) -> pd.DataFrame:
         """
         Predict the best employee matches for a task
+        
+        See predict_many for candidate_positions and skill_overlaps.
+        """
+        predictions = self.predict_many([task], employees_df, [candidate_positions],
+                                        [skill_overlaps] if skill_overlaps is not None else None)
+        
+        # If model not trained and can't be loaded, return None
+        return predictions[0] if predictions is not None else None
+    
+    @instrumented(rows=employees_arg_rows)
+    def predict_many(self, tasks: List[Dict], employees_df: pd.DataFrame,
+                     candidate_positions: Optional[List[Optional[np.ndarray]]] = None,
+                     skill_overlaps: Optional[List[np.ndarray]] = None) -> Optional[List[pd.DataFrame]]:
+        """
+        Predict the best employee matches for several tasks at once
+        
+        The feature rows of every task/employee pair are stacked into one
+        matrix (split only where it would exceed MAX_PREDICT_ROWS). The
+        features take few distinct values, so most rows repeat, within a task
+        and even more across tasks: only the distinct rows are scored, in a
+        single predict_proba call, which makes a batch far cheaper than one
+        call per task.
+        
+        Parameters:
+        - candidate_positions: Per task, the row positions of the employees to
+          rank and return (None ranks the whole roster). Only the candidates'
+          rows are built and scored, and a score is the highest probability
+          of the employee's class over the rows scored for the task, so it
+          can differ from ranking the whole roster (benchmarks/shortlist.py
+          reports the recall lost).
+        - skill_overlaps: Per task, the number of required skills each
+          employee has (e.g. counted from a skill index), which spares
+          intersecting every employee's skills with the task's
+        
+        Returns one ranked DataFrame per task, or None if the model is not
+        trained and can't be loaded.
         """
         if not self.trained and not self.load_model():
-            # If model not trained and can't be loaded, return None
             return None
-            
-        # Prepare prediction data for all employees
-        prediction_data = []
         
-        for _, employee in employees_df.iterrows():
-            features = {
-                'skill_match_score': self._calculate_skill_match(employee['Skills'], task['Required_Skills']),
-                'employee_experience': self._encode_experience(employee['Experience']),
-                'task_priority': self._encode_priority(task['Priority']),
-                'current_workload': employee['TaskCount'],
-                'completed_tasks': employee['CompletedTasks']
-            }
-            
-            prediction_data.append(features)
-            
-        # Convert to DataFrame
-        pred_df = pd.DataFrame(prediction_data, index=employees_df.index)
+        if len(employees_df) == 0:
+            return [employees_df for _ in tasks]
         
-        # Ensure all required features are present
-        for feature in self.features:
-            if feature not in pred_df.columns:
-                pred_df[feature] = 0
-                
-        # Reorder columns to match training data
-        pred_df = pred_df[self.features]
+        if candidate_positions is None:
+            candidate_positions = [None] * len(tasks)
+        if skill_overlaps is None:
+            skill_overlaps = [None] * len(tasks)
         
-        # Get prediction probabilities
-        if len(pred_df) > 0:
-            probas = self.model.predict_proba(pred_df)
-            
-            # Get employee IDs from the model's classes
-            employee_ids = self.model.classes_
-            
-            # Create a probability DataFrame
-            proba_df = pd.DataFrame(probas, columns=employee_ids)
-            
-            # Assign probabilities to each employee
-            employees_df = employees_df.copy()
-            employees_df['PredictionScore'] = 0.0
-            
-            for emp_id in employee_ids:
-                if emp_id in employees_df['ID'].values:
-                    mask = employees_df['ID'] == emp_id
-                    idx = employees_df.index[mask].tolist()
-                    if idx:
-                        # Find the probability for this employee ID
-                        col_idx = list(employee_ids).index(emp_id)
-                        if col_idx < probas.shape[1]:
-                            employees_df.loc[mask, 'PredictionScore'] = probas[:, col_idx].max()
+        # Group tasks into chunks of at most MAX_PREDICT_ROWS stacked rows
+        # (a task alone may exceed it)
+        results, chunk, chunk_rows = [], [], 0
+        for request in zip(tasks, candidate_positions, skill_overlaps):
+            rows = len(employees_df) if request[1] is None else len(request[1])
+            if chunk and chunk_rows + rows > MAX_PREDICT_ROWS:
+                results.extend(self._predict_chunk(chunk, employees_df))
+                chunk, chunk_rows = [], 0
+            chunk.append(request)
+            chunk_rows += rows
+        if chunk:
+            results.extend(self._predict_chunk(chunk, employees_df))
+        return results
+    
+    def _predict_chunk(self, chunk: List[Tuple[Dict, Optional[np.ndarray], Optional[np.ndarray]]],
+                       employees_df: pd.DataFrame) -> List[pd.DataFrame]:
+        """
+        Rank the candidates of each (task, candidate positions, skill overlaps)
+        request with one predict_proba call
+        """
+        employee_features = {
+            'employee_experience': employees_df['Experience'].map(EXPERIENCE_LEVELS).fillna(0).to_numpy(dtype=np.float64),
+            'current_workload': employees_df['TaskCount'].to_numpy(dtype=np.float64),
+            'completed_tasks': employees_df['CompletedTasks'].to_numpy(dtype=np.float64)
+        }
+        employee_skills = employees_df['Skills'].to_numpy()
+        
+        # Rows of each task: its candidates', or the whole roster's
+        rows = [np.arange(len(employees_df)) if positions is None else np.asarray(positions, dtype=np.intp)
+                for _, positions, _ in chunk]
+        offsets = np.concatenate([[0], np.cumsum([len(task_rows) for task_rows in rows])])
+        if offsets[-1] == 0:
+            return [employees_df.iloc[task_rows].assign(PredictionScore=0.0) for task_rows in rows]
+        
+        skill_scores = []
+        for (task, _, overlaps), task_rows in zip(chunk, rows):
+            task_skills = task['Required_Skills']
+            if overlaps is None:
+                skill_scores.append(self._skill_match_scores(employee_skills[task_rows], task_skills))
+            else:
+                skill_scores.append(overlaps[task_rows] / len(task_skills) if task_skills else np.zeros(len(task_rows)))
+        
+        # Stack the chunk's rows task by task, in roster order
+        all_rows = np.concatenate(rows)
+        columns = {name: values[all_rows] for name, values in employee_features.items()}
+        columns['skill_match_score'] = np.concatenate(skill_scores)
+        columns['task_priority'] = np.repeat(np.array([self._encode_priority(task['Priority']) for task, _, _ in chunk],
+                                                      dtype=np.float64), np.diff(offsets))
+        
+        # Columns in the training order (features it lacks are 0)
+        matrix = np.column_stack([np.broadcast_to(columns.get(feature, 0.0), (len(all_rows),))
+                                  for feature in self.features])
+        
+        # Score each distinct feature row once
+        distinct_rows, row_ids = distinct_feature_rows(matrix)
+        estimator, flat_model, online_model = self._scoring_estimators()
+        if self.use_flat_model and flat_model is not None and len(distinct_rows) <= FLAT_FOREST_MAX_ROWS:
+            # Same probabilities as the forest's predict_proba, without its per-call overhead
+            probas = flat_model.predict_proba(distinct_rows)
+        else:
+            probas = estimator.predict_proba(pd.DataFrame(distinct_rows, columns=self.features))
+        employee_ids = estimator.classes_
+        
+        if online_model is not None:
+            # Blend in the online learner's view of the updates since the last
+            # compaction, over the union of both models' employees
+            online_probas = online_model.predict_proba(pd.DataFrame(distinct_rows, columns=self.features))
+            employee_ids = np.union1d(estimator.classes_, online_model.classes_)
+            blended = np.zeros((len(distinct_rows), len(employee_ids)))
+            blended[:, np.searchsorted(employee_ids, estimator.classes_)] += (1 - self.online_weight) * probas
+            blended[:, np.searchsorted(employee_ids, online_model.classes_)] += self.online_weight * online_probas
+            probas = blended
+        
+        # Column of every roster employee's class in probas (-1 for employees
+        # the model has never seen), looked up once for the whole chunk
+        class_columns = pd.Index(employee_ids).get_indexer(employees_df['ID'])
+        known = class_columns >= 0
+        
+        results = []
+        for i, task_rows in enumerate(rows):
+            # Each employee's score is the highest probability of their
+            # class over all of the task's rows
+            feature_rows = pd.unique(row_ids[offsets[i]:offsets[i + 1]])
+            class_scores = probas[feature_rows].max(axis=0) if len(feature_rows) else np.zeros(len(employee_ids))
+            scores = np.where(known[task_rows], class_scores[class_columns[task_rows]], 0.0)
             
-            # Sort by prediction score
-            return employees_df.sort_values('PredictionScore', ascending=False)
+            # Sort by prediction score, highest first, in the order
+            # sort_values(ascending=False) gives, then take the rows in that
+            # order with a single DataFrame copy
+            order = descending_order(scores)
+            ranked = employees_df.take(task_rows[order])
+            ranked['PredictionScore'] = scores[order]
+            results.append(ranked)
+        
+        return results
+    
+    def _skill_match_scores(self, employee_skills: np.ndarray, task_skills: List[str]) -> np.ndarray:
+        """
+        _calculate_skill_match of one task against each employee's skill list
+        """
+        if not task_skills:
+            return np.zeros(len(employee_skills))
         
-        return employees_df
+        task_skill_set = set(task_skills)
+        return np.fromiter((len(task_skill_set.intersection(skills)) for skills in employee_skills),
+                           dtype=np.float64, count=len(employee_skills)) / len(task_skills)
     
     def save_model(self) -> bool:
         """
@@ -227,34 +539,70 @@ class TaskAssignmentModel:
             
         try:
             with open(self.model_path, 'rb') as f:
-                self.model = pickle.load(f)
+                estimator = pickle.load(f)
                 
-            self.trained = True
-            self.features = ['skill_match_score', 'employee_experience', 
-                           'task_priority', 'current_workload', 'completed_tasks']
+            self.features = list(DEFAULT_FEATURES)
+            self.install_model(estimator)
             return True
         except Exception as e:
             st.error(f"Error loading model: {e}")
             return False
+    
+    def load_registered(self, registry: Any, record: Dict[str, Any]) -> bool:
+        """
+        Serve a model from a model_registry.ModelRegistry, given its record
+        """
+        try:
+            estimator = registry.load(record["version"])
+        except Exception as e:
+            st.error(f"Error loading model v{record['version']}: {e}")
+            return False
+        
+        self.features = list(record.get("features") or DEFAULT_FEATURES)
+        self.install_model(estimator)
+        return True
 
 # Create a simpler model that can work with minimal data using TF-IDF and cosine similarity
 class SkillSimilarityModel:
     """
     A simpler model that uses TF-IDF vectorization and cosine similarity 
     to match tasks to employees based on skills
+    
+    The model is shared by every session, so its fitted state is one
+    (vectorizer, skill matrix, employee IDs) tuple that writers build aside
+    and publish by swapping the reference. A reader that takes it once always
+    sees a matrix and IDs that belong together.
     """
     def __init__(self):
-        self.vectorizer = TfidfVectorizer(analyzer='word', stop_words='english')
-        self.employee_skill_matrix = None
-        self.employee_ids = None
+        # Created on the first fit
+        self.state = None
         
+        # Serializes writers, so concurrent updates never drop each other's rows
+        self.write_lock = threading.Lock()
+    
+    def reset(self) -> None:
+        """
+        Forget the fitted skill matrix; the next predict refits on the roster it is given
+        """
+        with self.write_lock:
+            self.state = None
+        
+    @instrumented(rows=employees_arg_rows)
     def fit(self, employees_df: pd.DataFrame) -> None:
         """
         Process employee skills data to create a skill matrix
         """
         if employees_df is None or len(employees_df) == 0:
             return
-            
+        
+        state = self._fit_state(employees_df)
+        with self.write_lock:
+            self.state = state
+    
+    def _fit_state(self, employees_df: pd.DataFrame) -> Tuple[Any, Any, List[int]]:
+        """
+        Vectorize every employee's skills into a new (vectorizer, matrix, IDs) state
+        """
         # Prepare skill documents (one per employee)
         skill_docs = []
         employee_ids = []
@@ -265,33 +613,91 @@ class SkillSimilarityModel:
             skill_docs.append(skill_text)
             employee_ids.append(employee['ID'])
             
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
         # Fit and transform the vectorizer
-        self.employee_skill_matrix = self.vectorizer.fit_transform(skill_docs)
-        self.employee_ids = employee_ids
+        vectorizer = TfidfVectorizer(analyzer='word', stop_words='english')
+        employee_skill_matrix = vectorizer.fit_transform(skill_docs)
+        return vectorizer, employee_skill_matrix, employee_ids
         
+    @instrumented(rows=employees_arg_rows)
+    def update(self, employees_df: pd.DataFrame, changed_ids: List[int], deleted_ids: List[int]) -> None:
+        """
+        Refresh only the rows of changed (inserted or updated) and deleted employees
+        
+        Falls back to a full fit when a changed employee introduces a term the
+        vectorizer has not seen, since that changes the feature space. An
+        unfitted model stays unfitted; predict fits it on first use.
+        """
+        from scipy.sparse import vstack
+        
+        with self.write_lock:
+            if self.state is None:
+                return
+            vectorizer, employee_skill_matrix, employee_ids = self.state
+            
+            changed = employees_df[employees_df['ID'].isin(changed_ids)]
+            skill_docs = [" ".join(skills) for skills in changed['Skills']]
+            
+            analyzer = vectorizer.build_analyzer()
+            vocabulary = vectorizer.vocabulary_
+            if any(term not in vocabulary for doc in skill_docs for term in analyzer(doc)):
+                self.state = self._fit_state(employees_df)
+                return
+            
+            # Drop stale rows, then append the re-vectorized ones
+            removed = np.asarray(list(changed_ids) + list(deleted_ids))
+            keep = ~np.isin(np.asarray(employee_ids), removed)
+            matrix = employee_skill_matrix[keep]
+            next_ids = [emp_id for emp_id, kept in zip(employee_ids, keep) if kept]
+            
+            if skill_docs:
+                matrix = vstack([matrix, vectorizer.transform(skill_docs)]).tocsr()
+                next_ids.extend(changed['ID'].tolist())
+            
+            self.state = (vectorizer, matrix, next_ids)
+        
+    @instrumented(rows=employees_arg_rows)
     def predict(self, task: Dict, employees_df: pd.DataFrame) -> pd.DataFrame:
         """
         Find best matching employees for a task based on skill similarity
         """
-        if self.employee_skill_matrix is None or self.employee_ids is None:
+        return self.predict_many([task], employees_df)[0]
+    
+    @instrumented(rows=employees_arg_rows)
+    def predict_many(self, tasks: List[Dict], employees_df: pd.DataFrame) -> List[pd.DataFrame]:
+        """
+        Find best matching employees for several tasks, vectorizing all of
+        them and computing every similarity in one call
+        """
+        # One read of the state, so a concurrent update or reset cannot mix versions
+        state = self.state
+        if state is None:
             self.fit(employees_df)
+            state = self.state
             
-        if self.employee_skill_matrix is None:
-            return employees_df
+        if state is None:
+            return [employees_df for _ in tasks]
+        vectorizer, employee_skill_matrix, employee_ids = state
             
         # Vectorize the task skills
-        task_skills = " ".join(task['Required_Skills'])
-        task_vector = self.vectorizer.transform([task_skills])
+        task_vectors = vectorizer.transform([" ".join(task['Required_Skills']) for task in tasks])
         
-        # Calculate cosine similarity with all employees
-        similarities = cosine_similarity(task_vector, self.employee_skill_matrix)[0]
+        from sklearn.metrics.pairwise import cosine_similarity
         
-        # Associate similarities with employee IDs
-        similarity_dict = dict(zip(self.employee_ids, similarities))
+        # Calculate cosine similarity of every task with all employees
+        similarities = cosine_similarity(task_vectors, employee_skill_matrix)
         
-        # Add similarity scores to employee DataFrame
-        employees_df = employees_df.copy()
-        employees_df['SimilarityScore'] = employees_df['ID'].map(similarity_dict)
+        results = []
+        for task_similarities in similarities:
+            # Associate similarities with employee IDs
+            similarity_dict = dict(zip(employee_ids, task_similarities))
+            
+            # Add similarity scores to a shallow copy, sharing the snapshot's columns
+            ranked = employees_df.copy(deep=False)
+            ranked['SimilarityScore'] = employees_df['ID'].map(similarity_dict)
+            
+            # Sort by similarity (highest first)
+            results.append(ranked.sort_values('SimilarityScore', ascending=False))
         
-        # Sort by similarity (highest first)
-        return employees_df.sort_values('SimilarityScore', ascending=False)
\ No newline at end of file
+        return results
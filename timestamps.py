@@ -0,0 +1,40 @@
+import time
+import numpy as np
+from datetime import datetime
+from typing import Any, Optional
+
+# Display format of stored timestamps
+DISPLAY_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SECONDS_PER_DAY = 86400
+
+def now() -> int:
+    """
+    Current time as epoch seconds, the format every stored timestamp uses
+    """
+    return int(time.time())
+
+def format_timestamp(value: Optional[Any], fmt: str = DISPLAY_FORMAT) -> str:
+    """
+    Format a stored epoch-seconds timestamp for display (empty for missing values)
+    """
+    if value is None:
+        return ""
+    return datetime.fromtimestamp(int(value)).strftime(fmt)
+
+def to_datetime64(values: Any) -> np.ndarray:
+    """
+    Convert an array of epoch seconds to datetime64[s]
+    """
+    return np.asarray(values, dtype=np.int64).astype('datetime64[s]')
+
+def parse_date(value: Optional[Any], fmt: str = "%Y-%m-%d") -> Optional[int]:
+    """
+    Parse a date string such as a task's Due_Date to epoch seconds (None if missing or malformed)
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return int(datetime.strptime(str(value), fmt).timestamp())
+    except ValueError:
+        return None
@@ -0,0 +1,190 @@
+import numpy as np
+from typing import Any
+
+# Arrays a FlatForest is made of, in the order save() writes them
+FOREST_ARRAYS = ["feature", "threshold", "left", "right", "missing_left", "leaf",
+                 "leaf_indptr", "leaf_class", "leaf_proba", "n_classes", "roots", "classes"]
+
+def is_tree_ensemble(estimator: Any) -> bool:
+    """
+    Whether FlatForest can compile the estimator (a fitted single-output
+    forest of decision tree classifiers, e.g. RandomForestClassifier or
+    ExtraTreesClassifier)
+    """
+    estimators = getattr(estimator, "estimators_", None)
+    return (isinstance(estimators, list) and len(estimators) > 0
+            and all(hasattr(tree, "tree_") for tree in estimators)
+            and getattr(estimator, "n_outputs_", None) == 1
+            and hasattr(estimator, "classes_"))
+
+class FlatForest:
+    """
+    A fitted tree-ensemble classifier flattened into NumPy arrays
+    
+    Every node of every tree gets one slot in the node arrays: the feature it
+    splits on, its threshold, its left and right children (global node
+    indices) and whether missing values go left. Leaves point to themselves
+    and index a row of the leaf values, the class probabilities the tree
+    predicts there; `roots` holds each tree's first node.
+    
+    Most leaves give a non-zero probability to a few classes only, so leaf
+    values are stored sparse, in CSR layout: the non-zero probabilities of
+    leaf row r are leaf_proba[leaf_indptr[r]:leaf_indptr[r + 1]], for the
+    classes at the same positions of leaf_class. Even at one class per
+    employee the forest stays small.
+    
+    predict_proba walks all trees for all rows at once, one tree level per
+    step, with a handful of vectorized array operations per level. It mirrors
+    scikit-learn's arithmetic exactly (float32 feature values compared with
+    float64 thresholds, per-tree probabilities summed in tree order, then
+    divided by the number of trees), so its output is bit-for-bit the same as
+    the forest's predict_proba without the per-call validation and per-tree
+    dispatch overhead.
+    """
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 missing_left: np.ndarray, leaf: np.ndarray, leaf_indptr: np.ndarray, leaf_class: np.ndarray,
+                 leaf_proba: np.ndarray, n_classes: Any, roots: np.ndarray, classes: np.ndarray):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.leaf = leaf
+        self.leaf_indptr = leaf_indptr
+        self.leaf_class = leaf_class
+        self.leaf_proba = leaf_proba
+        self.n_classes = np.asarray(n_classes, dtype=np.intp)
+        self.roots = roots
+        self.classes_ = classes
+        
+        # Levels to descend until every tree has reached a leaf
+        self.depth = self._depth()
+    
+    @classmethod
+    def from_sklearn(cls, forest: Any) -> "FlatForest":
+        """
+        Flatten a fitted scikit-learn forest classifier (see is_tree_ensemble)
+        """
+        if not is_tree_ensemble(forest):
+            raise ValueError(f"{type(forest).__name__} is not a fitted single-output tree ensemble classifier")
+        
+        n_classes = len(forest.classes_)
+        features, thresholds, lefts, rights, missing_lefts, leaves, leaf_values, roots = [], [], [], [], [], [], [], []
+        node_offset = leaf_offset = 0
+        
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_count = tree.node_count
+            nodes = np.arange(node_count)
+            is_leaf = tree.children_left == -1
+            
+            # Leaves loop back to themselves, so extra levels leave them in place
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + node_offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + node_offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            missing_left = getattr(tree, "missing_go_to_left", None)
+            missing_lefts.append(np.asarray(missing_left, dtype=bool) if missing_left is not None
+                                 else np.zeros(node_count, dtype=bool))
+            
+            # Row of each node's class probabilities in the leaf values (-1 for split nodes)
+            leaf_rows = np.full(node_count, -1)
+            leaf_rows[is_leaf] = np.arange(is_leaf.sum()) + leaf_offset
+            leaves.append(leaf_rows)
+            leaf_values.append(tree.value[is_leaf, 0, :n_classes])
+            
+            roots.append(node_offset)
+            node_offset += node_count
+            leaf_offset += int(is_leaf.sum())
+        
+        # Non-zero leaf probabilities in CSR layout, row by row
+        leaf_value = np.concatenate(leaf_values)
+        rows, leaf_class = np.nonzero(leaf_value)
+        leaf_indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(leaf_value)))])
+        
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            missing_left=np.concatenate(missing_lefts),
+            leaf=np.concatenate(leaves).astype(np.intp),
+            leaf_indptr=leaf_indptr.astype(np.intp),
+            leaf_class=leaf_class.astype(np.intp),
+            leaf_proba=leaf_value[rows, leaf_class].astype(np.float64),
+            n_classes=n_classes,
+            roots=np.asarray(roots, dtype=np.intp),
+            classes=np.asarray(forest.classes_)
+        )
+    
+    def _depth(self) -> int:
+        """
+        Depth of the deepest tree (splits from a root to its furthest leaf)
+        """
+        frontier, depth = self.roots, 0
+        while True:
+            splits = frontier[self.leaf[frontier] == -1]
+            if len(splits) == 0:
+                return depth
+            frontier, depth = np.concatenate([self.left[splits], self.right[splits]]), depth + 1
+    
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+    
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the arrays
+        """
+        return sum(getattr(self, name if name != "classes" else "classes_").nbytes for name in FOREST_ARRAYS)
+    
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Leaf row (of the leaf values) each tree reaches for each sample, shape (n_trees, n_samples)
+        """
+        # Trees compare float32 feature values, as scikit-learn does
+        X = np.asarray(X, dtype=np.float32)
+        samples = np.arange(len(X))
+        nodes = np.repeat(self.roots[:, np.newaxis], len(X), axis=1)
+        
+        for _ in range(self.depth):
+            values = X[samples, self.feature[nodes]]
+            go_left = (values <= self.threshold[nodes]) | (np.isnan(values) & self.missing_left[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.leaf[nodes]
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities of each sample, columns in classes_ order
+        """
+        leaves = self.apply(X)
+        samples = leaves.shape[1]
+        
+        # Non-zero entries of every reached leaf, tree by tree, and the sample each belongs to
+        starts = self.leaf_indptr[leaves].reshape(-1)
+        counts = self.leaf_indptr[leaves + 1].reshape(-1) - starts
+        entries = np.arange(counts.sum()) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        entry_samples = np.repeat(np.tile(np.arange(samples), self.n_trees), counts)
+        
+        # np.add.at adds in entry order, so each probability is summed tree
+        # by tree like ForestClassifier.predict_proba and rounds identically
+        # (the zero probabilities skipped don't change any sum)
+        proba = np.zeros((samples, int(self.n_classes)), dtype=np.float64)
+        np.add.at(proba, (entry_samples, self.leaf_class[entries]), self.leaf_proba[entries])
+        proba /= self.n_trees
+        return proba
+    
+    def save(self, path: str) -> None:
+        """
+        Write the arrays to an .npz file (no pickled objects)
+        """
+        np.savez(path, **{name: getattr(self, name if name != "classes" else "classes_") for name in FOREST_ARRAYS})
+    
+    @classmethod
+    def load(cls, path: str) -> "FlatForest":
+        """
+        Read a forest written by save
+        """
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(**{name: arrays[name] for name in FOREST_ARRAYS})
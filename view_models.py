@@ -0,0 +1,138 @@
+import threading
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import List, Dict, Any, Callable, Optional
+from instrumentation import timed
+from timestamps import SECONDS_PER_DAY
+
+class ViewModels:
+    """
+    Per-section derived data, cached across reruns until the data changes
+    
+    Every entry remembers the DataHandler generation it was built from, and
+    is only rebuilt after DataHandler has been mutated, so clicking around
+    unchanged data never recomputes it. Tasks and employees are shared by
+    every session, and so is this object (see initialize_components), so
+    the cache lives here: a view built for one session serves all of them.
+    Entries are kept per view and arguments, so sessions filtering
+    differently don't evict each other; entries of older generations are
+    dropped as soon as one of the current generation is stored.
+    """
+    def __init__(self, data_handler: Any):
+        self.data_handler = data_handler
+        
+        # (view name, arguments) -> (generation, view); the lock guards the dict,
+        # builds run outside it
+        self.cache = {}
+        self.lock = threading.Lock()
+    
+    def _cached(self, name: str, build: Callable[..., Any], *args) -> Any:
+        """
+        Return the cached `name` view for these arguments, rebuilding it with
+        build(*args) if the data changed since it was built
+        """
+        generation = self.data_handler.generation
+        key = (name, args)
+        with self.lock:
+            entry = self.cache.get(key)
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+        
+        # Rebuilds show up on the Performance page; cache hits cost nothing
+        with timed(f"ViewModels.{name}"):
+            value = build(*args)
+        
+        with self.lock:
+            stale = [other for other, (built, _) in self.cache.items() if built < generation]
+            for other in stale:
+                del self.cache[other]
+            self.cache[key] = (generation, value)
+        return value
+    
+    def employee_filter_options(self) -> Dict[str, List[str]]:
+        """
+        Options of the Role, Experience and Status filters on View All Employees
+        """
+        def build():
+            employee_df = self.data_handler.employee_df
+            return {column: employee_df[column].unique().tolist() for column in ('Role', 'Experience', 'Status')}
+        
+        return self._cached('employee_filter_options', build)
+    
+    def filtered_employees(self, roles: List[str], experience: List[str], statuses: List[str]) -> pd.DataFrame:
+        """
+        Employees matching the View All Employees filters (empty filters match everyone)
+        """
+        def build(roles, experience, statuses):
+            employee_df = self.data_handler.employee_df
+            mask = pd.Series(True, index=employee_df.index)
+            if roles:
+                mask &= employee_df['Role'].isin(roles)
+            if experience:
+                mask &= employee_df['Experience'].isin(experience)
+            if statuses:
+                mask &= employee_df['Status'].isin(statuses)
+            return employee_df[mask]
+        
+        return self._cached('filtered_employees', build, tuple(roles), tuple(experience), tuple(statuses))
+    
+    def leaderboard(self, window: Optional[str] = None) -> pd.DataFrame:
+        """
+        Rows of the Performance Leaderboard, all-time or for "week"/"month"
+        """
+        def build(window, today):
+            return self.data_handler.get_leaderboard_data(window=window)
+        
+        # Keyed by day too, so windowed boards roll over without a data change
+        return self._cached('leaderboard', build, window, date.today())
+    
+    def task_overview(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        All tasks split into the lists the task and AI Training pages show
+        """
+        def build():
+            all_tasks = self.data_handler.get_all_tasks()
+            return {
+                "all": list(all_tasks),
+                "completed": [task for task in all_tasks if task.get("Status") == "Completed"],
+                "unassigned": [task for task in all_tasks if task["Assigned_To"] is None]
+            }
+        
+        return self._cached('task_overview', build)
+    
+    def tasks_with_status(self, statuses: List[str]) -> List[Dict[str, Any]]:
+        """
+        Tasks shown on View Assigned Tasks for a status filter (empty filter shows all)
+        """
+        def build(statuses):
+            all_tasks = self.task_overview()["all"]
+            if not statuses:
+                return all_tasks
+            return [task for task in all_tasks if task["Status"] in statuses]
+        
+        return self._cached('tasks_with_status', build, tuple(statuses))
+    
+    def average_completion_days(self) -> pd.DataFrame:
+        """
+        Average days from assignment to completion per employee, for the AI Training page
+        """
+        def build():
+            tasks = [task for task in self.task_overview()["completed"]
+                     if task.get('Assigned_To') in self.data_handler.employee_contacts
+                     and task.get('Assigned_Date') is not None and task.get('Completion_Date') is not None]
+            if not tasks:
+                return pd.DataFrame()
+            
+            # Epoch-second timestamps, so durations are plain integer array arithmetic
+            assigned = np.fromiter((task['Assigned_Date'] for task in tasks), dtype=np.int64, count=len(tasks))
+            completed = np.fromiter((task['Completion_Date'] for task in tasks), dtype=np.int64, count=len(tasks))
+            durations = pd.Series((completed - assigned) / SECONDS_PER_DAY, index=[task['Assigned_To'] for task in tasks])
+            average_days = durations.groupby(level=0).mean()
+            
+            return pd.DataFrame({
+                "Employee": [self.data_handler.employee_contacts[emp_id][0] for emp_id in average_days.index],
+                "Average Days": average_days.values
+            })
+        
+        return self._cached('average_completion_days', build)